@@ -5,7 +5,6 @@ import re
 from collections import Counter
 import logging
 from http.client import HTTPConnection
-import pdb
 
 # ロギングの設定
 def setup_logging():
@@ -2,7 +2,7 @@
 
 from api_utils import generate_summary_cohere as generate_summary
 from api_utils import extract_keywords_cohere as extract_keywords
-from rakuten_api import search_products, generate_affiliate_link
+from rakuten_api import search_products_many, generate_affiliate_link, RAKUTEN_AFFILIATE_ID
 from image_creator import generate_image_from_prompt
 from utils import find_internal_links
 import os 
@@ -29,12 +29,19 @@ def enhance_article_content_operations(content: str, keywords_prompt: str, inter
     try:
         keywords = extract_keywords(keywords_prompt, num_keywords=10)
         logging.info(f"Extracted keywords: {keywords}")
+        # Look up all keywords at once: duplicates share one request and cached keywords cost no API call
+        products_by_keyword = search_products_many(keywords) if keywords else {}
         for keyword in keywords:
-            products = search_products(keyword) # Expects RAKUTEN_API_KEY to be available via os.getenv
+            products = products_by_keyword.get(keyword)
             if products and isinstance(products, list) and len(products) > 0:
                 product = products[0]
                 if isinstance(product, dict) and "itemCode" in product:
-                    affiliate_link = generate_affiliate_link(product["itemCode"]) # Expects RAKUTEN_API_KEY
+                    affiliate_link = generate_affiliate_link(
+                        item_url=product.get("itemUrl"),
+                        item_price=str(product.get("itemPrice", "")),
+                        affiliate_id=RAKUTEN_AFFILIATE_ID,
+                        product_name=product.get("itemName", keyword)
+                    )
                     current_processing_content = current_processing_content.replace(
                         keyword, f'<a href="{affiliate_link}">{keyword}</a>'
                     )
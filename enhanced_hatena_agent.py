@@ -2,11 +2,12 @@
 
 import os
 import logging
+import threading
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
 # Import our multi-blog manager
-from multi_blog_manager import multi_blog_manager
+from multi_blog_manager import get_multi_blog_manager
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -19,7 +20,7 @@ class EnhancedHatenaAgent:
     """Enhanced Hatena Agent with multi-blog support and migration features"""
     
     def __init__(self):
-        self.manager = multi_blog_manager
+        self.manager = get_multi_blog_manager()
         logger.info("Enhanced Hatena Agent initialized")
     
     def list_blogs(self) -> Dict:
@@ -171,43 +172,56 @@ class EnhancedHatenaAgent:
             logger.error(f"Error in batch migration: {e}")
             return {"status": "error", "message": str(e)}
 
+# Shared agent reused by every tool call in this process
+_shared_agent: Optional[EnhancedHatenaAgent] = None
+_agent_lock = threading.Lock()
+
+def get_shared_agent() -> EnhancedHatenaAgent:
+    """Return the process-wide EnhancedHatenaAgent, creating it on first use"""
+    global _shared_agent
+    if _shared_agent is None:
+        with _agent_lock:
+            if _shared_agent is None:
+                _shared_agent = EnhancedHatenaAgent()
+    return _shared_agent
+
 # Tool functions for ADK integration
 def list_blogs_tool() -> Dict:
     """Tool: List all configured blogs"""
-    agent = EnhancedHatenaAgent()
+    agent = get_shared_agent()
     return agent.list_blogs()
 
 def test_authentication_tool(blog_name: str = None) -> Dict:
     """Tool: Test blog authentication"""
-    agent = EnhancedHatenaAgent()
+    agent = get_shared_agent()
     return agent.test_blog_authentication(blog_name)
 
 def get_articles_tool(blog_name: str, limit: int = 10) -> Dict:
     """Tool: Get articles from a blog"""
-    agent = EnhancedHatenaAgent()
+    agent = get_shared_agent()
     return agent.get_articles(blog_name, limit)
 
 def post_article_tool(blog_name: str, title: str, content: str, 
                      is_draft: bool = True, categories: str = None) -> Dict:
     """Tool: Post article to a blog"""
-    agent = EnhancedHatenaAgent()
+    agent = get_shared_agent()
     category_list = categories.split(",") if categories else None
     return agent.post_article(blog_name, title, content, is_draft, category_list)
 
 def migrate_article_tool(source_blog: str, target_blog: str, article_id: str,
                         copy_mode: bool = True) -> Dict:
     """Tool: Migrate article between blogs"""
-    agent = EnhancedHatenaAgent()
+    agent = get_shared_agent()
     return agent.migrate_article(source_blog, target_blog, article_id, copy_mode)
 
 def search_articles_tool(blog_name: str, search_term: str) -> Dict:
     """Tool: Search articles by title"""
-    agent = EnhancedHatenaAgent()
+    agent = get_shared_agent()
     return agent.search_articles_by_title(blog_name, search_term)
 
 def get_migration_candidates_tool(source_blog: str, category_filter: str = None) -> Dict:
     """Tool: Get articles suitable for migration"""
-    agent = EnhancedHatenaAgent()
+    agent = get_shared_agent()
     return agent.get_migration_candidates(source_blog, category_filter)
 
 # Command line interface
@@ -1,14 +1,7 @@
 #!/usr/bin/env python3
 import os
 from dotenv import load_dotenv
-from src.agents.article_extractor import HatenaArticleExtractor
-from src.agents.retrieval_agent import RetrievalAgent
-from src.agents.image_generator import ImageGenerator
-from src.agents.affiliate_manager import AffiliateManager
-from src.agents.repost_manager import RepostManager
-from src.agents.link_checker import LinkChecker
-from src.agents.personalization_agent import PersonalizationAgent
-from src.agents.knowledge_network import KnowledgeNetworkManager
+from src.agents.registry import create_agent
 
 
 def get_blog_config():
@@ -51,7 +44,7 @@ def main():
     
     print(f"Target Blog: {target_blog} ({blog_domain})")
     print("Step 1: Extracting articles from Hatena Blog...")
-    extractor = HatenaArticleExtractor(hatena_id, blog_domain)
+    extractor = create_agent('article_extractor', hatena_id, blog_domain)
     articles = extractor.extract_all_articles(max_pages=5)
     
     print(f"Found {len(articles)} articles")
@@ -70,7 +63,10 @@ def main():
     print("\nStep 2: Setting up enhancement features...")
     
     print("\nStep 3: Setting up affiliate manager...")
-    affiliate_manager = AffiliateManager()
+    affiliate_manager = create_agent(
+        'affiliate_manager',
+        catalog_path=os.getenv('AFFILIATE_PRODUCT_CATALOG')
+    )
     rakuten_tag = os.getenv('RAKUTEN_AFFILIATE_TAG')
     if rakuten_tag:
         affiliate_manager.set_affiliate_tag('rakuten', rakuten_tag)
@@ -88,7 +84,8 @@ def main():
         print("\nStep 5: Generating images for article...")
         bing_cookie = os.getenv('BING_AUTH_COOKIE')
         if bing_cookie:
-            image_generator = ImageGenerator(
+            image_generator = create_agent(
+                'image_generator',
                 bing_auth_cookie=bing_cookie,
                 output_dir=os.path.join(output_dir, 'images')
             )
@@ -122,7 +119,7 @@ def main():
     
     print("\nStep 6: Setting up repost manager...")
     
-    repost_manager = RepostManager(hatena_id, blog_domain)
+    repost_manager = create_agent('repost_manager', hatena_id, blog_domain)
     
     print("Analyzing article performance...")
     performance_data = repost_manager.analyze_article_performance(articles)
@@ -175,24 +172,23 @@ def main():
         print("Sample repost saved to sample_repost.html")
     
     print("\n=== Link Checking ===")
-    link_checker = LinkChecker()
+    link_checker = create_agent(
+        'link_checker',
+        cache_db=os.path.join(output_dir, 'link_status.db')
+    )
     
     if articles:
         print("Checking links in articles...")
-        link_results = []
-        for article in articles[:5]:
-            result = link_checker.check_article_links(article)
-            link_results.append(result)
-            print(f"Checked: {article.get('title', 'Unknown')}")
-        
-        report = link_checker.generate_link_report(
-            link_results, 
-            os.path.join(output_dir, 'link_check_report.md')
+        link_summary = link_checker.stream_audit(
+            articles[:5],
+            os.path.join(output_dir, 'link_check_report')
         )
-        print("Link check report saved to link_check_report.md")
+        print(f"Checked {link_summary['articles']} articles ({link_summary['links']} links)")
+        print("Link check report saved to link_check_report.md / .jsonl / .csv")
     
     print("\n=== Personalization ===")
-    personalizer = PersonalizationAgent(
+    personalizer = create_agent(
+        'personalization',
         os.path.join(output_dir, 'user_profile.json')
     )
     
@@ -212,7 +208,8 @@ def main():
             print("Personalized sample saved to personalized_sample.html")
     
     print("\n=== Knowledge Network ===")
-    knowledge_manager = KnowledgeNetworkManager(
+    knowledge_manager = create_agent(
+        'knowledge_network',
         os.path.join(output_dir, 'knowledge_network')
     )
     
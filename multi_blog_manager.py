@@ -7,7 +7,10 @@ from datetime import datetime
 import hashlib
 import random
 import base64
+import copy
 import logging
+import threading
+import time
 from typing import Dict, List, Optional, Tuple
 from xml.sax.saxutils import escape
 from dataclasses import dataclass
@@ -26,8 +29,14 @@ class BlogConfig:
 class MultiBlogManager:
     """Manages multiple Hatena blogs with proper authentication"""
     
+    # Seconds a fetched article page stays in the local mirror
+    ARTICLE_CACHE_TTL = 300
+    
     def __init__(self):
         self.blogs: Dict[str, BlogConfig] = {}
+        self.session = requests.Session()
+        self._article_cache: Dict[Tuple[str, str], Tuple[float, Dict]] = {}
+        self._cache_lock = threading.Lock()
         self._load_blog_configs()
     
     def _load_blog_configs(self):
@@ -141,7 +150,7 @@ class MultiBlogManager:
         test_url = f'https://blog.hatena.ne.jp/{blog.hatena_id}/{blog.blog_domain}/atom'
         
         try:
-            response = requests.get(test_url, headers=headers, timeout=10)
+            response = self.session.get(test_url, headers=headers, timeout=10)
             response.raise_for_status()
             
             logger.info(f"Authentication successful for {blog_name}")
@@ -159,7 +168,16 @@ class MultiBlogManager:
                 "message": f"Authentication failed: {str(e)}"
             }
     
-    def get_articles(self, blog_name: str, page_url: Optional[str] = None) -> Dict:
+    def invalidate_cache(self, blog_name: Optional[str] = None):
+        """Drop mirrored article pages for one blog, or for all blogs"""
+        with self._cache_lock:
+            if blog_name is None:
+                self._article_cache.clear()
+            else:
+                for key in [key for key in self._article_cache if key[0] == blog_name]:
+                    del self._article_cache[key]
+    
+    def get_articles(self, blog_name: str, page_url: Optional[str] = None, use_cache: bool = True) -> Dict:
         """Get articles from a specific blog"""
         blog = self.get_blog(blog_name)
         if not blog:
@@ -168,12 +186,20 @@ class MultiBlogManager:
         if not page_url:
             page_url = f'https://blog.hatena.ne.jp/{blog.hatena_id}/{blog.blog_domain}/atom/entry'
         
+        cache_key = (blog_name, page_url)
+        if use_cache:
+            with self._cache_lock:
+                cached = self._article_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < self.ARTICLE_CACHE_TTL:
+                # Callers get their own copy so edits to an article never leak into the mirror
+                return copy.deepcopy(cached[1])
+        
         headers = {
             'X-WSSE': self._generate_wsse_header(blog.hatena_id, blog.api_key)
         }
         
         try:
-            response = requests.get(page_url, headers=headers, timeout=30)
+            response = self.session.get(page_url, headers=headers, timeout=30)
             response.raise_for_status()
             
             root = ET.fromstring(response.content)
@@ -206,13 +232,17 @@ class MultiBlogManager:
             next_link = root.find(".//atom:link[@rel='next']", ns)
             next_page_url = next_link.get('href') if next_link is not None else None
             
-            return {
+            result = {
                 "status": "success",
                 "blog_name": blog_name,
                 "articles": articles,
                 "next_page_url": next_page_url,
                 "total_found": len(articles)
             }
+            with self._cache_lock:
+                self._article_cache[cache_key] = (time.monotonic(), result)
+            
+            return copy.deepcopy(result)
             
         except Exception as e:
             logger.error(f"Failed to get articles from {blog_name}: {e}")
@@ -238,7 +268,7 @@ class MultiBlogManager:
         collection_uri = f'https://blog.hatena.ne.jp/{blog.hatena_id}/{blog.blog_domain}/atom/entry'
         
         try:
-            response = requests.post(collection_uri, data=data, headers=headers, timeout=30)
+            response = self.session.post(collection_uri, data=data, headers=headers, timeout=30)
             response.raise_for_status()
             
             # Parse response
@@ -248,6 +278,7 @@ class MultiBlogManager:
             entry_id = root.find('.//atom:id', ns).text.split('-')[-1]
             entry_url = root.find(".//atom:link[@rel='alternate']", ns).get('href')
             
+            self.invalidate_cache(blog_name)
             logger.info(f"Successfully posted to {blog_name}: {title}")
             return {
                 "status": "success",
@@ -285,7 +316,7 @@ class MultiBlogManager:
         article_url = f'https://blog.hatena.ne.jp/{source_config.hatena_id}/{source_config.blog_domain}/atom/entry/{article_id}'
         
         try:
-            response = requests.get(article_url, headers=headers, timeout=30)
+            response = self.session.get(article_url, headers=headers, timeout=30)
             response.raise_for_status()
             
             root = ET.fromstring(response.content)
@@ -324,5 +355,33 @@ class MultiBlogManager:
                 "message": f"Migration failed: {str(e)}"
             }
 
-# Global instance
-multi_blog_manager = MultiBlogManager()
\ No newline at end of file
+# Process-wide instance, built on first use so that importing this module
+# does not read environment variables or log before dotenv has been loaded
+_multi_blog_manager: Optional[MultiBlogManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_multi_blog_manager() -> MultiBlogManager:
+    """Return the shared MultiBlogManager, creating it on first use"""
+    global _multi_blog_manager
+    if _multi_blog_manager is None:
+        with _manager_lock:
+            if _multi_blog_manager is None:
+                _multi_blog_manager = MultiBlogManager()
+    return _multi_blog_manager
+
+
+def reset_multi_blog_manager():
+    """Discard the shared manager so the next call reloads blog configs"""
+    global _multi_blog_manager
+    with _manager_lock:
+        if _multi_blog_manager is not None:
+            _multi_blog_manager.session.close()
+        _multi_blog_manager = None
+
+
+def __getattr__(name: str):
+    # Keep `from multi_blog_manager import multi_blog_manager` working
+    if name == "multi_blog_manager":
+        return get_multi_blog_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -2,7 +2,13 @@
 
 import requests
 import os
+import json
 import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future, ThreadPoolExecutor
 
 # Setup basic logging
 logger = logging.getLogger(__name__)
@@ -13,45 +19,180 @@ RAKUTEN_APP_ID = os.getenv("RAKUTEN_APP_ID") # Changed from RAKUTEN_API_KEY to R
 RAKUTEN_AFFILIATE_ID = os.getenv("RAKUTEN_AFFILIATE_ID")
 
 
-def search_products(keyword: str, applicationId: str = None) -> list | dict:
+RAKUTEN_SEARCH_URL = "https://app.rakuten.co.jp/services/api/IchibaItem/Search/20220601" # More recent version
+# Rakuten Web Service allows roughly one request per second per application ID.
+RAKUTEN_REQUESTS_PER_SECOND = 1.0
+# Persistent files go in ./data next to this module (mounted as a volume by docker-compose),
+# not in whatever directory the process happens to be started from.
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+RAKUTEN_CACHE_DB = os.getenv("RAKUTEN_CACHE_DB") or os.path.join(DATA_DIR, "rakuten_search_cache.db")
+SEARCH_CACHE_TTL = 24 * 3600
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Normalises a keyword so that trivially different spellings share a cache entry."""
+    return " ".join(unicodedata.normalize("NFKC", keyword).lower().split())
+
+
+class TokenBucket:
+    """Blocking token bucket shared by all threads that call the API."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SearchCache:
+    """SQLite-backed TTL cache of search results keyed by normalised keyword."""
+
+    def __init__(self, db_path: str = RAKUTEN_CACHE_DB, ttl: int = SEARCH_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    keyword TEXT PRIMARY KEY,
+                    products TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+
+    def get(self, key: str):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT products FROM search_cache WHERE keyword = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, products: list):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO search_cache (keyword, products, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(products, ensure_ascii=False), time.time() + self.ttl)
+            )
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class RakutenProductSearch:
     """
-    Searches for products on Rakuten Ichiba based on a keyword.
-    Returns a list of products or an error dictionary.
-    `applicationId` can be passed, otherwise it uses the environment variable RAKUTEN_APP_ID.
+    Product lookup layer for the Rakuten Ichiba Item Search API.
+    Successful results are cached persistently, concurrent lookups of the same
+    keyword share one request, and all requests go through a pooled session
+    paced by a token bucket.
     """
-    app_id_to_use = applicationId if applicationId else RAKUTEN_APP_ID
-
-    if not app_id_to_use:
-        logger.error("Rakuten Application ID (RAKUTEN_APP_ID) is not set.")
-        return {"status": "error", "message": "Rakuten Application ID is not configured."}
-
-    # API endpoint for Rakuten Ichiba Item Search API
-    # Version 2022-06-01 is an example, check for the latest or most suitable version.
-    # The original used 2017-04-04 for product search, which might be for a different API (Product API vs Item Search API).
-    # Let's stick to a more general item search for now.
-    # The URL from the original code was: "https://api.rakuten.co.jp/ichiba/product/search/20170404"
-    # A more common one is: "https://app.rakuten.co.jp/services/api/IchibaItem/Search/20170706"
-    # For this task, I'll use the one provided in the original snippet if it was functional.
-    # Let's assume the original "product/search" was intended and worked.
-    
-    # The original code in article_updater was calling this with `applicationId` as a kwarg
-    # but the old definition didn't take it. Now it does.
-    
-    url = "https://app.rakuten.co.jp/services/api/IchibaItem/Search/20220601" # More recent version
-    # url = "https://api.rakuten.co.jp/ichiba/product/search/20170404" # As per original snippet, but this might be Product API
-    
-    params = {
-        "format": "json",
-        "keyword": keyword,
-        "applicationId": app_id_to_use,
-        "hits": 5,  # Number of items to return, adjust as needed
-        # "sort": "standard" # Default sort
-    }
-    
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()  # Raise an exception for HTTP errors (4xx or 5xx)
-        data = response.json()
+
+    def __init__(self,
+                 application_id: str = None,
+                 cache_path: str = RAKUTEN_CACHE_DB,
+                 cache_ttl: int = SEARCH_CACHE_TTL,
+                 requests_per_second: float = RAKUTEN_REQUESTS_PER_SECOND,
+                 timeout: float = 10,
+                 max_workers: int = 4):
+        self.application_id = application_id
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.cache = SearchCache(cache_path, cache_ttl)
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self.api_calls = 0
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def search(self, keyword: str, applicationId: str = None) -> list | dict:
+        """Returns a list of products or an error dictionary for one keyword."""
+        app_id_to_use = applicationId or self.application_id or RAKUTEN_APP_ID
+        if not app_id_to_use:
+            logger.error("Rakuten Application ID (RAKUTEN_APP_ID) is not set.")
+            return {"status": "error", "message": "Rakuten Application ID is not configured."}
+
+        key = normalize_keyword(keyword)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not owner:
+            # Another thread is already fetching this keyword; share its result.
+            return future.result()
+
+        try:
+            result = self._fetch(keyword, app_id_to_use)
+            if isinstance(result, list):
+                self.cache.set(key, result)
+            future.set_result(result)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+        return result
+
+    def search_many(self, keywords, applicationId: str = None) -> dict:
+        """Looks up several keywords concurrently and returns a keyword -> result mapping."""
+        unique_keywords = list(dict.fromkeys(keywords))
+        if not unique_keywords:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unique_keywords))) as executor:
+            results = executor.map(lambda keyword: self.search(keyword, applicationId), unique_keywords)
+            return dict(zip(unique_keywords, results))
+
+    def _fetch(self, keyword: str, app_id: str) -> list | dict:
+        params = {
+            "format": "json",
+            "keyword": keyword,
+            "applicationId": app_id,
+            "hits": 5,  # Number of items to return, adjust as needed
+            # "sort": "standard" # Default sort
+        }
+
+        self.rate_limiter.acquire()
+        with self._lock:
+            self.api_calls += 1
+        try:
+            response = self.session.get(RAKUTEN_SEARCH_URL, params=params, timeout=self.timeout)
+            response.raise_for_status()  # Raise an exception for HTTP errors (4xx or 5xx)
+            data = response.json()
+        except json.JSONDecodeError:
+            logger.error("Failed to decode JSON response from Rakuten API.")
+            return {"status": "error", "message": "Failed to decode JSON response from Rakuten API."}
+        except requests.RequestException as e:
+            logger.error(f"Request to Rakuten API failed: {e}")
+            return {"status": "error", "message": f"Request to Rakuten API failed: {e}"}
 
         if "Items" in data and data["Items"]:
             products = []
@@ -76,12 +217,36 @@ def search_products(keyword: str, applicationId: str = None) -> list | dict:
             logger.info(f"No items found for keyword: {keyword}. Response: {data}")
             return [] # Return empty list if no items but no error
 
-    except requests.RequestException as e:
-        logger.error(f"Request to Rakuten API failed: {e}")
-        return {"status": "error", "message": f"Request to Rakuten API failed: {e}"}
-    except json.JSONDecodeError:
-        logger.error("Failed to decode JSON response from Rakuten API.")
-        return {"status": "error", "message": "Failed to decode JSON response from Rakuten API."}
+
+_product_search = None
+_product_search_lock = threading.Lock()
+
+
+def get_product_search() -> RakutenProductSearch:
+    """Returns the process-wide product lookup layer, creating it on first use."""
+    global _product_search
+    if _product_search is None:
+        with _product_search_lock:
+            if _product_search is None:
+                _product_search = RakutenProductSearch()
+    return _product_search
+
+
+def search_products(keyword: str, applicationId: str = None) -> list | dict:
+    """
+    Searches for products on Rakuten Ichiba based on a keyword.
+    Returns a list of products or an error dictionary.
+    `applicationId` can be passed, otherwise it uses the environment variable RAKUTEN_APP_ID.
+    """
+    return get_product_search().search(keyword, applicationId)
+
+
+def search_products_many(keywords, applicationId: str = None) -> dict:
+    """
+    Searches for several keywords concurrently, sharing the cache and rate limit
+    with search_products. Returns a keyword -> result mapping.
+    """
+    return get_product_search().search_many(keywords, applicationId)
 
 
 def generate_affiliate_link(item_url: str, item_price: str, affiliate_id: str, product_name: str) -> str:
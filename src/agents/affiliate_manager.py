@@ -1,11 +1,97 @@
+import hashlib
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 import json
 
+from .product_catalog import ProductCatalog, get_product_catalog
+
+
+# カタログファイルを指定しない場合に使う組み込みの商品データ
+SUGGESTION_PRODUCTS = {
+    'tech': [
+        {'name': 'ワイヤレスマウス', 'category': 'PC周辺機器', 'keywords': ['マウス', 'PC', 'パソコン']},
+        {'name': 'USB-Cハブ', 'category': 'PC周辺機器', 'keywords': ['USB', 'ハブ', 'Mac', 'パソコン']},
+    ],
+    'book': [
+        {'name': 'Python実践入門', 'category': '技術書', 'keywords': ['Python', 'プログラミング', '開発']},
+        {'name': 'リーダブルコード', 'category': '技術書', 'keywords': ['コード', 'プログラミング', '設計']},
+    ]
+}
+
+AFFILIATE_PRODUCTS = {
+    'amazon': [
+        {
+            'name': 'プログラミング入門書',
+            'url': 'https://www.amazon.co.jp/dp/example',
+            'keywords': ['プログラミング', 'Python', 'JavaScript', '入門', '初心者'],
+            'price': '¥2,500',
+            'category': '書籍'
+        },
+        {
+            'name': 'ワイヤレスマウス',
+            'url': 'https://www.amazon.co.jp/dp/example2',
+            'keywords': ['マウス', 'PC', 'パソコン', 'ワイヤレス'],
+            'price': '¥3,000',
+            'category': 'PC周辺機器'
+        }
+    ],
+    'rakuten': [
+        {
+            'name': 'コーヒーメーカー',
+            'url': 'https://item.rakuten.co.jp/example',
+            'keywords': ['コーヒー', 'カフェ', 'ドリップ', 'メーカー'],
+            'price': '¥15,000',
+            'category': 'キッチン家電'
+        }
+    ]
+}
+
+
+URL_PATTERN = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+(?:[.,;:!?](?=\s|$))?')
+TRAILING_PUNCTUATION = '.,;:!?'
+REWRITE_CACHE_SIZE = 4096
+# これより少ない記事数ならプロセスプールを使わずにその場で走査する
+SCAN_CHUNK_SIZE = 200
+
+
+def _default_suggestion_products() -> List[Dict]:
+    return [dict(product, group=group) for group, items in SUGGESTION_PRODUCTS.items() for product in items]
+
+
+def _default_affiliate_products() -> List[Dict]:
+    return [dict(product, service=service) for service, items in AFFILIATE_PRODUCTS.items() for product in items]
+
+
+@lru_cache(maxsize=8)
+def _compile_domain_pattern(pattern: str):
+    return re.compile(pattern)
+
+
+def _scan_affiliate_services(domain_pattern: str, services: Tuple[str, ...], contents: List[str]) -> List[Dict[str, int]]:
+    """本文中のアフィリエイトリンクをサービス別に数える（書き換えは行わない）
+
+    プロセスプールから呼ばれるため、正規表現はパターン文字列で受け取る。
+    """
+    matcher = _compile_domain_pattern(domain_pattern)
+    results = []
+    for content in contents:
+        counts: Dict[str, int] = {}
+        for match in URL_PATTERN.finditer(content):
+            netloc = urlparse(match.group(0).rstrip(TRAILING_PUNCTUATION)).netloc.lower()
+            domain_match = matcher.search(netloc)
+            if domain_match:
+                service = services[int(domain_match.lastgroup[1:])]
+                counts[service] = counts.get(service, 0) + 1
+        results.append(counts)
+    return results
+
 
 class AffiliateManager:
-    def __init__(self, config_file: Optional[str] = None):
+    def __init__(self, config_file: Optional[str] = None, catalog_path: Optional[str] = None):
         self.affiliate_configs = {
             'rakuten': {
                 'tag_param': 'mafRakutenWidgetParam',
@@ -15,6 +101,14 @@ class AffiliateManager:
             }
         }
         
+        self.catalog_path = catalog_path
+        self._catalog: Optional[ProductCatalog] = None
+        self._suggestion_catalog: Optional[ProductCatalog] = None
+        self._domain_matcher = None
+        self._domain_services: List[str] = []
+        self._rewrite_cache: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._scan_cache: Dict[bytes, Dict[str, int]] = {}
+        
         if config_file:
             self.load_config(config_file)
     
@@ -22,26 +116,55 @@ class AffiliateManager:
         with open(config_file, 'r', encoding='utf-8') as f:
             config = json.load(f)
             
+        if config.get('product_catalog') and not self.catalog_path:
+            self.catalog_path = config['product_catalog']
+            self._catalog = None
+            
         for service, settings in config.items():
             if service in self.affiliate_configs:
                 self.affiliate_configs[service].update(settings)
+        
+        self._reset_url_matchers()
     
     def set_affiliate_tag(self, service: str, tag: str):
         if service in self.affiliate_configs:
             self.affiliate_configs[service]['default_tag'] = tag
+            self._rewrite_cache.clear()
+    
+    def _reset_url_matchers(self):
+        """設定変更後にドメイン照合用の正規表現と書き換え結果を作り直す"""
+        self._domain_matcher = None
+        self._rewrite_cache.clear()
+        self._scan_cache.clear()
+    
+    def _get_domain_matcher(self):
+        """全サービスのドメインを1つの正規表現にまとめる（グループ名からサービスを引く）"""
+        if self._domain_matcher is None:
+            self._domain_services = []
+            alternatives = []
+            for service, config in self.affiliate_configs.items():
+                if not config['domains']:
+                    continue
+                domains = '|'.join(re.escape(domain.lower()) for domain in config['domains'])
+                alternatives.append(f"(?P<s{len(self._domain_services)}>{domains})")
+                self._domain_services.append(service)
+            self._domain_matcher = re.compile('|'.join(alternatives)) if alternatives else None
+        return self._domain_matcher
     
     def detect_affiliate_service(self, url: str) -> Optional[str]:
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc.lower()
-        
-        for service, config in self.affiliate_configs.items():
-            if any(affiliate_domain in domain for affiliate_domain in config['domains']):
-                return service
-        
-        return None
+        matcher = self._get_domain_matcher()
+        if matcher is None:
+            return None
+        
+        match = matcher.search(urlparse(url).netloc.lower())
+        if not match:
+            return None
+        return self._domain_services[int(match.lastgroup[1:])]
     
     def add_affiliate_tag(self, url: str, tag: Optional[str] = None) -> str:
-        service = self.detect_affiliate_service(url)
+        return self._tag_url(url, self.detect_affiliate_service(url), tag)
+    
+    def _tag_url(self, url: str, service: Optional[str], tag: Optional[str] = None) -> str:
         if not service:
             return url
         
@@ -68,25 +191,41 @@ class AffiliateManager:
         
         return new_url
     
-    def process_article_content(self, content: str, auto_detect: bool = True) -> Tuple[str, List[Dict]]:
-        url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+(?:[.,;:!?](?=\s|$))?'
-        urls_found = re.findall(url_pattern, content)
+    def _rewrite_url(self, url: str) -> Tuple[str, Optional[str]]:
+        """URLを (書き換え後のURL, サービス) に変換（同じURLは再計算しない）"""
+        cached = self._rewrite_cache.get(url)
+        if cached is not None:
+            return cached
         
-        processed_urls = []
-        modified_content = content
+        service = self.detect_affiliate_service(url)
+        rewritten = (self._tag_url(url, service), service)
         
-        for url in urls_found:
-            clean_url = url.rstrip('.,;:!?')
+        if len(self._rewrite_cache) >= REWRITE_CACHE_SIZE:
+            self._rewrite_cache.clear()
+        self._rewrite_cache[url] = rewritten
+        return rewritten
+    
+    def process_article_content(self, content: str, auto_detect: bool = True) -> Tuple[str, List[Dict]]:
+        processed_urls = []
+        if not auto_detect:
+            return content, processed_urls
+        
+        def replace(match):
+            url = match.group(0)
+            clean_url = url.rstrip(TRAILING_PUNCTUATION)
+            new_url, service = self._rewrite_url(clean_url)
+            if not service or new_url == clean_url:
+                return url
             
-            if auto_detect and self.detect_affiliate_service(clean_url):
-                new_url = self.add_affiliate_tag(clean_url)
-                if new_url != clean_url:
-                    modified_content = modified_content.replace(clean_url, new_url)
-                    processed_urls.append({
-                        'original': clean_url,
-                        'modified': new_url,
-                        'service': self.detect_affiliate_service(clean_url)
-                    })
+            processed_urls.append({
+                'original': clean_url,
+                'modified': new_url,
+                'service': service
+            })
+            return new_url + url[len(clean_url):]
+        
+        # 本文を1回だけ走査し、見つけたURLをその場で置き換える
+        modified_content = URL_PATTERN.sub(replace, content)
         
         return modified_content, processed_urls
     
@@ -108,52 +247,34 @@ class AffiliateManager:
         
         return html_template
     
-    def suggest_products(self, article_content: str, category: Optional[str] = None) -> List[Dict]:
-        keywords = self._extract_keywords(article_content)
-        
-        suggestions = []
-        
-        product_database = {
-            'tech': [
-                {'name': 'ワイヤレスマウス', 'category': 'PC周辺機器', 'keywords': ['マウス', 'PC', 'パソコン']},
-                {'name': 'USB-Cハブ', 'category': 'PC周辺機器', 'keywords': ['USB', 'ハブ', 'Mac', 'パソコン']},
-            ],
-            'book': [
-                {'name': 'Python実践入門', 'category': '技術書', 'keywords': ['Python', 'プログラミング', '開発']},
-                {'name': 'リーダブルコード', 'category': '技術書', 'keywords': ['コード', 'プログラミング', '設計']},
-            ]
-        }
-        
-        relevant_products = []
-        for cat, products in product_database.items():
-            if not category or category == cat:
-                for product in products:
-                    if any(kw in keywords for kw in product['keywords']):
-                        relevant_products.append(product)
-        
-        return relevant_products[:5]
+    @property
+    def catalog(self) -> ProductCatalog:
+        """商品カタログ（ファイル指定時は同じファイルを使うインスタンス間で共有）"""
+        if self._catalog is None:
+            if self.catalog_path:
+                self._catalog = get_product_catalog(self.catalog_path)
+            else:
+                self._catalog = ProductCatalog(products=_default_affiliate_products())
+        return self._catalog
     
-    def _extract_keywords(self, text: str) -> List[str]:
-        try:
-            import MeCab
-            
-            mecab = MeCab.Tagger()
-            node = mecab.parseToNode(text)
-            
-            keywords = []
-            while node:
-                features = node.feature.split(',')
-                if features[0] in ['名詞'] and features[1] not in ['非自立', '代名詞', '数']:
-                    if len(node.surface) > 1:
-                        keywords.append(node.surface)
-                node = node.next
-            
-            return list(set(keywords))
-        except ImportError:
-            # MeCabが利用できない場合は簡易的なキーワード抽出
-            import re
-            words = re.findall(r'[ァ-ヴー]+|[ぁ-ん]+|[A-Za-z]+', text)
-            return [word for word in words if len(word) > 2]
+    @property
+    def suggestion_catalog(self) -> ProductCatalog:
+        """おすすめ候補のカタログ（ファイル指定時は商品カタログと同じ。未指定時は組み込みのおすすめ商品だけ）"""
+        if self._suggestion_catalog is None:
+            if self.catalog_path:
+                self._suggestion_catalog = self.catalog
+            else:
+                self._suggestion_catalog = ProductCatalog(products=_default_suggestion_products())
+        return self._suggestion_catalog
+    
+    def suggest_products(self, article_content: str, category: Optional[str] = None) -> List[Dict]:
+        suggestions = {}
+        for product, _ in self.suggestion_catalog.search(article_content, min_score=1, category=category):
+            # 同じ商品が複数の行（グループ・サービス）にあっても1件だけ返す
+            suggestions.setdefault(product.get('name'), product)
+            if len(suggestions) == 5:
+                break
+        return list(suggestions.values())
     
     def generate_affiliate_report(self, processed_urls: List[Dict]) -> str:
         report = "## アフィリエイトリンク処理レポート\n\n"
@@ -177,68 +298,24 @@ class AffiliateManager:
     
     def auto_detect_and_insert_affiliate_products(self, content: str) -> str:
         """記事内容から関連商品を自動検出してアフィリエイトリンクを挿入"""
-        keywords = self._extract_keywords(content)
-        
-        # 商品データベース（実際の実装では外部APIや設定ファイルから取得）
-        products_db = {
-            'amazon': [
-                {
-                    'name': 'プログラミング入門書',
-                    'url': 'https://www.amazon.co.jp/dp/example',
-                    'keywords': ['プログラミング', 'Python', 'JavaScript', '入門', '初心者'],
-                    'price': '¥2,500',
-                    'category': '書籍'
-                },
-                {
-                    'name': 'ワイヤレスマウス',
-                    'url': 'https://www.amazon.co.jp/dp/example2', 
-                    'keywords': ['マウス', 'PC', 'パソコン', 'ワイヤレス'],
-                    'price': '¥3,000',
-                    'category': 'PC周辺機器'
-                }
-            ],
-            'rakuten': [
-                {
-                    'name': 'コーヒーメーカー',
-                    'url': 'https://item.rakuten.co.jp/example',
-                    'keywords': ['コーヒー', 'カフェ', 'ドリップ', 'メーカー'],
-                    'price': '¥15,000',
-                    'category': 'キッチン家電'
-                }
-            ]
-        }
-        
-        matched_products = []
-        
-        # キーワードマッチングで商品を検出
-        for service, products in products_db.items():
-            for product in products:
-                product_score = 0
-                for keyword in keywords:
-                    if keyword in product['keywords']:
-                        product_score += 1
-                
-                if product_score >= 2:  # 2つ以上のキーワードが一致
-                    matched_products.append({
-                        'product': product,
-                        'service': service,
-                        'score': product_score
-                    })
-        
-        # スコア順にソート
-        matched_products.sort(key=lambda x: x['score'], reverse=True)
+        # 全商品のキーワードを本文1回の走査で照合し、2つ以上一致した商品を上位から採用
+        matched_products = [
+            {'product': product, 'service': product.get('service') or self.detect_affiliate_service(product['url']), 'score': score}
+            for product, score in self.catalog.search(content, min_score=2, limit=3, require_url=True)
+        ]
         
         # 上位3商品をコンテンツに挿入
         enhanced_content = content
-        for match in matched_products[:3]:
+        for match in matched_products:
             product = match['product']
             affiliate_url = self.add_affiliate_tag(product['url'])
+            # カタログの行に価格が無い（NULL・未記入）場合は価格の行を省く
+            price_html = f"\n    <p>価格: {product['price']}</p>" if product.get('price') else ''
             
             product_html = f'''
 <div class="recommended-product">
     <h4>おすすめ商品</h4>
-    <p><strong>{product['name']}</strong></p>
-    <p>価格: {product['price']}</p>
+    <p><strong>{product.get('name', '')}</strong></p>{price_html}
     <p><a href="{affiliate_url}" target="_blank" rel="noopener">詳細を見る</a></p>
 </div>
 '''
@@ -254,43 +331,83 @@ class AffiliateManager:
         
         return enhanced_content
     
-    def analyze_affiliate_performance(self, articles: List[Dict]) -> Dict:
-        """アフィリエイトリンクのパフォーマンス分析"""
+    def scan_articles(self, contents: List[str], workers: Optional[int] = None,
+                      chunk_size: int = SCAN_CHUNK_SIZE) -> List[Dict[str, int]]:
+        """記事本文ごとのサービス別アフィリエイトリンク数を返す
+
+        本文のハッシュで結果をキャッシュし、未解析の本文だけを走査する。
+        未解析の本文がchunk_sizeを超える場合はプロセスプールでチャンクごとに並列処理する。
+        """
+        keys = [hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest() for content in contents]
+        pending = {}
+        for key, content in zip(keys, contents):
+            if key not in self._scan_cache and key not in pending:
+                pending[key] = content
+        
+        matcher = self._get_domain_matcher()
+        if pending and matcher is None:
+            for key in pending:
+                self._scan_cache[key] = {}
+        elif pending:
+            pattern, services = matcher.pattern, tuple(self._domain_services)
+            pending_keys = list(pending)
+            pending_contents = list(pending.values())
+            chunks = [pending_contents[i:i + chunk_size] for i in range(0, len(pending_contents), chunk_size)]
+            
+            workers = workers or os.cpu_count() or 1
+            if len(chunks) == 1 or workers == 1:
+                chunk_results = [_scan_affiliate_services(pattern, services, chunk) for chunk in chunks]
+            else:
+                with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+                    chunk_results = list(executor.map(
+                        _scan_affiliate_services,
+                        [pattern] * len(chunks), [services] * len(chunks), chunks
+                    ))
+            
+            results = [counts for chunk in chunk_results for counts in chunk]
+            self._scan_cache.update(zip(pending_keys, results))
+        
+        return [self._scan_cache[key] for key in keys]
+    
+    def analyze_affiliate_performance(self, articles: List[Dict], workers: Optional[int] = None) -> Dict:
+        """アフィリエイトリンクのパフォーマンス分析（本文は書き換えずに走査のみ行う）
+
+        service_distribution と articles_with_affiliate は、本文中で検出したアフィリエイトリンクをすべて数える。
+        タグが設定されておらず書き換えの対象にならないリンクも含む。
+        """
         performance_data = {
             'total_articles': len(articles),
+            'analyzed_articles': 0,
             'articles_with_affiliate': 0,
             'service_distribution': {},
             'category_performance': {},
             'recommendations': []
         }
         
-        for article in articles:
-            content = article.get('full_content', '') or article.get('content', '')
-            if not content:
-                continue
-            
-            # アフィリエイトリンクの検出
-            _, processed_urls = self.process_article_content(content, auto_detect=True)
-            
-            if processed_urls:
+        contents = [article.get('full_content', '') or article.get('content', '') for article in articles]
+        contents = [content for content in contents if content]
+        performance_data['analyzed_articles'] = len(contents)
+        
+        for counts in self.scan_articles(contents, workers=workers):
+            if counts:
                 performance_data['articles_with_affiliate'] += 1
                 
-                for url_info in processed_urls:
-                    service = url_info['service']
+                for service, count in counts.items():
                     performance_data['service_distribution'][service] = \
-                        performance_data['service_distribution'].get(service, 0) + 1
+                        performance_data['service_distribution'].get(service, 0) + count
         
-        # 推奨事項の生成
-        coverage_rate = performance_data['articles_with_affiliate'] / performance_data['total_articles']
-        
-        if coverage_rate < 0.3:
-            performance_data['recommendations'].append(
-                "アフィリエイトリンクの導入率が低いです。より多くの記事に関連商品を追加することを検討してください。"
-            )
+        # 推奨事項の生成（本文のない記事は分母に含めない）
+        if contents:
+            coverage_rate = performance_data['articles_with_affiliate'] / len(contents)
+            
+            if coverage_rate < 0.3:
+                performance_data['recommendations'].append(
+                    "アフィリエイトリンクの導入率が低いです。より多くの記事に関連商品を追加することを検討してください。"
+                )
         
         if 'rakuten' not in performance_data['service_distribution']:
             performance_data['recommendations'].append(
                 "楽天アフィリエイトの活用を検討してください。幅広い商品カテゴリをカバーできます。"
             )
         
-        return performance_data
\ No newline at end of file
+        return performance_data
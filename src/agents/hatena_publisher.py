@@ -83,6 +83,7 @@ class HatenaPublisher:
         
         collection_uri = f'https://blog.hatena.ne.jp/{self.hatena_id}/{self.blog_domain}/atom/entry'
         
+        response = None
         try:
             response = requests.post(collection_uri, data=data, headers=headers)
             response.raise_for_status()
@@ -103,11 +104,15 @@ class HatenaPublisher:
             }
         except Exception as e:
             logger.error(f"Failed to post article: {e}")
-            return {
+            result = {
                 "status": "error",
                 "message": str(e),
                 "title": title
             }
+            # Callers use the status code to tell a rejected post from one whose outcome is unknown
+            if response is not None:
+                result["status_code"] = response.status_code
+            return result
     
     def update_article(self, entry_id: str, title: str, content: str, is_draft: bool = False, categories: List[str] = None) -> Dict:
         """Update an existing article"""
@@ -209,7 +214,8 @@ class HatenaPublisher:
             return {
                 "status": "error",
                 "message": "No content provided for repost",
-                "title": title
+                "title": title,
+                "request_sent": False
             }
         
         # Always add '再掲載' category if not present
@@ -0,0 +1,156 @@
+import asyncio
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+
+def parse_retry_after(value: Optional[str], max_delay: float = 300.0) -> Optional[float]:
+    """Retry-Afterヘッダー（秒数またはHTTP日付）を待機秒数に変換"""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), max_delay)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(delay, 0.0), max_delay)
+
+
+class HostScheduler:
+    """ホストごとの同時接続数・最小間隔を守りつつ、ホスト間をラウンドロビンで処理"""
+
+    def __init__(self,
+                 max_concurrent: int = 10,
+                 per_host_limit: int = 2,
+                 min_delay: float = 0.5,
+                 max_retries: int = 3):
+        self.max_concurrent = max_concurrent
+        self.per_host_limit = per_host_limit
+        self.min_delay = min_delay
+        self.max_retries = max_retries
+
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+        self._active: Dict[str, int] = {}
+        self._next_allowed: Dict[str, float] = {}
+        self._attempts: Dict[str, int] = {}
+        self._pending = 0
+        self._in_flight = 0
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _enqueue(self, url: str, front: bool = False):
+        host = self.host_of(url)
+        queue = self._queues.setdefault(host, deque())
+        if front:
+            queue.appendleft(url)
+        else:
+            queue.append(url)
+        self._active.setdefault(host, 0)
+        self._next_allowed.setdefault(host, 0.0)
+        self._pending += 1
+
+    def defer_host(self, host: str, seconds: float, now: float):
+        """ホストへの次のリクエストを指定秒数後まで遅らせる"""
+        self._next_allowed[host] = max(self._next_allowed.get(host, 0.0), now + seconds)
+
+    def _pick(self, now: float) -> Tuple[Optional[Tuple[str, str]], Optional[float]]:
+        """実行可能なURLを1件選ぶ。なければ次に実行可能になるまでの秒数を返す"""
+        wait = None
+
+        # _queues には待ちのURLがあるホストだけが入っている
+        for _ in range(len(self._queues)):
+            host, queue = next(iter(self._queues.items()))
+            # 選ばれても選ばれなくても末尾に回して公平性を保つ
+            self._queues.move_to_end(host)
+
+            if self._active[host] >= self.per_host_limit:
+                continue
+
+            ready_in = self._next_allowed[host] - now
+            if ready_in <= 0:
+                self._pending -= 1
+                url = queue.popleft()
+                if not queue:
+                    # 空になったホストはローテーションから外す（再試行で積み直されれば戻る）
+                    del self._queues[host]
+                return (host, url), None
+
+            wait = ready_in if wait is None else min(wait, ready_in)
+
+        return None, wait
+
+    async def run(self,
+                  urls: Iterable[str],
+                  fetch: Callable[[str], Awaitable[Tuple[Any, Optional[float]]]],
+                  on_result: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+        """URLを順番にfetchへ渡し、URL→結果の辞書を返す
+
+        fetchは (結果, Retry-Afterの秒数またはNone) を返す。
+        Retry-Afterが返された場合はホストを待機させて再試行する。
+        on_resultを指定した場合は結果を確定した順に渡し、辞書には保持しない。
+        """
+        for url in dict.fromkeys(urls):
+            self._enqueue(url)
+
+        loop = asyncio.get_running_loop()
+        condition = asyncio.Condition()
+        results: Dict[str, Dict] = {}
+
+        async def worker():
+            while True:
+                async with condition:
+                    while True:
+                        if self._pending == 0 and self._in_flight == 0:
+                            return
+
+                        picked, wait = self._pick(loop.time())
+                        if picked:
+                            break
+
+                        try:
+                            await asyncio.wait_for(condition.wait(), timeout=wait)
+                        except asyncio.TimeoutError:
+                            pass
+
+                    host, url = picked
+                    self._active[host] += 1
+                    self._in_flight += 1
+                    self.defer_host(host, self.min_delay, loop.time())
+
+                result, retry_after = None, None
+                try:
+                    result, retry_after = await fetch(url)
+                finally:
+                    async with condition:
+                        self._active[host] -= 1
+                        self._in_flight -= 1
+
+                        attempts = self._attempts.get(url, 0) + 1
+                        self._attempts[url] = attempts
+                        if retry_after is not None and attempts <= self.max_retries:
+                            self.defer_host(host, retry_after, loop.time())
+                            self._enqueue(url, front=True)
+                        elif result is not None:
+                            self._attempts.pop(url, None)
+                            if on_result:
+                                on_result(url, result)
+                            else:
+                                results[url] = result
+
+                        condition.notify_all()
+
+        worker_count = max(1, min(self.max_concurrent, self._pending))
+        await asyncio.gather(*(worker() for _ in range(worker_count)))
+        return results
@@ -1,7 +1,6 @@
 import os
 import requests
 from typing import List, Dict, Optional, Tuple
-from PIL import Image
 from io import BytesIO
 from datetime import datetime
 import json
@@ -93,6 +92,7 @@ class ImageGenerator:
     def download_and_save_image(self, image_url: str, filename: str) -> str:
         response = requests.get(image_url)
         if response.status_code == 200:
+            from PIL import Image
             image = Image.open(BytesIO(response.content))
             
             filepath = os.path.join(self.output_dir, filename)
@@ -161,6 +161,7 @@ The image should be eye-catching, professional, and represent the article's them
         return None
     
     def optimize_image_for_web(self, image_path: str, max_width: int = 1200) -> str:
+        from PIL import Image
         image = Image.open(image_path)
         
         if image.width > max_width:
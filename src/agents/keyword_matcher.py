@@ -0,0 +1,112 @@
+import threading
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class KeywordMatcher:
+    """Aho-Corasick法で複数キーワードを1回の走査で検出する"""
+
+    def __init__(self, keywords: Iterable[str] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 各状態で終わるキーワード（自身の分のみ）と、失敗遷移先の分も合わせた出力
+        self._own_output: List[List[str]] = [[]]
+        self._output: List[List[str]] = [[]]
+        self._keywords = set()
+        self._built = False
+        self._build_lock = threading.Lock()
+
+        for keyword in keywords:
+            self.add(keyword)
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword in self._keywords
+
+    def add(self, keyword: str):
+        """キーワードを追加（追加後は再構築が必要）"""
+        if not keyword or keyword in self._keywords:
+            return
+
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._own_output.append([])
+            state = next_state
+
+        self._own_output[state].append(keyword)
+        self._keywords.add(keyword)
+        self._built = False
+
+    def build(self):
+        """失敗遷移を計算してオートマトンを完成させる（何度呼んでも同じ結果になる）"""
+        with self._build_lock:
+            self._build()
+
+    def _build(self):
+        output = [list(keywords) for keywords in self._own_output]
+        queue = deque()
+        for next_state in self._goto[0].values():
+            self._fail[next_state] = 0
+            queue.append(next_state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+
+                # 失敗遷移先で終わるキーワードもこの状態で一致する
+                output[next_state] = output[next_state] + output[self._fail[next_state]]
+
+        self._output = output
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """(開始位置, 終了位置, キーワード) を出現順に列挙（重複一致も含む）"""
+        if not self._built:
+            with self._build_lock:
+                # 複数スレッドから同時に呼ばれても構築は1回だけ
+                if not self._built:
+                    self._build()
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            if output[state]:
+                end = index + 1
+                for keyword in output[state]:
+                    yield end - len(keyword), end, keyword
+
+    def count(self, text: str) -> Dict[str, int]:
+        """テキスト中の各キーワードの出現回数を集計"""
+        counts: Dict[str, int] = {}
+        for _, _, keyword in self.iter_matches(text):
+            counts[keyword] = counts.get(keyword, 0) + 1
+        return counts
+
+    def find_all(self, text: str) -> List[str]:
+        """テキストに含まれるキーワードを初出順に返す"""
+        found: Dict[str, None] = {}
+        for _, _, keyword in self.iter_matches(text):
+            found.setdefault(keyword, None)
+        return list(found)
@@ -8,20 +8,28 @@ from collections import defaultdict
 import pickle
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # GUI不要のバックエンドを使用
+from .tokenizer import JapaneseTokenizer
 
 
 class KnowledgeNetworkManager:
-    def __init__(self, output_dir: str = "./knowledge_network"):
+    def __init__(self, output_dir: str = "./knowledge_network", tokenizer: Optional[JapaneseTokenizer] = None):
+        """tokenizerを指定すると、TF-IDFの語を共有トークナイザーの分かち書きから作る
+
+        指定しない場合はscikit-learnの既定の区切りを使う。
+        """
         self.output_dir = output_dir
         self.graph = nx.Graph()
         self.article_vectors = {}
+        self.tokenizer = tokenizer
+        tokenizer_options = {}
+        if tokenizer is not None:
+            # 小文字化すると本文とキャッシュのキーが変わるので、解析前の変換はしない
+            tokenizer_options = {'tokenizer': tokenizer.words, 'token_pattern': None, 'lowercase': False}
         self.vectorizer = TfidfVectorizer(
             max_features=1000,
             stop_words=None,  # 日本語のストップワードは別途設定
-            ngram_range=(1, 2)
+            ngram_range=(1, 2),
+            **tokenizer_options
         )
         self.topic_clusters = {}
         self.relationship_matrix = None
@@ -79,6 +87,10 @@ class KnowledgeNetworkManager:
         if len(contents) < 2:
             return
         
+        if self.tokenizer is not None:
+            # 記事をまとめて解析してキャッシュに載せる（同じ本文は1回だけ解析する）
+            self.tokenizer.tokenize_many(contents)
+        
         # TF-IDFベクトル化
         tfidf_matrix = self.vectorizer.fit_transform(contents)
         
@@ -261,6 +273,11 @@ class KnowledgeNetworkManager:
         if self.graph.number_of_nodes() == 0:
             return
         
+        # matplotlibは描画時のみ読み込む
+        import matplotlib
+        matplotlib.use('Agg')  # GUI不要のバックエンドを使用
+        import matplotlib.pyplot as plt
+        
         plt.figure(figsize=(15, 10))
         
         # レイアウトを計算
@@ -1,67 +1,298 @@
 import requests
 import re
-from typing import List, Dict, Optional, Tuple
+from itertools import islice
+from typing import Any, Awaitable, Callable, Iterable, List, Dict, Optional, Tuple
 from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
 import asyncio
+import html
 import aiohttp
 import time
 from datetime import datetime
 import json
+from .host_scheduler import HostScheduler, parse_retry_after
+from .link_reporter import StreamingLinkReporter
+from .link_store import LinkStatusStore
+
+
+# <a>開始タグを探す（コメントとscript要素は読み飛ばすために同時に照合）
+ANCHOR_SCANNER = re.compile(r'<!--.*?-->|<script\b.*?</script\s*>|<a\b(?P<attrs>[^>]*)>', re.IGNORECASE | re.DOTALL)
+HREF_ATTRIBUTE = re.compile(r'''(?:^|\s)href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))''', re.IGNORECASE)
+ANCHOR_END = re.compile(r'</a\s*>|<a\b', re.IGNORECASE)
+INNER_TAG = re.compile(r'<[^>]*>')
+URL_NETLOC = re.compile(r'[A-Za-z][A-Za-z0-9+.-]*://([^/?#]*)')
+
+# ストリーミング監査で一度にリンクを抽出・チェックする記事数
+STREAM_AUDIT_BATCH_SIZE = 200
+
+
+def run_sync(coroutine_function: Callable[..., Awaitable], *args, **kwargs) -> Any:
+    """非同期メソッドを同期的に実行（同期版メソッドの共通処理）
+
+    実行中のイベントループの中ではasyncio.run()を使えないため、非同期版をawaitするよう案内する。
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine_function(*args, **kwargs))
+    raise RuntimeError(
+        f"Cannot run {coroutine_function.__name__} synchronously inside a running event loop; "
+        f"use 'await {coroutine_function.__name__}(...)' instead"
+    )
 
 
 class LinkChecker:
-    def __init__(self, timeout: int = 10, max_retries: int = 3):
+    RETRYABLE_STATUSES = (429, 503)
+    # HEADを受け付けないサーバーが返しがちなステータス（GETで確認し直す）
+    HEAD_FALLBACK_STATUSES = (400, 403, 404, 405, 406, 500, 501)
+    # GETフォールバック時は先頭1バイトだけを要求し、本文はダウンロードしない
+    RANGE_HEADERS = ({'Range': 'bytes=0-0'}, {})
+    MAX_RANGE_BODY = 1024
+    
+    def __init__(self,
+                 timeout: int = 10,
+                 max_retries: int = 3,
+                 cache_db: Optional[str] = None,
+                 per_host_limit: int = 2,
+                 min_host_delay: float = 0.5,
+                 dns_cache_ttl: int = 300):
         self.timeout = timeout
         self.max_retries = max_retries
+        # 同一ホストへの同時接続数・リクエスト間隔・Retry-Afterが無い場合の待機秒数
+        self.per_host_limit = per_host_limit
+        self.min_host_delay = min_host_delay
+        self.default_retry_after = 5.0
+        self.dns_cache_ttl = dns_cache_ttl
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         self.link_cache = {}
+        # cache_dbを指定するとチェック結果を有効期限付きで永続化
+        self.link_store = LinkStatusStore(cache_db) if cache_db else None
         
     def extract_links_from_content(self, content: str, base_url: str = None) -> List[Dict]:
-        """記事コンテンツからリンクを抽出"""
-        soup = BeautifulSoup(content, 'html.parser')
+        """記事コンテンツからリンクを抽出
+        
+        DOMを構築せずに<a>タグを正規表現で走査する。
+        要素のHTMLはコピーせず、元コンテンツ内の位置 (開始, 終了) を element_span に保持する。
+        """
         links = []
+        # 基準URLのドメインは記事ごとに1回だけ解析
+        base_domain = urlparse(base_url).netloc if base_url else None
         
-        for link in soup.find_all('a', href=True):
-            url = link['href']
-            text = link.get_text(strip=True)
+        for match in ANCHOR_SCANNER.finditer(content):
+            attributes = match.group('attrs')
+            if attributes is None:
+                continue  # コメント・script内は対象外
+            
+            href = HREF_ATTRIBUTE.search(attributes)
+            if not href:
+                continue
+            
+            url = next(value for value in href.groups() if value is not None)
+            if '&' in url:
+                url = html.unescape(url)
+            
+            # リンクテキストは次の</a>（閉じ忘れの場合は次の<a>）まで
+            tag_end = match.end()
+            closing = ANCHOR_END.search(content, tag_end)
+            if closing:
+                text_end = closing.start()
+                element_end = closing.end() if closing.group().startswith('</') else closing.start()
+            else:
+                text_end = element_end = len(content)
+            
+            inner = content[tag_end:text_end]
+            parts = INNER_TAG.split(inner) if '<' in inner else [inner]
+            text = ''.join(
+                (html.unescape(part) if '&' in part else part).strip()
+                for part in parts
+            )
             
             # 相対URLを絶対URLに変換
             if base_url and not url.startswith(('http://', 'https://')):
                 url = urljoin(base_url, url)
             
             # 内部リンクかどうかを判定
-            is_internal = self._is_internal_link(url, base_url)
+            is_internal = base_domain is not None and self._link_domain(url) == base_domain
             
             links.append({
                 'url': url,
                 'text': text,
                 'is_internal': is_internal,
-                'element': str(link)
+                'element_span': (match.start(), element_end)
             })
         
         return links
     
+    @staticmethod
+    def get_link_element(content: str, link: Dict) -> str:
+        """element_spanから<a>要素のHTMLを取り出す"""
+        start, end = link['element_span']
+        return content[start:end]
+    
+    def _link_domain(self, url: str) -> Optional[str]:
+        """URLのドメイン部分（urlparse().netlocと同じ値）"""
+        match = URL_NETLOC.match(url)
+        if match:
+            return match.group(1)
+        try:
+            return urlparse(url).netloc
+        except ValueError:
+            return None
+    
     def _is_internal_link(self, url: str, base_url: str) -> bool:
         """内部リンクかどうかを判定"""
         if not base_url:
             return False
         
-        try:
-            base_domain = urlparse(base_url).netloc
-            link_domain = urlparse(url).netloc
-            return base_domain == link_domain
-        except:
-            return False
+        return self._link_domain(base_url) == self._link_domain(url)
     
-    def check_single_link(self, url: str) -> Dict:
-        """単一のリンクをチェック"""
+    def _get_cached_result(self, url: str) -> Optional[Dict]:
+        """メモリキャッシュ、次に永続ストアから有効な結果を取得"""
         if url in self.link_cache:
             return self.link_cache[url]
         
+        if self.link_store:
+            stored = self.link_store.get(url)
+            if stored:
+                self.link_cache[url] = stored
+                return stored
+        
+        return None
+    
+    def _get_conditional_headers(self, url: str) -> Dict[str, str]:
+        """前回のETag/Last-Modifiedから条件付きリクエストのヘッダーを生成"""
+        if not self.link_store:
+            return {}
+        return self.link_store.get_validators(url)
+    
+    def _classify_status(self, status_code: int) -> str:
+        """HTTPステータスコードをリンク状態に分類"""
+        if status_code in [200, 206]:
+            return 'valid'
+        elif status_code in [301, 302, 303, 307, 308]:
+            return 'redirect'
+        elif status_code == 404:
+            return 'not_found'
+        elif status_code >= 400:
+            return 'error'
+        return 'warning'
+    
+    def _record_result(self, result: Dict, response_headers=None, cache: bool = True) -> Dict:
+        """チェック結果をキャッシュと永続ストアに記録（cache=Falseならメモリキャッシュには載せない）"""
+        url = result['url']
+        response_headers = response_headers or {}
+        
+        if self.link_store and result['status_code'] == 304:
+            # 変更なし: 前回の結果を引き継いで有効期限だけ更新
+            previous = self.link_store.get(url, include_expired=True)
+            if previous:
+                previous.update({
+                    'checked_at': result['checked_at'],
+                    'response_time': result['response_time'],
+                    'revalidated': True
+                })
+                result = previous
+        
+        if cache:
+            self.link_cache[url] = result
+        
+        if self.link_store:
+            self.link_store.save(
+                result,
+                etag=response_headers.get('ETag'),
+                last_modified=response_headers.get('Last-Modified')
+            )
+        
+        return result
+    
+    def _header_bytes(self, headers) -> int:
+        """レスポンスヘッダーの概算バイト数（"名前: 値\r\n"）"""
+        return sum(len(name) + len(value) + 4 for name, value in headers.items())
+    
+    def _probe_sync(self, url: str, conditional_headers: Dict[str, str]) -> Tuple[requests.Response, str, int]:
+        """HEADで確認し、拒否された場合はヘッダーだけを読むGETにフォールバック"""
+        response = self.session.head(
+            url,
+            timeout=self.timeout,
+            allow_redirects=True,
+            headers=conditional_headers
+        )
+        bytes_transferred = sum(self._header_bytes(r.headers) for r in response.history + [response])
+        
+        if response.status_code not in self.HEAD_FALLBACK_STATUSES:
+            return response, 'HEAD', bytes_transferred
+        
+        for range_headers in self.RANGE_HEADERS:
+            response = self.session.get(
+                url,
+                timeout=self.timeout,
+                allow_redirects=True,
+                stream=True,
+                headers={**conditional_headers, **range_headers}
+            )
+            bytes_transferred += sum(self._header_bytes(r.headers) for r in response.history + [response])
+            
+            content_length = int(response.headers.get('Content-Length') or self.MAX_RANGE_BODY + 1)
+            if response.status_code == 206 and content_length <= self.MAX_RANGE_BODY:
+                # 小さな部分レスポンスは読み切って接続を再利用する
+                bytes_transferred += len(response.content)
+            else:
+                response.close()
+            
+            # Rangeを受け付けないサーバーにはRangeなしで再試行
+            if response.status_code != 416:
+                break
+        
+        return response, 'GET', bytes_transferred
+    
+    async def _probe_async(self, session, url: str, conditional_headers: Dict[str, str], timeout):
+        """_probe_syncの非同期版"""
+        async with session.head(
+            url,
+            timeout=timeout,
+            allow_redirects=True,
+            headers=conditional_headers
+        ) as response:
+            bytes_transferred = sum(
+                len(name) + len(value) + 4
+                for r in response.history + (response,)
+                for name, value in r.raw_headers
+            )
+        
+        if response.status not in self.HEAD_FALLBACK_STATUSES:
+            return response, 'HEAD', bytes_transferred
+        
+        for range_headers in self.RANGE_HEADERS:
+            async with session.get(
+                url,
+                timeout=timeout,
+                allow_redirects=True,
+                headers={**conditional_headers, **range_headers}
+            ) as response:
+                bytes_transferred += sum(
+                    len(name) + len(value) + 4
+                    for r in response.history + (response,)
+                    for name, value in r.raw_headers
+                )
+                
+                content_length = response.content_length
+                if response.status == 206 and content_length is not None and content_length <= self.MAX_RANGE_BODY:
+                    bytes_transferred += len(await response.read())
+                # それ以外は本文を読まずに閉じる
+            
+            if response.status != 416:
+                break
+        
+        return response, 'GET', bytes_transferred
+    
+    def check_single_link(self, url: str) -> Dict:
+        """単一のリンクをチェック"""
+        cached = self._get_cached_result(url)
+        if cached:
+            return cached
+        
         result = {
             'url': url,
             'status': 'unknown',
@@ -72,34 +303,28 @@ class LinkChecker:
             'response_time': None,
             'checked_at': datetime.now().isoformat()
         }
+        response_headers = None
         
         start_time = time.time()
         
         try:
-            response = self.session.get(
-                url, 
-                timeout=self.timeout,
-                allow_redirects=True
+            response, probe_method, bytes_transferred = self._probe_sync(
+                url,
+                self._get_conditional_headers(url)
             )
             
             result['status_code'] = response.status_code
             result['final_url'] = response.url
             result['response_time'] = time.time() - start_time
+            result['probe_method'] = probe_method
+            result['bytes_transferred'] = bytes_transferred
+            response_headers = response.headers
             
             # リダイレクトの履歴を記録
             if response.history:
                 result['redirects'] = [r.url for r in response.history]
             
-            if response.status_code == 200:
-                result['status'] = 'valid'
-            elif response.status_code in [301, 302, 303, 307, 308]:
-                result['status'] = 'redirect'
-            elif response.status_code == 404:
-                result['status'] = 'not_found'
-            elif response.status_code >= 400:
-                result['status'] = 'error'
-            else:
-                result['status'] = 'warning'
+            result['status'] = self._classify_status(response.status_code)
                 
         except requests.exceptions.Timeout:
             result['status'] = 'timeout'
@@ -115,81 +340,152 @@ class LinkChecker:
             result['error'] = f'Unexpected error: {str(e)}'
         
         # キャッシュに保存
-        self.link_cache[url] = result
-        return result
+        return self._record_result(result, response_headers)
     
-    async def check_links_async(self, urls: List[str], max_concurrent: int = 10) -> List[Dict]:
-        """非同期でリンクを一括チェック"""
-        semaphore = asyncio.Semaphore(max_concurrent)
+    async def check_links_async(self,
+                                urls: List[str],
+                                max_concurrent: int = 10,
+                                on_result: Optional[Callable[[Dict], None]] = None,
+                                collect: bool = True,
+                                refresh: bool = False) -> List[Dict]:
+        """非同期でリンクを一括チェック（ホストごとの同時接続数と間隔を制御）
+        
+        on_resultを指定すると各URLの結果を確定した順に通知する。
+        collect=Falseの場合は結果の一覧を返さず、結果をメモリキャッシュにも残さない。
+        refresh=Trueの場合はメモリキャッシュと永続ストアの結果を使わず、全URLを確認し直す。
+        """
+        # 永続ストアの有効な結果をまとめて読み込む
+        stored: Dict[str, Dict] = {}
+        if self.link_store and not refresh:
+            pending = [url for url in urls if url not in self.link_cache]
+            stored = self.link_store.get_fresh_results(pending)
+            if collect:
+                self.link_cache.update(stored)
         
         async def check_single_async(session, url):
-            async with semaphore:
-                if url in self.link_cache:
-                    return self.link_cache[url]
-                
-                result = {
-                    'url': url,
-                    'status': 'unknown',
-                    'status_code': None,
-                    'final_url': url,
-                    'redirects': [],
-                    'error': None,
-                    'response_time': None,
-                    'checked_at': datetime.now().isoformat()
-                }
+            result = {
+                'url': url,
+                'status': 'unknown',
+                'status_code': None,
+                'final_url': url,
+                'redirects': [],
+                'error': None,
+                'response_time': None,
+                'checked_at': datetime.now().isoformat()
+            }
+            response_headers = None
+            retry_after = None
+            
+            start_time = time.time()
+            
+            try:
+                timeout = aiohttp.ClientTimeout(total=self.timeout)
+                response, probe_method, bytes_transferred = await self._probe_async(
+                    session,
+                    url,
+                    self._get_conditional_headers(url),
+                    timeout
+                )
+                result['status_code'] = response.status
+                result['final_url'] = str(response.url)
+                result['response_time'] = time.time() - start_time
+                result['probe_method'] = probe_method
+                result['bytes_transferred'] = bytes_transferred
+                result['status'] = self._classify_status(response.status)
+                response_headers = response.headers
                 
-                start_time = time.time()
+                if response.history:
+                    result['redirects'] = [str(r.url) for r in response.history]
                 
-                try:
-                    timeout = aiohttp.ClientTimeout(total=self.timeout)
-                    async with session.get(url, timeout=timeout, allow_redirects=True) as response:
-                        result['status_code'] = response.status
-                        result['final_url'] = str(response.url)
-                        result['response_time'] = time.time() - start_time
+                # 429/503はRetry-Afterに従ってホストを待機させてから再試行
+                if response.status in self.RETRYABLE_STATUSES:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if retry_after is None:
+                        retry_after = self.default_retry_after
                         
-                        if response.status == 200:
-                            result['status'] = 'valid'
-                        elif response.status in [301, 302, 303, 307, 308]:
-                            result['status'] = 'redirect'
-                        elif response.status == 404:
-                            result['status'] = 'not_found'
-                        elif response.status >= 400:
-                            result['status'] = 'error'
-                        else:
-                            result['status'] = 'warning'
-                            
-                except asyncio.TimeoutError:
-                    result['status'] = 'timeout'
-                    result['error'] = 'Request timeout'
-                except aiohttp.ClientError as e:
-                    result['status'] = 'connection_error'
-                    result['error'] = str(e)
-                except Exception as e:
-                    result['status'] = 'error'
-                    result['error'] = f'Unexpected error: {str(e)}'
-                
-                self.link_cache[url] = result
-                return result
-        
-        async with aiohttp.ClientSession(
-            headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        ) as session:
-            tasks = [check_single_async(session, url) for url in urls]
-            return await asyncio.gather(*tasks)
+            except asyncio.TimeoutError:
+                result['status'] = 'timeout'
+                result['error'] = 'Request timeout'
+            except aiohttp.ClientError as e:
+                result['status'] = 'connection_error'
+                result['error'] = str(e)
+            except Exception as e:
+                result['status'] = 'error'
+                result['error'] = f'Unexpected error: {str(e)}'
+            
+            return (result, response_headers), retry_after
+        
+        def handle_result(url, outcome):
+            # 最終結果（再試行を使い切った場合も含む）を記録して通知
+            result, response_headers = outcome
+            recorded = self._record_result(result, response_headers, cache=collect)
+            if on_result:
+                on_result(recorded)
+        
+        unchecked = []
+        for url in dict.fromkeys(urls):
+            cached = None if refresh else self.link_cache.get(url) or stored.pop(url, None)
+            if cached is not None:
+                if on_result:
+                    on_result(cached)
+            else:
+                unchecked.append(url)
+        
+        if unchecked:
+            scheduler = HostScheduler(
+                max_concurrent=max_concurrent,
+                per_host_limit=self.per_host_limit,
+                min_delay=self.min_host_delay,
+                max_retries=self.max_retries
+            )
+            # DNS解決結果をコネクタでキャッシュし、同一ホストへの接続を再利用
+            connector = aiohttp.TCPConnector(
+                limit=max_concurrent,
+                limit_per_host=self.per_host_limit,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+            async with aiohttp.ClientSession(
+                connector=connector,
+                headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+            ) as session:
+                await scheduler.run(
+                    unchecked,
+                    lambda url: check_single_async(session, url),
+                    on_result=handle_result
+                )
+        
+        if not collect:
+            return []
+        return [self.link_cache[url] for url in urls]
     
-    def check_article_links(self, article: Dict) -> Dict:
-        """記事のリンクを全てチェック"""
-        content = article.get('full_content', '') or article.get('content', '')
-        base_url = article.get('url', '')
+    def recheck_expired_links(self, limit: Optional[int] = None, max_concurrent: int = 10) -> List[Dict]:
+        """有効期限切れのリンクだけを再チェック（定期実行用）"""
+        if not self.link_store:
+            return []
         
-        # リンクを抽出
-        links = self.extract_links_from_content(content, base_url)
+        expired_urls = self.link_store.get_expired_urls(limit)
+        if not expired_urls:
+            return []
         
-        # 各リンクをチェック
+        return run_sync(self.check_links_async, expired_urls, max_concurrent, refresh=True)
+    
+    def get_domain_statistics(self) -> Dict[str, Dict]:
+        """永続ストアに蓄積されたドメイン別の統計"""
+        if not self.link_store:
+            return {}
+        return self.link_store.get_domain_statistics()
+    
+    def _extract_article_links(self, article: Dict) -> List[Dict]:
+        """記事本文からリンクを抽出"""
+        content = article.get('full_content', '') or article.get('content', '')
+        base_url = article.get('url', '')
+        return self.extract_links_from_content(content, base_url)
+    
+    def _build_article_result(self, article: Dict, links: List[Dict], results_by_url: Dict[str, Dict]) -> Dict:
+        """チェック結果を記事のリンクに割り当てて記事単位の結果を作成"""
         checked_links = []
         for link in links:
-            check_result = self.check_single_link(link['url'])
-            link.update(check_result)
+            link.update(results_by_url[link['url']])
             checked_links.append(link)
         
         # 統計情報を計算
@@ -204,6 +500,110 @@ class LinkChecker:
             'checked_at': datetime.now().isoformat()
         }
     
+    def check_article_links(self, article: Dict) -> Dict:
+        """記事のリンクを全てチェック（非同期のコードからは audit_articles_async([article]) をawaitする）"""
+        return self.audit_articles([article])[0]
+    
+    async def audit_articles_async(self, articles: List[Dict], max_concurrent: int = 10) -> List[Dict]:
+        """全記事のリンクを重複排除し、一意なURLだけを並行チェックして記事ごとに振り分け"""
+        article_links = [self._extract_article_links(article) for article in articles]
+        
+        # 記事をまたいで同じURLは1回だけチェック
+        unique_urls = list(dict.fromkeys(
+            link['url'] for links in article_links for link in links
+        ))
+        
+        checked = await self.check_links_async(unique_urls, max_concurrent)
+        results_by_url = {result['url']: result for result in checked}
+        
+        return [
+            self._build_article_result(article, links, results_by_url)
+            for article, links in zip(articles, article_links)
+        ]
+    
+    def audit_articles(self, articles: List[Dict], max_concurrent: int = 10) -> List[Dict]:
+        """audit_articles_asyncの同期版"""
+        return run_sync(self.audit_articles_async, articles, max_concurrent)
+    
+    async def stream_audit_async(self,
+                                 articles: Iterable[Dict],
+                                 reporter: StreamingLinkReporter,
+                                 max_concurrent: int = 10,
+                                 batch_size: int = STREAM_AUDIT_BATCH_SIZE) -> Dict:
+        """全記事のリンクをチェックし、記事のリンクが揃った順にレポーターへ書き出す
+        
+        記事はbatch_size件ずつリンクを抽出してチェックし、結果はメモリキャッシュに残さないので、
+        記事数が増えてもメモリ使用量は増えない。バッチをまたいで出てくるURLは、
+        永続ストアがあれば有効期限内の結果を使い、なければ確認し直す。
+        """
+        iterator = iter(articles)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                break
+            await self._stream_audit_batch(batch, reporter, max_concurrent)
+        
+        return reporter.close()
+    
+    async def _stream_audit_batch(self, articles: List[Dict], reporter: StreamingLinkReporter, max_concurrent: int):
+        """1バッチ分の記事のリンクをチェックして書き出す"""
+        article_links = [self._extract_article_links(article) for article in articles]
+        
+        # URL → そのURLの結果を待っている記事のインデックス
+        waiting: Dict[str, List[int]] = {}
+        remaining = []
+        for index, links in enumerate(article_links):
+            unique_urls = set(link['url'] for link in links)
+            remaining.append(len(unique_urls))
+            for url in unique_urls:
+                waiting.setdefault(url, []).append(index)
+        
+        # URL → 結果と、その結果をまだ書き出していない記事の数
+        results: Dict[str, Dict] = {}
+        readers: Dict[str, int] = {}
+        
+        def emit(index: int):
+            links = article_links[index]
+            results_by_url = {link['url']: results[link['url']] for link in links}
+            reporter.add_article_result(self._build_article_result(articles[index], links, results_by_url))
+            # 書き出し済みの記事と、どの記事も待っていない結果は解放する
+            article_links[index] = None
+            articles[index] = None
+            for url in results_by_url:
+                readers[url] -= 1
+                if readers[url] == 0:
+                    del readers[url]
+                    del results[url]
+        
+        def on_result(result: Dict):
+            indices = waiting.pop(result['url'], [])
+            if not indices:
+                return
+            results[result['url']] = result
+            readers[result['url']] = len(indices)
+            for index in indices:
+                remaining[index] -= 1
+                if remaining[index] == 0:
+                    emit(index)
+        
+        for index, count in enumerate(remaining):
+            if count == 0:
+                emit(index)
+        
+        await self.check_links_async(list(waiting), max_concurrent, on_result=on_result, collect=False)
+    
+    def stream_audit(self,
+                     articles: Iterable[Dict],
+                     output_prefix: str,
+                     max_concurrent: int = 10,
+                     batch_size: int = STREAM_AUDIT_BATCH_SIZE) -> Dict:
+        """stream_audit_asyncの同期版（Markdown・JSON Lines・CSVを出力）"""
+        reporter = StreamingLinkReporter(output_prefix)
+        try:
+            return run_sync(self.stream_audit_async, articles, reporter, max_concurrent, batch_size)
+        finally:
+            reporter.close()
+    
     def _calculate_link_stats(self, links: List[Dict]) -> Dict:
         """リンクの統計情報を計算"""
         stats = {
@@ -214,10 +614,13 @@ class LinkChecker:
             'timeouts': 0,
             'errors': 0,
             'internal': 0,
-            'external': 0
+            'external': 0,
+            'bytes_transferred': 0
         }
         
         for link in links:
+            stats['bytes_transferred'] += link.get('bytes_transferred') or 0
+            
             if link.get('is_internal'):
                 stats['internal'] += 1
             else:
@@ -0,0 +1,227 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .link_checker import LinkChecker, run_sync
+
+
+DAY_SECONDS = 24 * 3600
+
+
+class LinkMonitor:
+    """LinkCheckerを使ってアーカイブ全体のリンクを継続的に監視する
+
+    監視対象のリンクは次回チェック予定時刻の順に並ぶキューとしてSQLiteに保存し、
+    再起動後もそのまま続きから処理する。1日あたりの総チェック数を均等に割り振るため、
+    バッチの間隔はキュー全体の必要チェック数から計算する。
+    """
+
+    def __init__(self,
+                 checker: LinkChecker,
+                 state_db: str = "link_monitor.db",
+                 min_interval_days: float = 1,
+                 max_interval_days: float = 7,
+                 batch_size: int = 5):
+        self.checker = checker
+        self.state_db = state_db
+        self.min_interval = min_interval_days * DAY_SECONDS
+        self.max_interval = max_interval_days * DAY_SECONDS
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(state_db, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS monitored_links (
+                    url TEXT PRIMARY KEY,
+                    article_url TEXT,
+                    priority REAL NOT NULL,
+                    next_due REAL NOT NULL,
+                    last_status TEXT,
+                    last_checked TEXT
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_monitored_links_due ON monitored_links (next_due)")
+
+    def _article_age_days(self, article: Dict) -> Optional[float]:
+        date_str = article.get('date')
+        if not date_str:
+            return None
+
+        try:
+            if 'T' in date_str:
+                article_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+            else:
+                article_date = datetime.strptime(date_str, '%Y-%m-%d')
+        except (ValueError, TypeError):
+            return None
+
+        now = datetime.now(article_date.tzinfo) if article_date.tzinfo else datetime.now()
+        return max((now - article_date).total_seconds() / DAY_SECONDS, 0.0)
+
+    def calculate_priority(self, article: Dict, traffic: Optional[Dict[str, float]] = None, max_traffic: float = 0) -> float:
+        """最近公開された記事・アクセスの多い記事ほど高い優先度（0〜1）"""
+        age_days = self._article_age_days(article)
+        recency = 1 / (1 + age_days / 30) if age_days is not None else 0.0
+
+        if not traffic or max_traffic <= 0:
+            return recency
+
+        views = traffic.get(article.get('url', ''), 0)
+        return 0.6 * recency + 0.4 * (views / max_traffic)
+
+    def revisit_interval(self, priority: float) -> float:
+        """優先度に応じた再チェック間隔（秒）"""
+        priority = min(max(priority, 0.0), 1.0)
+        return self.max_interval - (self.max_interval - self.min_interval) * priority
+
+    def register_articles(self, articles: List[Dict], traffic: Optional[Dict[str, float]] = None) -> int:
+        """記事のリンクを監視キューに登録（既存リンクは優先度のみ更新）
+
+        登録した記事から消えたリンクは監視キューから外す。
+        """
+        max_traffic = max(traffic.values()) if traffic else 0
+        priorities: Dict[str, Dict] = {}
+
+        for article in articles:
+            priority = self.calculate_priority(article, traffic, max_traffic)
+            content = article.get('full_content', '') or article.get('content', '')
+            for link in self.checker.extract_links_from_content(content, article.get('url', '')):
+                # 複数の記事に出てくるリンクは最も高い優先度を採用
+                current = priorities.get(link['url'])
+                if current is None or priority > current['priority']:
+                    priorities[link['url']] = {'priority': priority, 'article_url': article.get('url', '')}
+
+        with self._lock:
+            known = {
+                row['url'] for row in self.conn.execute("SELECT url FROM monitored_links")
+            }
+
+        new_urls = [url for url in priorities if url not in known]
+        now = time.time()
+        # 新規リンクは最短間隔の中に均等にばらして初回チェックが集中しないようにする
+        spacing = self.min_interval / len(new_urls) if new_urls else 0
+
+        article_urls = [article.get('url', '') for article in articles]
+
+        with self._lock, self.conn:
+            # 今回登録した記事に紐づいていたが、どの記事にも含まれなくなったリンクを削除
+            for article_url in article_urls:
+                stale = [
+                    row['url'] for row in self.conn.execute(
+                        "SELECT url FROM monitored_links WHERE article_url = ?", (article_url,)
+                    )
+                    if row['url'] not in priorities
+                ]
+                self.conn.executemany("DELETE FROM monitored_links WHERE url = ?", [(url,) for url in stale])
+            for url, info in priorities.items():
+                if url in known:
+                    self.conn.execute(
+                        "UPDATE monitored_links SET priority = ?, article_url = ? WHERE url = ?",
+                        (info['priority'], info['article_url'], url)
+                    )
+            self.conn.executemany(
+                "INSERT INTO monitored_links (url, article_url, priority, next_due) VALUES (?, ?, ?, ?)",
+                [
+                    (url, priorities[url]['article_url'], priorities[url]['priority'], now + i * spacing)
+                    for i, url in enumerate(sorted(new_urls, key=lambda u: -priorities[u]['priority']))
+                ]
+            )
+
+        return len(new_urls)
+
+    def next_due(self) -> Optional[float]:
+        """次にチェック予定のリンクの時刻"""
+        with self._lock:
+            row = self.conn.execute("SELECT MIN(next_due) AS due FROM monitored_links").fetchone()
+        return row['due']
+
+    def pacing_interval(self) -> float:
+        """1日の必要チェック数からバッチ間の最小間隔を計算"""
+        # revisit_interval と同じ式をSQL側で集計する
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT SUM(? / (? - ? * MIN(MAX(priority, 0.0), 1.0))) AS daily FROM monitored_links",
+                (DAY_SECONDS, self.max_interval, self.max_interval - self.min_interval)
+            ).fetchone()
+
+        daily_checks = row['daily'] or 0
+        if daily_checks <= 0:
+            return DAY_SECONDS
+        return DAY_SECONDS / daily_checks * self.batch_size
+
+    def run_once(self, now: Optional[float] = None) -> List[Dict]:
+        """期限が来たリンクを1バッチ分チェックして次回予定を更新"""
+        now = now or time.time()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT url, priority FROM monitored_links WHERE next_due <= ? ORDER BY next_due LIMIT ?",
+                (now, self.batch_size)
+            ).fetchall()
+
+        if not rows:
+            return []
+
+        urls = [row['url'] for row in rows]
+        # 期限が来たリンクはストアの結果が有効期限内でも実際に確認し直す
+        results = run_sync(self.checker.check_links_async, urls, max_concurrent=self.batch_size, refresh=True)
+
+        updates = []
+        for row, result in zip(rows, results):
+            interval = self.revisit_interval(row['priority'])
+            if self.checker.link_store:
+                # エラーやタイムアウトはストアの短い有効期限に合わせて早めに再確認
+                interval = min(interval, self.checker.link_store.ttl_for(result['status']))
+            updates.append((now + interval, result['status'], result['checked_at'], row['url']))
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE monitored_links SET next_due = ?, last_status = ?, last_checked = ? WHERE url = ?",
+                updates
+            )
+
+        return results
+
+    def run_forever(self, stop_event: Optional[threading.Event] = None, idle_seconds: float = 600):
+        """停止要求があるまで、次回予定時刻とペース配分に従ってチェックを続ける"""
+        stop_event = stop_event or threading.Event()
+        last_batch = 0.0
+
+        while not stop_event.is_set():
+            due = self.next_due()
+            now = time.time()
+
+            if due is None:
+                stop_event.wait(idle_seconds)
+                continue
+
+            wait = max(due - now, last_batch + self.pacing_interval() - now, 0)
+            if wait > 0:
+                stop_event.wait(wait)
+                continue
+
+            last_batch = time.time()
+            results = self.run_once(last_batch)
+            for result in results:
+                if result['status'] not in ['valid', 'redirect']:
+                    print(f"Link problem: {result['status']} {result['url']}")
+
+    def get_status_summary(self) -> Dict:
+        """監視キューの状態を集計"""
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT COALESCE(last_status, 'pending') AS status, COUNT(*) AS count
+                FROM monitored_links
+                GROUP BY COALESCE(last_status, 'pending')
+            """).fetchall()
+        return {row['status']: row['count'] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
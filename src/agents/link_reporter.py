@@ -0,0 +1,145 @@
+import csv
+import json
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+
+class StreamingLinkReporter:
+    """リンクチェック結果を受け取った順にMarkdown・JSON Lines・CSVへ書き出す
+
+    結果そのものは保持せず、集計値だけをメモリに持つ。
+    各記事の書き込み後にflushするので、実行中でも途中経過を読める。
+    """
+
+    CSV_FIELDS = [
+        'article_title', 'article_url', 'url', 'text', 'is_internal', 'status',
+        'status_code', 'final_url', 'error', 'response_time', 'bytes_transferred', 'checked_at'
+    ]
+
+    def __init__(self, output_prefix: str):
+        self.markdown_path = f"{output_prefix}.md"
+        self.json_path = f"{output_prefix}.jsonl"
+        self.csv_path = f"{output_prefix}.csv"
+
+        output_dir = os.path.dirname(output_prefix)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        self.totals = {
+            'articles': 0,
+            'links': 0,
+            'valid': 0,
+            'invalid': 0,
+            'redirects': 0,
+            'timeouts': 0,
+            'errors': 0,
+            'internal': 0,
+            'external': 0,
+            'bytes_transferred': 0
+        }
+        self.status_counts: Dict[str, int] = {}
+        self.started_at = datetime.now()
+        self.closed = False
+
+        self._markdown = open(self.markdown_path, 'w', encoding='utf-8')
+        self._json = open(self.json_path, 'w', encoding='utf-8')
+        self._csv_file = open(self.csv_path, 'w', encoding='utf-8', newline='')
+        self._csv = csv.DictWriter(self._csv_file, fieldnames=self.CSV_FIELDS, extrasaction='ignore')
+        self._csv.writeheader()
+
+        self._markdown.write("# リンクチェック報告書\n")
+        self._markdown.write(f"開始日時: {self.started_at.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        self._markdown.write("## 記事別の問題とリダイレクト\n\n")
+        self._flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _flush(self):
+        self._markdown.flush()
+        self._json.flush()
+        self._csv_file.flush()
+
+    def add_article_result(self, result: Dict):
+        """記事単位のチェック結果を1件書き出して集計に加える"""
+        problem_lines = []
+        redirect_lines = []
+
+        for link in result['links']:
+            row = dict(link, article_title=result['article_title'], article_url=result['article_url'])
+            self._json.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self._csv.writerow(row)
+
+            status = link.get('status', 'unknown')
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+            # 問題・リダイレクトの振り分けを1回の走査で行う
+            if status == 'redirect':
+                redirect_lines.append(f"- {link['url']} → {link.get('final_url', 'N/A')}")
+            elif status != 'valid':
+                problem_lines.append(f"- **{status}**: {link['url']}")
+                if link.get('error'):
+                    problem_lines.append(f"  - エラー: {link['error']}")
+                problem_lines.append(f"  - リンクテキスト: {link.get('text', 'N/A')}")
+
+        self.totals['articles'] += 1
+        self.totals['links'] += result['total_links']
+        for key, value in result['statistics'].items():
+            if key in self.totals:
+                self.totals[key] += value
+
+        if problem_lines or redirect_lines:
+            self._markdown.write(f"### {result['article_title']}\n")
+            self._markdown.write(f"記事URL: {result['article_url']}\n")
+            if problem_lines:
+                self._markdown.write("#### 問題のあるリンク\n")
+                self._markdown.write("\n".join(problem_lines) + "\n")
+            if redirect_lines:
+                self._markdown.write("#### リダイレクトされたリンク\n")
+                self._markdown.write("\n".join(redirect_lines) + "\n")
+            self._markdown.write("\n")
+
+        self._flush()
+
+    def summary(self) -> Dict:
+        """現時点までの集計値"""
+        return {
+            **self.totals,
+            'status_counts': dict(self.status_counts),
+            'started_at': self.started_at.isoformat(),
+            'updated_at': datetime.now().isoformat()
+        }
+
+    def close(self) -> Optional[Dict]:
+        """全体統計を書き出してファイルを閉じる"""
+        if self.closed:
+            return None
+
+        total_links = self.totals['links']
+        total_valid = self.totals['valid']
+        total_invalid = self.totals['invalid']
+
+        self._markdown.write("## 全体統計\n")
+        self._markdown.write(f"- 対象記事数: {self.totals['articles']}\n")
+        self._markdown.write(f"- 総リンク数: {total_links}\n")
+        if total_links > 0:
+            self._markdown.write(f"- 有効リンク: {total_valid} ({total_valid/total_links*100:.1f}%)\n")
+            self._markdown.write(f"- 無効リンク: {total_invalid} ({total_invalid/total_links*100:.1f}%)\n")
+        else:
+            self._markdown.write("- 有効リンク: 0\n")
+            self._markdown.write("- 無効リンク: 0\n")
+        self._markdown.write(f"- リダイレクト: {self.totals['redirects']}\n")
+        self._markdown.write(f"- 転送量: {self.totals['bytes_transferred']} bytes\n")
+        self._markdown.write(f"完了日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+        summary = self.summary()
+        self._markdown.close()
+        self._json.close()
+        self._csv_file.close()
+        self.closed = True
+
+        return summary
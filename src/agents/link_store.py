@@ -0,0 +1,210 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+
+# ステータスごとの有効期限（秒）
+DEFAULT_STATUS_TTLS = {
+    'valid': 7 * 24 * 3600,
+    'redirect': 3 * 24 * 3600,
+    'warning': 24 * 3600,
+    'not_found': 24 * 3600,
+    'error': 3600,
+    'connection_error': 1800,
+    'timeout': 900,
+    'unknown': 900,
+}
+
+
+class LinkStatusStore:
+    """リンクチェック結果をSQLiteに永続化し、ステータス別の有効期限で管理"""
+
+    def __init__(self, db_path: str = "link_status.db", status_ttls: Optional[Dict[str, int]] = None):
+        self.db_path = db_path
+        self.status_ttls = dict(DEFAULT_STATUS_TTLS)
+        if status_ttls:
+            self.status_ttls.update(status_ttls)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS link_status (
+                    url TEXT PRIMARY KEY,
+                    domain TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    status_code INTEGER,
+                    final_url TEXT,
+                    redirects TEXT,
+                    error TEXT,
+                    response_time REAL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    checked_at TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_link_status_domain ON link_status (domain)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_link_status_expires ON link_status (expires_at)")
+
+    def ttl_for(self, status: str) -> int:
+        """ステータスに対応する有効期限（秒）"""
+        return self.status_ttls.get(status, self.status_ttls['unknown'])
+
+    def _row_to_result(self, row: sqlite3.Row) -> Dict:
+        return {
+            'url': row['url'],
+            'status': row['status'],
+            'status_code': row['status_code'],
+            'final_url': row['final_url'],
+            'redirects': json.loads(row['redirects']) if row['redirects'] else [],
+            'error': row['error'],
+            'response_time': row['response_time'],
+            'checked_at': row['checked_at'],
+        }
+
+    def get(self, url: str, include_expired: bool = False) -> Optional[Dict]:
+        """保存済みの結果を取得（期限切れは既定で除外）"""
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM link_status WHERE url = ?", (url,)).fetchone()
+
+        if row is None:
+            return None
+        if not include_expired and row['expires_at'] <= time.time():
+            return None
+        return self._row_to_result(row)
+
+    def get_fresh_results(self, urls: Iterable[str]) -> Dict[str, Dict]:
+        """有効期限内の結果をまとめて取得"""
+        urls = list(dict.fromkeys(urls))
+        results = {}
+        now = time.time()
+
+        # SQLiteの変数上限を超えないよう分割して問い合わせ
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT * FROM link_status WHERE url IN ({placeholders}) AND expires_at > ?",
+                    (*chunk, now)
+                ).fetchall()
+            for row in rows:
+                results[row['url']] = self._row_to_result(row)
+
+        return results
+
+    def get_validators(self, url: str) -> Dict[str, str]:
+        """条件付きリクエスト用のヘッダーを生成"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified FROM link_status WHERE url = ?", (url,)
+            ).fetchone()
+
+        headers = {}
+        if row is not None:
+            if row['etag']:
+                headers['If-None-Match'] = row['etag']
+            if row['last_modified']:
+                headers['If-Modified-Since'] = row['last_modified']
+        return headers
+
+    def save(self, result: Dict, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """チェック結果を保存（ステータスに応じて有効期限を設定）"""
+        status = result.get('status', 'unknown')
+        expires_at = time.time() + self.ttl_for(status)
+
+        with self._lock, self.conn:
+            self.conn.execute("""
+                INSERT INTO link_status (
+                    url, domain, status, status_code, final_url, redirects, error,
+                    response_time, etag, last_modified, checked_at, expires_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    domain = excluded.domain,
+                    status = excluded.status,
+                    status_code = excluded.status_code,
+                    final_url = excluded.final_url,
+                    redirects = excluded.redirects,
+                    error = excluded.error,
+                    response_time = excluded.response_time,
+                    etag = COALESCE(excluded.etag, link_status.etag),
+                    last_modified = COALESCE(excluded.last_modified, link_status.last_modified),
+                    checked_at = excluded.checked_at,
+                    expires_at = excluded.expires_at
+            """, (
+                result['url'],
+                urlparse(result['url']).netloc.lower(),
+                status,
+                result.get('status_code'),
+                result.get('final_url'),
+                json.dumps(result.get('redirects') or [], ensure_ascii=False),
+                result.get('error'),
+                result.get('response_time'),
+                etag,
+                last_modified,
+                result.get('checked_at') or datetime.now().isoformat(),
+                expires_at,
+            ))
+
+    def get_expired_urls(self, limit: Optional[int] = None) -> List[str]:
+        """再チェックが必要なURLを期限の古い順に取得"""
+        query = "SELECT url FROM link_status WHERE expires_at <= ? ORDER BY expires_at"
+        params = [time.time()]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            return [row['url'] for row in self.conn.execute(query, params)]
+
+    def get_domain_statistics(self) -> Dict[str, Dict]:
+        """ドメインごとのリンク状態の統計"""
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT
+                    domain,
+                    COUNT(*) AS total,
+                    SUM(status = 'valid') AS valid,
+                    SUM(status = 'redirect') AS redirects,
+                    SUM(status IN ('not_found', 'error')) AS invalid,
+                    SUM(status IN ('timeout', 'connection_error')) AS unreachable,
+                    AVG(response_time) AS avg_response_time,
+                    MAX(checked_at) AS last_checked
+                FROM link_status
+                GROUP BY domain
+                ORDER BY total DESC
+            """).fetchall()
+
+        return {
+            row['domain']: {
+                'total': row['total'],
+                'valid': row['valid'] or 0,
+                'redirects': row['redirects'] or 0,
+                'invalid': row['invalid'] or 0,
+                'unreachable': row['unreachable'] or 0,
+                'avg_response_time': row['avg_response_time'],
+                'last_checked': row['last_checked'],
+            }
+            for row in rows
+        }
+
+    def purge_expired(self, older_than: int = 30 * 24 * 3600) -> int:
+        """長期間期限切れのままのレコードを削除"""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM link_status WHERE expires_at <= ?", (time.time() - older_than,)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -5,6 +5,9 @@ from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import pickle
 
+from .style_rewriter import StyleRewriter
+from .stylometry import StyleFeatures, analyze_corpus
+
 
 class PersonalizationAgent:
     def __init__(self, user_profile_path: str = None):
@@ -17,6 +20,13 @@ class PersonalizationAgent:
             'paragraph_structure': {},
             'tone_indicators': {}
         }
+        
+        self._rewriters: Dict[Tuple, StyleRewriter] = {}
+        
+        # 学習済みの統計量があれば続きから追加学習できるように復元
+        self.style_features = StyleFeatures.from_dict(self.user_profile.get('learned_statistics', {}))
+        if self.style_features.documents:
+            self.writing_patterns = self.style_features.to_patterns()
     
     def _load_user_profile(self) -> Dict:
         """ユーザープロファイルを読み込み"""
@@ -51,8 +61,7 @@ class PersonalizationAgent:
         with open(self.user_profile_path, 'w', encoding='utf-8') as f:
             json.dump(self.user_profile, f, ensure_ascii=False, indent=2)
     
-    def analyze_writing_samples(self, articles: List[Dict]):
-        """執筆サンプルを分析してユーザーの文体パターンを学習"""
+    def _collect_contents(self, articles: List[Dict]) -> List[str]:
         all_content = []
         
         for article in articles:
@@ -60,181 +69,59 @@ class PersonalizationAgent:
             if content:
                 all_content.append(content)
         
+        return all_content
+    
+    def analyze_writing_samples(self, articles: List[Dict]):
+        """執筆サンプルを分析してユーザーの文体パターンを学習（学習済みの統計量は作り直す）"""
+        all_content = self._collect_contents(articles)
         if not all_content:
             return
         
-        # 文末表現の分析
-        self._analyze_sentence_endings(all_content)
-        
-        # 常用フレーズの分析
-        self._analyze_common_phrases(all_content)
-        
-        # 語彙選択の分析
-        self._analyze_vocabulary_patterns(all_content)
-        
-        # 段落構造の分析
-        self._analyze_paragraph_structure(all_content)
-        
-        # トーンの分析
-        self._analyze_tone_indicators(all_content)
+        # 文末・フレーズ・語彙・段落構造・トーンを記事ごとにまとめて集計
+        features = StyleFeatures()
+        features.add_documents(all_content)
+        self.style_features = features
         
         # プロファイルを更新
         self._update_user_profile()
     
-    def _analyze_sentence_endings(self, contents: List[str]):
-        """文末表現の分析"""
-        endings = {}
-        
-        for content in contents:
-            sentences = re.split(r'[。！？]', content)
-            for sentence in sentences:
-                if sentence.strip():
-                    # 文末の2-3文字を抽出
-                    ending = sentence.strip()[-3:]
-                    endings[ending] = endings.get(ending, 0) + 1
-        
-        # 頻度順にソート
-        sorted_endings = sorted(endings.items(), key=lambda x: x[1], reverse=True)
-        self.writing_patterns['sentence_endings'] = dict(sorted_endings[:20])
-    
-    def _analyze_common_phrases(self, contents: List[str]):
-        """常用フレーズの分析"""
-        phrases = {}
-        
-        # よく使われるフレーズパターン
-        phrase_patterns = [
-            r'ということで',
-            r'ちなみに',
-            r'そもそも',
-            r'要するに',
-            r'つまり',
-            r'実際に',
-            r'とりあえず',
-            r'いわゆる',
-            r'一方で',
-            r'しかし',
-            r'また',
-            r'さらに',
-            r'例えば'
-        ]
-        
-        for content in contents:
-            for pattern in phrase_patterns:
-                matches = re.findall(pattern, content)
-                if matches:
-                    phrases[pattern] = phrases.get(pattern, 0) + len(matches)
-        
-        self.writing_patterns['common_phrases'] = phrases
-    
-    def _analyze_vocabulary_patterns(self, contents: List[str]):
-        """語彙選択パターンの分析"""
-        vocabulary = {
-            'katakana_ratio': 0,
-            'technical_terms': [],
-            'informal_expressions': [],
-            'formal_expressions': []
-        }
-        
-        total_chars = 0
-        katakana_chars = 0
-        
-        # カタカナ比率の計算
-        for content in contents:
-            total_chars += len(content)
-            katakana_chars += len(re.findall(r'[ァ-ヴー]', content))
-        
-        if total_chars > 0:
-            vocabulary['katakana_ratio'] = katakana_chars / total_chars
-        
-        # 技術用語の抽出
-        tech_terms = [
-            'API', 'JSON', 'HTML', 'CSS', 'JavaScript', 'Python', 'SQL',
-            'アルゴリズム', 'データベース', 'フレームワーク', 'ライブラリ'
-        ]
-        
-        for content in contents:
-            for term in tech_terms:
-                if term in content:
-                    vocabulary['technical_terms'].append(term)
+    def add_writing_samples(self, articles: List[Dict]):
+        """新しい記事だけを学習済みの統計量に加える（追加した記事数に比例する処理量）"""
+        all_content = self._collect_contents(articles)
+        if not all_content:
+            return
         
-        self.writing_patterns['vocabulary_preferences'] = vocabulary
+        self.style_features.add_documents(all_content)
+        self._update_user_profile()
     
-    def _analyze_paragraph_structure(self, contents: List[str]):
-        """段落構造の分析"""
-        structure_data = {
-            'avg_paragraph_length': 0,
-            'avg_sentences_per_paragraph': 0,
-            'uses_bullet_points': False,
-            'uses_numbered_lists': False
-        }
-        
-        total_paragraphs = 0
-        total_sentences = 0
-        total_chars = 0
-        
-        for content in contents:
-            paragraphs = content.split('\n\n')
-            total_paragraphs += len(paragraphs)
-            
-            for paragraph in paragraphs:
-                if paragraph.strip():
-                    total_chars += len(paragraph)
-                    sentences = re.split(r'[。！？]', paragraph)
-                    total_sentences += len([s for s in sentences if s.strip()])
-            
-            # リストの使用チェック
-            if re.search(r'[・•]', content):
-                structure_data['uses_bullet_points'] = True
-            if re.search(r'\d+[.)]', content):
-                structure_data['uses_numbered_lists'] = True
-        
-        if total_paragraphs > 0:
-            structure_data['avg_paragraph_length'] = total_chars / total_paragraphs
-            structure_data['avg_sentences_per_paragraph'] = total_sentences / total_paragraphs
+    def analyze_writing_corpus(self, paths: List[str], workers: Optional[int] = None, incremental: bool = False):
+        """記事ファイル（JSON Lines / JSON配列）を読みながら複数プロセスで分析
+
+        incremental=True の場合は学習済みの統計量に加える。
+        """
+        features = analyze_corpus(paths, workers=workers)
+        if not features.documents:
+            return
         
-        self.writing_patterns['paragraph_structure'] = structure_data
+        if incremental:
+            self.style_features.merge(features)
+        else:
+            self.style_features = features
+        self._update_user_profile()
     
-    def _analyze_tone_indicators(self, contents: List[str]):
-        """文章のトーンを示す指標を分析"""
-        tone_indicators = {
-            'exclamation_ratio': 0,
-            'question_ratio': 0,
-            'personal_pronouns': {},
-            'emotional_expressions': []
-        }
-        
-        total_sentences = 0
-        exclamations = 0
-        questions = 0
+    def merge_writing_statistics(self, other):
+        """別のブログ・別プロセスで集計した統計量（StyleFeaturesまたはto_dictの結果）を併合"""
+        if isinstance(other, dict):
+            other = StyleFeatures.from_dict(other)
         
-        personal_pronouns = ['私', '僕', '俺', 'わたし', 'ぼく']
-        emotional_expressions = ['すごい', 'とても', 'めちゃくちゃ', '本当に', 'かなり']
-        
-        for content in contents:
-            sentences = re.split(r'[。！？]', content)
-            total_sentences += len(sentences)
-            
-            exclamations += content.count('！')
-            questions += content.count('？')
-            
-            for pronoun in personal_pronouns:
-                count = content.count(pronoun)
-                if count > 0:
-                    tone_indicators['personal_pronouns'][pronoun] = \
-                        tone_indicators['personal_pronouns'].get(pronoun, 0) + count
-            
-            for expr in emotional_expressions:
-                if expr in content:
-                    tone_indicators['emotional_expressions'].append(expr)
-        
-        if total_sentences > 0:
-            tone_indicators['exclamation_ratio'] = exclamations / total_sentences
-            tone_indicators['question_ratio'] = questions / total_sentences
-        
-        self.writing_patterns['tone_indicators'] = tone_indicators
+        self.style_features.merge(other)
+        self._update_user_profile()
     
     def _update_user_profile(self):
         """分析結果をユーザープロファイルに反映"""
+        self.writing_patterns = self.style_features.to_patterns()
+        self._rewriters.clear()
+        
         # 文体レベルの判定
         if self.writing_patterns['tone_indicators']['exclamation_ratio'] > 0.1:
             self.user_profile['writing_style']['tone'] = 'enthusiastic'
@@ -245,8 +132,9 @@ class PersonalizationAgent:
         if self.writing_patterns['vocabulary_preferences']['katakana_ratio'] > 0.1:
             self.user_profile['vocabulary_preferences']['foreign_words'] = 'moderate'
         
-        # パターンデータの保存
+        # パターンデータと、追加学習・併合に使う統計量の保存
         self.user_profile['learned_patterns'] = self.writing_patterns
+        self.user_profile['learned_statistics'] = self.style_features.to_dict()
         
         self.save_user_profile()
     
@@ -255,76 +143,21 @@ class PersonalizationAgent:
         if not target_style:
             target_style = self.user_profile['writing_style']['formality_level']
         
-        personalized = content
-        
-        # 文末表現の調整
-        personalized = self._adjust_sentence_endings(personalized, target_style)
-        
-        # 語彙の調整
-        personalized = self._adjust_vocabulary(personalized)
-        
-        # フレーズの調整
-        personalized = self._add_personal_phrases(personalized)
-        
-        # 段落構造の調整
-        personalized = self._adjust_paragraph_structure(personalized)
-        
-        return personalized
+        # 文末表現・語彙・フレーズ・段落構造の調整を1回の走査で行う
+        return self._get_rewriter(target_style).rewrite(content)
     
-    def _adjust_sentence_endings(self, content: str, style: str) -> str:
-        """文末表現を調整"""
-        if style == 'casual':
-            # 「です・ます」を「だ・である」に変換
-            content = re.sub(r'です。', 'だ。', content)
-            content = re.sub(r'ます。', 'る。', content)
-        elif style == 'formal':
-            # カジュアルな表現をフォーマルに
-            content = re.sub(r'だ。', 'である。', content)
-            content = re.sub(r'だよ。', 'です。', content)
-        
-        return content
-    
-    def _adjust_vocabulary(self, content: str) -> str:
-        """語彙を調整"""
-        # ユーザーの好みに応じた語彙置換
-        if self.user_profile['vocabulary_preferences']['technical_terms'] == 'minimal':
-            # 技術用語を平易な表現に置換
-            replacements = {
-                'アルゴリズム': '手順',
-                'インターフェース': '画面',
-                'パラメータ': '設定値'
-            }
-            for tech, simple in replacements.items():
-                content = content.replace(tech, simple)
-        
-        return content
-    
-    def _add_personal_phrases(self, content: str) -> str:
-        """個人的なフレーズを追加"""
+    def _get_rewriter(self, style: str) -> StyleRewriter:
+        """プロファイルに応じた書き換え規則（プロファイルが変わるまで使い回す）"""
         common_phrases = self.writing_patterns.get('common_phrases', {})
-        
-        if 'ちなみに' in common_phrases:
-            # 適切な位置に「ちなみに」を追加
-            paragraphs = content.split('\n\n')
-            if len(paragraphs) > 1:
-                paragraphs[1] = 'ちなみに、' + paragraphs[1]
-                content = '\n\n'.join(paragraphs)
-        
-        return content
-    
-    def _adjust_paragraph_structure(self, content: str) -> str:
-        """段落構造を調整"""
         structure = self.writing_patterns.get('paragraph_structure', {})
-        
-        if structure.get('uses_bullet_points'):
-            # リスト形式に変換できる部分を探す
-            content = re.sub(
-                r'(\d+)[.)]([^。]+。)',
-                r'• \2',
-                content
-            )
-        
-        return content
+        technical_terms = self.user_profile['vocabulary_preferences']['technical_terms']
+        
+        key = (style, technical_terms, 'ちなみに' in common_phrases, bool(structure.get('uses_bullet_points')))
+        rewriter = self._rewriters.get(key)
+        if rewriter is None:
+            rewriter = StyleRewriter.for_profile(style, technical_terms, common_phrases, structure)
+            self._rewriters[key] = rewriter
+        return rewriter
     
     def generate_personalized_introduction(self, topic: str) -> str:
         """個人化された導入文を生成"""
@@ -0,0 +1,161 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .product_index import ProductKeywordIndex
+
+
+class ProductCatalog:
+    """商品カタログ（JSON Lines または SQLite）を読み込み、キーワード・カテゴリ索引を保持する
+
+    索引は読み込み時に1回だけ構築する。ファイルが更新されると次の検索時に読み直し、
+    構築が終わった索引に差し替える。読み直しに失敗した場合や商品が1件もない場合は今の索引を使い続ける。
+    """
+
+    SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+    def __init__(self, path: Optional[str] = None, products: Iterable[Dict] = (), check_interval: float = 2.0):
+        self.path = path
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._last_check = 0.0
+
+        if path:
+            self._signature = self._file_signature()
+            products = self._load_products()
+        self._index, self._categories = self._build(products)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def products(self) -> List[Dict]:
+        return self._index.products
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _normalize(product: Dict) -> Dict:
+        keywords = product.get('keywords') or []
+        if isinstance(keywords, str):
+            keywords = json.loads(keywords) if keywords.startswith('[') else keywords.split(',')
+        product = {key: value for key, value in product.items() if value is not None}
+        product['keywords'] = [keyword.strip() for keyword in keywords if keyword.strip()]
+        return product
+
+    def _load_products(self) -> List[Dict]:
+        if not os.path.exists(self.path):
+            print(f"Product catalog not found: {self.path}")
+            return []
+
+        if self.path.endswith(self.SQLITE_EXTENSIONS):
+            conn = sqlite3.connect(self.path)
+            conn.row_factory = sqlite3.Row
+            try:
+                rows = conn.execute("SELECT * FROM products").fetchall()
+            finally:
+                conn.close()
+            return [self._normalize(dict(row)) for row in rows]
+
+        products = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    products.append(self._normalize(json.loads(line)))
+                except json.JSONDecodeError as e:
+                    print(f"Skipping invalid catalog line {line_number}: {e}")
+        return products
+
+    def _build(self, products: Iterable[Dict]) -> Tuple[ProductKeywordIndex, Dict[str, Set[int]]]:
+        index = ProductKeywordIndex()
+        categories: Dict[str, Set[int]] = {}
+
+        for product in products:
+            product_id = index.add(product)
+            for key in ('group', 'category'):
+                if product.get(key):
+                    categories.setdefault(product[key], set()).add(product_id)
+
+        # 差し替える前にオートマトンまで構築しておく
+        return index.build(), categories
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """ファイルが更新されていれば読み直す（読み直した場合はTrue）"""
+        if not self.path:
+            return False
+
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+
+        signature = self._file_signature()
+        if not force and signature == self._signature:
+            return False
+
+        with self._lock:
+            try:
+                products = self._load_products()
+            except (sqlite3.Error, OSError, ValueError) as e:
+                # 書き込み途中などの一時的な失敗は、次の確認時に読み直す
+                print(f"Failed to reload product catalog {self.path}, keeping current index: {e}")
+                return False
+
+            self._signature = signature
+            if not products:
+                print(f"Product catalog {self.path} has no products, keeping current index")
+                return False
+
+            index, categories = self._build(products)
+            # 構築済みの索引をまとめて差し替えるので、検索中のスレッドは古い索引を使い切れる
+            self._index, self._categories = index, categories
+        return True
+
+    def search(self,
+               text: str,
+               min_score: int = 1,
+               limit: Optional[int] = None,
+               category: Optional[str] = None,
+               require_url: bool = False) -> List[Tuple[Dict, int]]:
+        """本文に関連する商品をスコアの高い順に返す"""
+        self.reload_if_changed()
+        index, categories = self._index, self._categories
+
+        candidates = None
+        if category:
+            candidates = categories.get(category, set())
+            if not candidates:
+                return []
+
+        predicate = (lambda product: bool(product.get('url'))) if require_url else None
+        return index.search(text, min_score=min_score, limit=limit, predicate=predicate, candidates=candidates)
+
+
+_catalogs: Dict[str, ProductCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_product_catalog(path: str) -> ProductCatalog:
+    """ファイルごとに1つのカタログを共有する"""
+    key = os.path.abspath(path)
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(key)
+            if catalog is None:
+                catalog = ProductCatalog(path)
+                _catalogs[key] = catalog
+    return catalog
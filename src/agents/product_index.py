@@ -0,0 +1,90 @@
+import heapq
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .keyword_matcher import KeywordMatcher
+
+
+def _is_ascii_word_char(char: str) -> bool:
+    return char.isascii() and char.isalnum()
+
+
+class ProductKeywordIndex:
+    """商品キーワード → 商品の逆引き索引
+
+    全商品のキーワードを1つのAho-Corasickオートマトンにまとめ、
+    記事本文を1回走査するだけで全商品のスコア（一致したキーワードの種類数）を求める。
+    """
+
+    def __init__(self, products: Iterable[Dict] = ()):
+        self.products: List[Dict] = []
+        self._keyword_products: Dict[str, List[int]] = {}
+        self._matcher = KeywordMatcher()
+
+        for product in products:
+            self.add(product)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def add(self, product: Dict) -> int:
+        """商品を登録して商品IDを返す"""
+        product_id = len(self.products)
+        self.products.append(product)
+
+        for keyword in dict.fromkeys(product.get('keywords', [])):
+            self._keyword_products.setdefault(keyword, []).append(product_id)
+            self._matcher.add(keyword)
+
+        return product_id
+
+    def build(self) -> 'ProductKeywordIndex':
+        """オートマトンを構築する（検索前に呼べば、最初の検索で構築を待たない）"""
+        self._matcher.build()
+        return self
+
+    def matched_keywords(self, text: str) -> Set[str]:
+        """本文に含まれる商品キーワードの集合"""
+        found = set()
+        for start, end, keyword in self._matcher.iter_matches(text):
+            if keyword in found:
+                continue
+            # 英数字のキーワードは単語の途中での一致を除外（"PC" が "PCR" に一致しないように）
+            if _is_ascii_word_char(keyword[0]) and start > 0 and _is_ascii_word_char(text[start - 1]):
+                continue
+            if _is_ascii_word_char(keyword[-1]) and end < len(text) and _is_ascii_word_char(text[end]):
+                continue
+            found.add(keyword)
+        return found
+
+    def score(self, text: str) -> Dict[int, int]:
+        """商品ID → 一致したキーワード数"""
+        scores: Dict[int, int] = {}
+        for keyword in self.matched_keywords(text):
+            for product_id in self._keyword_products[keyword]:
+                scores[product_id] = scores.get(product_id, 0) + 1
+        return scores
+
+    def search(self,
+               text: str,
+               min_score: int = 1,
+               limit: Optional[int] = None,
+               predicate: Optional[Callable[[Dict], bool]] = None,
+               candidates: Optional[Set[int]] = None) -> List[Tuple[Dict, int]]:
+        """スコアの高い順に (商品, スコア) を返す（同点は登録順）
+
+        candidatesを指定した場合はその商品IDだけを対象にする。
+        """
+        scored = [
+            (product_id, score) for product_id, score in self.score(text).items()
+            if score >= min_score
+            and (candidates is None or product_id in candidates)
+            and (predicate is None or predicate(self.products[product_id]))
+        ]
+
+        sort_key = lambda item: (-item[1], item[0])
+        if limit is not None:
+            ranked = heapq.nsmallest(limit, scored, key=sort_key)
+        else:
+            ranked = sorted(scored, key=sort_key)
+
+        return [(self.products[product_id], score) for product_id, score in ranked]
@@ -0,0 +1,49 @@
+import importlib
+from typing import Dict, Tuple
+
+
+# エージェント名 → (モジュール名, クラス名)
+# 重い依存ライブラリはモジュール読み込み時に初めてimportされる
+AGENT_REGISTRY: Dict[str, Tuple[str, str]] = {
+    'article_extractor': ('article_extractor', 'HatenaArticleExtractor'),
+    'retrieval': ('retrieval_agent', 'RetrievalAgent'),
+    'image_generator': ('image_generator', 'ImageGenerator'),
+    'affiliate_manager': ('affiliate_manager', 'AffiliateManager'),
+    'repost_manager': ('repost_manager', 'RepostManager'),
+    'repost_scheduler': ('repost_scheduler', 'RepostScheduler'),
+    'repost_planner': ('repost_planner', 'RepostCalendarPlanner'),
+    'link_checker': ('link_checker', 'LinkChecker'),
+    'link_monitor': ('link_monitor', 'LinkMonitor'),
+    'personalization': ('personalization_agent', 'PersonalizationAgent'),
+    'knowledge_network': ('knowledge_network', 'KnowledgeNetworkManager'),
+    'hatena_publisher': ('hatena_publisher', 'HatenaPublisher'),
+}
+
+_PACKAGE = __name__.rsplit('.', 1)[0]
+_loaded_agents: Dict[str, type] = {}
+
+
+def load_agent(name: str) -> type:
+    """エージェントクラスを必要になった時点で読み込む"""
+    if name in _loaded_agents:
+        return _loaded_agents[name]
+
+    if name not in AGENT_REGISTRY:
+        raise KeyError(f"Unknown agent '{name}'. Available: {', '.join(AGENT_REGISTRY)}")
+
+    module_name, class_name = AGENT_REGISTRY[name]
+    module = importlib.import_module(f"{_PACKAGE}.{module_name}")
+    agent_class = getattr(module, class_name)
+
+    _loaded_agents[name] = agent_class
+    return agent_class
+
+
+def create_agent(name: str, *args, **kwargs):
+    """エージェントを読み込んでインスタンスを生成"""
+    return load_agent(name)(*args, **kwargs)
+
+
+def is_loaded(name: str) -> bool:
+    """エージェントが既に読み込まれているか"""
+    return name in _loaded_agents
@@ -0,0 +1,121 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+
+
+# 永続データはリポジトリ直下の data/ に置く（楽天の検索キャッシュと同じ場所。起動ディレクトリに依存しない）
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data')
+REPOST_HISTORY_DB = os.getenv('REPOST_HISTORY_DB') or os.path.join(DATA_DIR, 'repost_history.db')
+
+
+class RepostHistoryStore:
+    """再掲載履歴をSQLiteに保存する
+
+    履歴は1件ずつ追記するだけで、ファイル全体を書き直さない。
+    記事IDと日付に索引があるので、回数・最終日の集計はSQLで行う。
+    """
+
+    def __init__(self, db_path: str = REPOST_HISTORY_DB, legacy_json: Optional[str] = None):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS reposts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    article_id TEXT NOT NULL,
+                    original_url TEXT,
+                    date TEXT NOT NULL,
+                    update_type TEXT,
+                    new_title TEXT,
+                    status TEXT
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_reposts_article ON reposts (article_id, id)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_reposts_date ON reposts (date)")
+
+        if legacy_json and os.path.exists(legacy_json) and not len(self):
+            self.import_json(legacy_json)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM reposts").fetchone()[0]
+
+    def import_json(self, path: str) -> int:
+        """従来の repost_history.json を取り込む（取り込んだ件数を返す）"""
+        with open(path, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+
+        rows = [
+            (article_id, record.get('original_url'), entry['date'],
+             entry.get('update_type'), entry.get('new_title'), entry.get('status'))
+            for article_id, record in history.items()
+            for entry in record.get('reposts', [])
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO reposts (article_id, original_url, date, update_type, new_title, status) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def add(self, article_id: str, original_url: str, entry: Dict):
+        """再掲載を1件追記"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO reposts (article_id, original_url, date, update_type, new_title, status) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (article_id, original_url, entry['date'],
+                 entry.get('update_type'), entry.get('new_title'), entry.get('status'))
+            )
+
+    def count(self, article_id: str) -> int:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM reposts WHERE article_id = ?", (article_id,)
+            ).fetchone()[0]
+
+    def last_date(self, article_id: str) -> Optional[str]:
+        """最後に記録した再掲載の日付"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT date FROM reposts WHERE article_id = ? ORDER BY id DESC LIMIT 1", (article_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def stats(self) -> Dict[str, Tuple[int, str]]:
+        """記事ID → (再掲載回数, 最後に記録した日付) を1回のクエリで取得"""
+        with self._lock:
+            # SQLiteでは MAX() と同時に選んだ列は最大値の行の値になる
+            rows = self.conn.execute(
+                "SELECT article_id, COUNT(*), date, MAX(id) FROM reposts GROUP BY article_id"
+            ).fetchall()
+        return {article_id: (count, date) for article_id, count, date, _ in rows}
+
+    def to_dict(self) -> Dict:
+        """従来の repost_history.json と同じ形式"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT article_id, original_url, date, update_type, new_title, status FROM reposts ORDER BY id"
+            ).fetchall()
+
+        history: Dict[str, Dict] = {}
+        for article_id, original_url, date, update_type, new_title, status in rows:
+            record = history.setdefault(article_id, {'original_url': original_url, 'reposts': []})
+            record['reposts'].append({
+                'date': date,
+                'update_type': update_type,
+                'new_title': new_title,
+                'status': status
+            })
+        return history
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -1,137 +1,205 @@
 import os
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 import requests
 from bs4 import BeautifulSoup
-import hashlib
+import numpy as np
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from .hatena_publisher import HatenaPublisher
+from .repost_history import REPOST_HISTORY_DB, RepostHistoryStore
+from .repost_scoring import ArticleColumns, days_since, generate_article_id, performance_score, top_k_indices
+
+
+REPOST_PUBLISH_INTERVAL = 5.0  # 同じブログへの投稿の最小間隔（秒）
+REPOST_PREPARE_CHUNK_SIZE = 20
+
+
+def build_repost_content(original_article: Dict,
+                         update_type: str = "refresh",
+                         custom_intro: Optional[str] = None) -> Dict:
+    """再掲載用のタイトル・本文を組み立てる（プロセスプールのワーカーでも使えるようにモジュール関数にしている）"""
+    article_id = generate_article_id(original_article['url'])
+    
+    intro_templates = {
+        'refresh': "【更新版】この記事は{date}に公開した内容を最新情報に更新したものです。",
+        'seasonal': "【季節の再掲】{date}に公開した記事を、この時期に改めてお届けします。",
+        'popular': "【人気記事】多くの方に読まれた記事を、加筆修正してお届けします。",
+        'series': "【シリーズ再掲】過去の連載記事を振り返ります。"
+    }
+    
+    intro = custom_intro or intro_templates.get(
+        update_type, 
+        intro_templates['refresh']
+    ).format(date=original_article.get('date', '')[:10] if original_article.get('date') else "過去")
+    
+    # 元記事のコンテンツを取得（HTML content を優先）
+    original_content = (
+        original_article.get('html_content', '') or 
+        original_article.get('full_content', '') or 
+        original_article.get('content', '') or 
+        original_article.get('summary', '')
+    )
+    
+    # Debug logging
+    print(f"Creating repost content for: {original_article.get('title', 'Unknown')}")
+    print(f"Original content length: {len(original_content)} characters")
+    print(f"Content source: {'html_content' if original_article.get('html_content') else 'full_content' if original_article.get('full_content') else 'content' if original_article.get('content') else 'summary' if original_article.get('summary') else 'none'}")
+    
+    # If we have full HTML content with <div class="entry-content">, extract just the inner HTML
+    if '<div class="entry-content"' in original_content:
+        soup = BeautifulSoup(original_content, 'html.parser')
+        entry_content = soup.find('div', class_='entry-content')
+        if entry_content:
+            # Get inner HTML content
+            original_content = entry_content.get_text() + '\n\n' + ''.join([str(tag) for tag in entry_content.find_all(['p', 'img', 'a', 'strong', 'em'])])
+            # If that doesn't work, just use the full html_content
+            if not original_content.strip():
+                original_content = original_article.get('content', '') or original_article.get('full_content', '')
+    
+    updated_content = f"""<div class="repost-intro">
+{intro}
+</div>
+
+<div class='update-section'>
+<h3>2025年の更新情報</h3>
+<ul>
+<li>内容を最新の状況に合わせて更新しました</li>
+<li>関連情報やリンクを見直しました</li>
+</ul>
+</div>
+
+{original_content}
+
+<div class="repost-footer">
+<p>元記事: <a href="{original_article['url']}">{original_article['title']}</a></p>
+</div>"""
+    
+    new_title = f"【再掲】{original_article['title']}"
+    if update_type == "refresh":
+        new_title = f"【2025年版】{original_article['title']}"
+    
+    return {
+        'title': new_title,
+        'content': updated_content,
+        'categories': original_article['categories'] + ['再掲載'],
+        'original_url': original_article['url'],
+        'article_id': article_id,
+        'update_type': update_type
+    }
+
+
+def _build_repost_contents(jobs: List[Tuple[Dict, str]]) -> List[Dict]:
+    return [build_repost_content(article, update_type) for article, update_type in jobs]
+
+
+class PublishPacer:
+    """投稿の間隔をmin_interval秒以上に保つ（前回の投稿から十分に経っていれば待たない）"""
+
+    def __init__(self, min_interval: float = REPOST_PUBLISH_INTERVAL):
+        self.min_interval = min_interval
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        # 投稿枠の予約だけをロック内で行い、待機はロックの外で行う（複数スレッドから呼ばれる）
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_allowed)
+            self._next_allowed = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
 
 
 class RepostManager:
-    def __init__(self, hatena_id: str, blog_domain: str = None, api_key: Optional[str] = None):
+    def __init__(self, hatena_id: str, blog_domain: str = None, api_key: Optional[str] = None,
+                 history_db: Optional[str] = None):
         self.hatena_id = hatena_id
         self.blog_domain = blog_domain or os.getenv('BLOG_DOMAIN')
         self.api_key = api_key
         self.base_url = f"https://blog.hatena.ne.jp/{hatena_id}"
         self.history_file = "repost_history.json"
-        self.repost_history = self._load_history()
+        # 従来のJSON履歴はデータベースが空のときに1度だけ取り込む
+        self.history = RepostHistoryStore(history_db or REPOST_HISTORY_DB, legacy_json=self.history_file)
         
         # Initialize publisher if we have blog_domain
         self.publisher = None
+        self.publish_pacer = PublishPacer()
         if self.blog_domain:
             try:
                 self.publisher = HatenaPublisher(hatena_id, self.blog_domain, api_key)
             except Exception as e:
                 print(f"Warning: Could not initialize publisher: {e}")
         
-    def _load_history(self) -> Dict:
-        if os.path.exists(self.history_file):
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
-    
-    def _save_history(self):
-        with open(self.history_file, 'w', encoding='utf-8') as f:
-            json.dump(self.repost_history, f, ensure_ascii=False, indent=2)
+    @property
+    def repost_history(self) -> Dict:
+        """履歴全体（従来の repost_history.json と同じ形式）"""
+        return self.history.to_dict()
     
     def analyze_article_performance(self, articles: List[Dict]) -> List[Dict]:
-        performance_data = []
-        
-        for article in articles:
-            article_id = self._generate_article_id(article['url'])
-            
-            performance = {
-                'article_id': article_id,
-                'title': article['title'],
-                'url': article['url'],
-                'original_date': article['date'],
-                'categories': article['categories'],
-                'word_count': article.get('word_count', 0),
-                'repost_count': self._get_repost_count(article_id),
-                'last_repost': self._get_last_repost_date(article_id),
-                'performance_score': self._calculate_performance_score(article)
-            }
-            
-            performance_data.append(performance)
+        columns = ArticleColumns(articles)
+        scores = columns.scores()
+        # 全記事の再掲載回数・最終日を1回のクエリで取得
+        history_stats = self.history.stats()
+        
+        # 同点は元の順序を保つ
+        order = np.argsort(-scores, kind='stable')
+        return [self._performance_entry(columns, scores, history_stats, i) for i in order]
+    
+    def _performance_entry(self, columns: ArticleColumns, scores: np.ndarray, history_stats: Dict, index: int) -> Dict:
+        article = columns.articles[index]
+        article_id = columns.ids[index]
+        repost_count, last_repost = history_stats.get(article_id, (0, None))
         
-        return sorted(performance_data, key=lambda x: x['performance_score'], reverse=True)
+        return {
+            'article_id': article_id,
+            'title': article['title'],
+            'url': article['url'],
+            'original_date': article['date'],
+            'categories': article['categories'],
+            'word_count': article.get('word_count', 0),
+            'repost_count': repost_count,
+            'last_repost': last_repost,
+            'performance_score': float(scores[index])
+        }
     
     def _generate_article_id(self, url: str) -> str:
-        return hashlib.md5(url.encode()).hexdigest()[:10]
+        return generate_article_id(url)
     
     def _get_repost_count(self, article_id: str) -> int:
-        if article_id in self.repost_history:
-            return len(self.repost_history[article_id].get('reposts', []))
-        return 0
+        return self.history.count(article_id)
     
     def _get_last_repost_date(self, article_id: str) -> Optional[str]:
-        if article_id in self.repost_history:
-            reposts = self.repost_history[article_id].get('reposts', [])
-            if reposts:
-                return reposts[-1]['date']
-        return None
+        return self.history.last_date(article_id)
     
     def _calculate_performance_score(self, article: Dict) -> float:
-        score = 0.0
-        
-        # Date-based scoring with better error handling
-        if article.get('date'):
-            try:
-                # Handle various date formats
-                date_str = article['date']
-                if 'T' in date_str:
-                    article_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                else:
-                    # Try parsing as simple date string
-                    article_date = datetime.strptime(date_str, '%Y-%m-%d')
-                
-                days_old = (datetime.now() - article_date).days
-                if days_old > 180:
-                    score += 10
-                elif days_old > 90:
-                    score += 5
-                elif days_old > 30:
-                    score += 2
-            except (ValueError, TypeError) as e:
-                print(f"Warning: Could not parse date '{article.get('date')}': {e}")
-        
-        # Category-based scoring
-        if len(article.get('categories', [])) > 0:
-            score += 3
-        
-        # Word count-based scoring
-        word_count = article.get('word_count', 0)
-        if word_count > 1500:
-            score += 5
-        elif word_count > 800:
-            score += 3
-        elif word_count > 300:
-            score += 1
-        
-        return score
+        return performance_score(article)
     
     def select_articles_for_repost(self, 
                                  articles: List[Dict], 
                                  max_articles: int = 5,
-                                 min_days_between_reposts: int = 90) -> List[Dict]:
-        performance_data = self.analyze_article_performance(articles)
-        selected = []
-        
-        for article in performance_data:
-            article_id = article['article_id']
-            
-            if self._can_repost(article_id, min_days_between_reposts):
-                selected.append(article)
-                
-            if len(selected) >= max_articles:
-                break
+                                 min_days_between_reposts: int = 90,
+                                 as_of: Optional[datetime] = None) -> List[Dict]:
+        """as_of時点（既定は現在）で再掲載できる記事のうちスコアの高いものをmax_articles件選ぶ（全記事のソートはしない）"""
+        columns = ArticleColumns(articles)
+        scores = columns.scores()
+        history_stats = self.history.stats()
+        
+        last_reposts = np.array(
+            [history_stats.get(article_id, (0, None))[1] for article_id in columns.ids],
+            dtype='datetime64[us]'
+        )
+        eligible = np.isnat(last_reposts) | (days_since(last_reposts, as_of) >= min_days_between_reposts)
         
-        return selected
+        selected = top_k_indices(scores, max_articles, eligible)
+        return [self._performance_entry(columns, scores, history_stats, i) for i in selected]
     
     def _can_repost(self, article_id: str, min_days: int) -> bool:
-        last_repost = self._get_last_repost_date(article_id)
-        
+        return self._is_repost_interval_elapsed(self._get_last_repost_date(article_id), min_days)
+    
+    def _is_repost_interval_elapsed(self, last_repost: Optional[str], min_days: int) -> bool:
         if not last_repost:
             return True
         
@@ -144,75 +212,7 @@ class RepostManager:
                             original_article: Dict,
                             update_type: str = "refresh",
                             custom_intro: Optional[str] = None) -> Dict:
-        article_id = self._generate_article_id(original_article['url'])
-        
-        intro_templates = {
-            'refresh': "【更新版】この記事は{date}に公開した内容を最新情報に更新したものです。",
-            'seasonal': "【季節の再掲】{date}に公開した記事を、この時期に改めてお届けします。",
-            'popular': "【人気記事】多くの方に読まれた記事を、加筆修正してお届けします。",
-            'series': "【シリーズ再掲】過去の連載記事を振り返ります。"
-        }
-        
-        intro = custom_intro or intro_templates.get(
-            update_type, 
-            intro_templates['refresh']
-        ).format(date=original_article.get('date', '')[:10] if original_article.get('date') else "過去")
-        
-        # 元記事のコンテンツを取得（HTML content を優先）
-        original_content = (
-            original_article.get('html_content', '') or 
-            original_article.get('full_content', '') or 
-            original_article.get('content', '') or 
-            original_article.get('summary', '')
-        )
-        
-        # Debug logging
-        print(f"Creating repost content for: {original_article.get('title', 'Unknown')}")
-        print(f"Original content length: {len(original_content)} characters")
-        print(f"Content source: {'html_content' if original_article.get('html_content') else 'full_content' if original_article.get('full_content') else 'content' if original_article.get('content') else 'summary' if original_article.get('summary') else 'none'}")
-        
-        # If we have full HTML content with <div class="entry-content">, extract just the inner HTML
-        if '<div class="entry-content"' in original_content:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(original_content, 'html.parser')
-            entry_content = soup.find('div', class_='entry-content')
-            if entry_content:
-                # Get inner HTML content
-                original_content = entry_content.get_text() + '\n\n' + ''.join([str(tag) for tag in entry_content.find_all(['p', 'img', 'a', 'strong', 'em'])])
-                # If that doesn't work, just use the full html_content
-                if not original_content.strip():
-                    original_content = original_article.get('content', '') or original_article.get('full_content', '')
-        
-        updated_content = f"""<div class="repost-intro">
-{intro}
-</div>
-
-<div class='update-section'>
-<h3>2025年の更新情報</h3>
-<ul>
-<li>内容を最新の状況に合わせて更新しました</li>
-<li>関連情報やリンクを見直しました</li>
-</ul>
-</div>
-
-{original_content}
-
-<div class="repost-footer">
-<p>元記事: <a href="{original_article['url']}">{original_article['title']}</a></p>
-</div>"""
-        
-        new_title = f"【再掲】{original_article['title']}"
-        if update_type == "refresh":
-            new_title = f"【2025年版】{original_article['title']}"
-        
-        return {
-            'title': new_title,
-            'content': updated_content,
-            'categories': original_article['categories'] + ['再掲載'],
-            'original_url': original_article['url'],
-            'article_id': article_id,
-            'update_type': update_type
-        }
+        return build_repost_content(original_article, update_type, custom_intro)
     
     def update_repost_with_new_info(self, 
                                   repost_content: Dict,
@@ -237,12 +237,6 @@ class RepostManager:
                        publish_date: Optional[datetime] = None) -> Dict:
         article_id = repost_content['article_id']
         
-        if article_id not in self.repost_history:
-            self.repost_history[article_id] = {
-                'original_url': repost_content['original_url'],
-                'reposts': []
-            }
-        
         repost_entry = {
             'date': (publish_date or datetime.now()).isoformat(),
             'update_type': repost_content['update_type'],
@@ -250,8 +244,7 @@ class RepostManager:
             'status': 'scheduled' if publish_date and publish_date > datetime.now() else 'published'
         }
         
-        self.repost_history[article_id]['reposts'].append(repost_entry)
-        self._save_history()
+        self.history.add(article_id, repost_content['original_url'], repost_entry)
         
         return {
             'article_id': article_id,
@@ -312,48 +305,73 @@ class RepostManager:
         
         print(f"Repost plan exported to {filename}")
     
-    def publish_scheduled_reposts(self, calendar: List[Dict], dry_run: bool = True, full_articles_data: List[Dict] = None) -> List[Dict]:
-        """カレンダーに基づいて記事を投稿"""
+    def publish_scheduled_reposts(self,
+                                  calendar: List[Dict],
+                                  dry_run: bool = True,
+                                  full_articles_data: List[Dict] = None,
+                                  workers: Optional[int] = None) -> List[Dict]:
+        """カレンダーに基づいて記事を投稿
+        
+        投稿時刻を過ぎたエントリの本文をワーカーで並列に組み立て、
+        カレンダーの順に投稿間隔を空けながら投稿する。
+        """
         if not self.publisher:
             return [{"status": "error", "message": "Publisher not initialized. Need blog_domain and API key."}]
         
-        results = []
+        # URL → 完全な記事データ（同じURLが複数あれば先頭を使う）
+        articles_by_url = {}
+        for full_art in full_articles_data or []:
+            articles_by_url.setdefault(full_art['url'], full_art)
         
+        now = datetime.now()
+        due = []
         for entry in calendar:
             publish_date = datetime.fromisoformat(entry['publish_date'].replace('Z', '+00:00'))
             
             # Check if it's time to publish
-            if publish_date <= datetime.now():
-                article = entry['article']
-                
-                # Find the full article data if provided
-                if full_articles_data:
-                    for full_art in full_articles_data:
-                        if full_art['url'] == article['url']:
-                            article = full_art
-                            break
-                
-                # Create repost content
-                repost_content = self.create_repost_content(
-                    article,
-                    entry['update_type']
-                )
+            if publish_date <= now:
+                article = articles_by_url.get(entry['article']['url'], entry['article'])
+                due.append((entry, publish_date, article))
+        
+        jobs = [(article, entry['update_type']) for entry, _, article in due]
+        results = []
+        
+        for (entry, publish_date, _), repost_content in zip(due, self._prepare_reposts(jobs, workers)):
+            if dry_run:
+                results.append({
+                    "status": "dry_run",
+                    "title": repost_content['title'],
+                    "scheduled_date": entry['publish_date'],
+                    "update_type": entry['update_type']
+                })
+            else:
+                # Actually publish
+                self.publish_pacer.wait()
+                result = self.publisher.publish_repost(repost_content, is_draft=True)
+                result['scheduled_date'] = entry['publish_date']
+                results.append(result)
                 
-                if dry_run:
-                    results.append({
-                        "status": "dry_run",
-                        "title": repost_content['title'],
-                        "scheduled_date": entry['publish_date'],
-                        "update_type": entry['update_type']
-                    })
-                else:
-                    # Actually publish
-                    result = self.publisher.publish_repost(repost_content, is_draft=True)
-                    result['scheduled_date'] = entry['publish_date']
-                    results.append(result)
-                    
-                    # Update history if successful
-                    if result['status'] == 'success':
-                        self.schedule_repost(repost_content, publish_date)
-        
-        return results
\ No newline at end of file
+                # Update history if successful
+                if result['status'] == 'success':
+                    self.schedule_repost(repost_content, publish_date)
+        
+        return results
+    
+    def _prepare_reposts(self, jobs: List[Tuple[Dict, str]], workers: Optional[int] = None) -> Iterator[Dict]:
+        """再掲載の本文を順に返す
+        
+        件数がREPOST_PREPARE_CHUNK_SIZEを超える場合はプロセスプールでチャンクごとに組み立て、
+        先頭のチャンクが終わりしだい返し始める（投稿と組み立てが重なる）。
+        """
+        chunk_size = REPOST_PREPARE_CHUNK_SIZE
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+        
+        workers = workers or os.cpu_count() or 1
+        if len(chunks) <= 1 or workers == 1:
+            for article, update_type in jobs:
+                yield build_repost_content(article, update_type)
+            return
+        
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            for contents in executor.map(_build_repost_contents, chunks):
+                yield from contents
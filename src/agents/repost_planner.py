@@ -0,0 +1,149 @@
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from .repost_manager import RepostManager
+
+
+# 予定日を目標日からずらす1日分に対して、近くの同じカテゴリの再掲載・同じ日の投稿数に掛ける重み
+CATEGORY_PENALTY = 2.0
+LOAD_PENALTY = 1.0
+# 各ブログから候補として取り出す件数（max_per_blogの倍数）
+CANDIDATE_POOL_FACTOR = 10
+
+
+class RepostCalendarPlanner:
+    """全ブログの再掲載カレンダーをまとめて組む
+
+    各ブログの候補をスコア順に1件ずつ、制約を満たす日のうちコストが最小の日に割り当てる（貪欲法）。
+
+    - 制約: ブログごとの1日の上限、前回の再掲載からの最小間隔、同じ日の同じカテゴリの上限
+    - コスト: ブログ内で均等な間隔になる目標日からのずれ
+      + 前後category_gap_days日以内の同じカテゴリの再掲載数 + その日の全ブログの投稿数
+    """
+
+    def __init__(self,
+                 managers: Dict[str, RepostManager],
+                 daily_cap: Union[int, Dict[str, int]] = 1,
+                 max_per_blog: int = 5,
+                 min_days_between_reposts: int = 90,
+                 max_category_per_day: int = 1,
+                 category_gap_days: int = 3):
+        self.managers = managers
+        self.daily_cap = daily_cap
+        self.max_per_blog = max_per_blog
+        self.min_days_between_reposts = min_days_between_reposts
+        self.max_category_per_day = max_category_per_day
+        self.category_gap_days = category_gap_days
+
+    @classmethod
+    def from_multi_blog_manager(cls, blog_manager, **kwargs) -> 'RepostCalendarPlanner':
+        """MultiBlogManagerに設定された全ブログ分のRepostManagerを作って計画する"""
+        managers = {
+            name: RepostManager(config.hatena_id, config.blog_domain, config.api_key)
+            for name, config in blog_manager.blogs.items()
+        }
+        return cls(managers, **kwargs)
+
+    def _cap_for(self, blog: str) -> int:
+        if isinstance(self.daily_cap, dict):
+            return self.daily_cap.get(blog, 1)
+        return self.daily_cap
+
+    def _earliest_day(self, candidate: Dict, start: datetime) -> int:
+        """前回の再掲載から最小間隔が空く最初の日（開始日からの日数）"""
+        if not candidate.get('last_repost'):
+            return 0
+        allowed = datetime.fromisoformat(candidate['last_repost']) + timedelta(days=self.min_days_between_reposts)
+        return max(0, math.ceil((allowed - start).total_seconds() / 86400))
+
+    def plan(self,
+             articles_by_blog: Dict[str, List[Dict]],
+             weeks_ahead: int = 4,
+             start: Optional[datetime] = None) -> Dict[str, List[Dict]]:
+        """ブログ名 → generate_repost_calendar と同じ形式のカレンダー"""
+        start = start or datetime.now()
+        days = weeks_ahead * 7
+        horizon_end = start + timedelta(days=days - 1)
+        blogs = [blog for blog in articles_by_blog if blog in self.managers]
+
+        # 計画期間の最終日までに再掲載できるようになる記事から、スコアの高い順に候補を取る
+        candidates = []
+        quotas = {}
+        for blog in blogs:
+            pool = self.managers[blog].select_articles_for_repost(
+                articles_by_blog[blog],
+                max_articles=self.max_per_blog * CANDIDATE_POOL_FACTOR,
+                min_days_between_reposts=self.min_days_between_reposts,
+                as_of=horizon_end
+            )
+            quotas[blog] = min(self.max_per_blog, len(pool))
+            candidates.extend((-article['performance_score'], rank, blog, article) for rank, article in enumerate(pool))
+
+        # 同点はブログ内の順位、ブログの順に交互に並べる
+        blog_order = {blog: i for i, blog in enumerate(blogs)}
+        candidates.sort(key=lambda item: (item[0], item[1], blog_order[item[2]]))
+
+        day_index = np.arange(days)
+        day_load = np.zeros(days)
+        blog_days = {blog: np.zeros(days, dtype=np.int64) for blog in blogs}
+        category_days: Dict[str, np.ndarray] = {}
+        category_nearby: Dict[str, np.ndarray] = {}
+
+        plan: Dict[str, List] = {blog: [] for blog in blogs}
+        planned_urls = set()
+        remaining = sum(quotas.values())
+
+        for _, _, blog, article in candidates:
+            if remaining == 0:
+                break
+            placed = len(plan[blog])
+            if placed >= quotas[blog] or article['url'] in planned_urls:
+                continue
+
+            # ブログ内で均等な間隔にし、ブログごとに開始日をずらした目標日
+            spacing = days / quotas[blog]
+            target = min(days - 1, blog_order[blog] * spacing / len(blogs) + placed * spacing)
+
+            feasible = (blog_days[blog] < self._cap_for(blog)) & (day_index >= self._earliest_day(article, start))
+            cost = np.abs(day_index - target) + LOAD_PENALTY * day_load
+            categories = list(dict.fromkeys(article.get('categories', [])))
+            for category in categories:
+                if category in category_days:
+                    feasible &= category_days[category] < self.max_category_per_day
+                    cost += CATEGORY_PENALTY * category_nearby[category]
+
+            if not feasible.any():
+                continue
+
+            day = int(np.argmin(np.where(feasible, cost, np.inf)))
+
+            day_load[day] += 1
+            blog_days[blog][day] += 1
+            for category in categories:
+                if category not in category_days:
+                    category_days[category] = np.zeros(days, dtype=np.int64)
+                    category_nearby[category] = np.zeros(days)
+                category_days[category][day] += 1
+                category_nearby[category][max(0, day - self.category_gap_days):day + self.category_gap_days + 1] += 1
+
+            plan[blog].append((day, article))
+            planned_urls.add(article['url'])
+            remaining -= 1
+
+        return {blog: self._to_calendar(blog, entries, start) for blog, entries in plan.items()}
+
+    def _to_calendar(self, blog: str, entries: List, start: datetime) -> List[Dict]:
+        manager = self.managers[blog]
+        calendar = []
+        for day, article in sorted(entries, key=lambda entry: entry[0]):
+            publish_date = start + timedelta(days=day)
+            calendar.append({
+                'article': article,
+                'publish_date': publish_date.isoformat(),
+                'update_type': manager._determine_update_type(article, publish_date),
+                'preparation_notes': manager._generate_preparation_notes(article)
+            })
+        return calendar
@@ -0,0 +1,398 @@
+import heapq
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .repost_manager import RepostManager, build_repost_content
+
+
+class RepostScheduler:
+    """複数ブログの再掲載を予定時刻に投稿し続けるスケジューラー
+
+    予定はSQLiteのキューに保存し、メモリ上では予定時刻順のヒープに載せる。
+    スレッドは次の予定時刻か新しい予定の追加まで眠るので、待機中はポーリングしない。
+
+    投稿の前に状態を 'publishing' にしてコミットし（ジャーナル）、投稿後に 'published' にする。
+    投稿中にプロセスが落ちた予定や、投稿APIの呼び出しが例外で終わった予定は、ブログの記事一覧で
+    投稿済みかを確かめてから再投稿するので、同じ予定が二重に投稿されない。
+    """
+
+    def __init__(self,
+                 managers: Dict[str, RepostManager],
+                 state_db: str = "repost_scheduler.db",
+                 per_blog_limit: int = 1,
+                 max_attempts: int = 3,
+                 retry_delay: float = 300):
+        self.managers = managers
+        self.state_db = state_db
+        self.per_blog_limit = per_blog_limit
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+        self._lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._heap: List = []
+        # このプロセスで投稿中の予定（recover() の対象から外す）
+        self._in_flight = set()
+        self._stopping = False
+
+        self.conn = sqlite3.connect(state_db, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._create_tables()
+        self._load_pending()
+
+    def _create_tables(self):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS scheduled_reposts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    blog TEXT NOT NULL,
+                    article_url TEXT NOT NULL,
+                    due_at REAL NOT NULL,
+                    update_type TEXT NOT NULL,
+                    article TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    title TEXT,
+                    result TEXT,
+                    updated_at REAL,
+                    sent_at REAL,
+                    UNIQUE (blog, article_url, due_at)
+                )
+            """)
+            # sent_at が無い以前のキューには列を追加する
+            columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(scheduled_reposts)")}
+            if 'sent_at' not in columns:
+                self.conn.execute("ALTER TABLE scheduled_reposts ADD COLUMN sent_at REAL")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_scheduled_reposts_status ON scheduled_reposts (status, due_at)"
+            )
+
+    def _load_pending(self):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, due_at FROM scheduled_reposts WHERE status = 'pending'"
+            ).fetchall()
+        with self._condition:
+            self._heap = [(row['due_at'], row['id']) for row in rows]
+            heapq.heapify(self._heap)
+
+    def _push(self, due_at: float, repost_id: int):
+        with self._condition:
+            heapq.heappush(self._heap, (due_at, repost_id))
+            # 眠っているディスパッチャーを起こして待機時間を計算し直させる
+            self._condition.notify_all()
+
+    def schedule(self, blog: str, article: Dict, publish_at: datetime, update_type: str = "refresh") -> Optional[int]:
+        """再掲載を予定に追加（同じブログ・記事・時刻の予定が既にあれば追加しない）"""
+        if blog not in self.managers:
+            raise KeyError(f"Unknown blog '{blog}'. Available: {', '.join(self.managers)}")
+
+        due_at = publish_at.timestamp()
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO scheduled_reposts (blog, article_url, due_at, update_type, article, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (blog, article['url'], due_at, update_type, json.dumps(article, ensure_ascii=False), time.time())
+            )
+        if not cursor.rowcount:
+            return None
+
+        self._push(due_at, cursor.lastrowid)
+        return cursor.lastrowid
+
+    def schedule_calendar(self, blog: str, calendar: List[Dict], full_articles_data: List[Dict] = None) -> int:
+        """generate_repost_calendar の結果を予定に追加し、追加した件数を返す"""
+        articles_by_url = {}
+        for full_art in full_articles_data or []:
+            articles_by_url.setdefault(full_art['url'], full_art)
+
+        added = 0
+        for entry in calendar:
+            article = articles_by_url.get(entry['article']['url'], entry['article'])
+            publish_at = datetime.fromisoformat(entry['publish_date'].replace('Z', '+00:00'))
+            if self.schedule(blog, article, publish_at, entry['update_type']) is not None:
+                added += 1
+        return added
+
+    def next_due(self) -> Optional[float]:
+        """次の予定時刻"""
+        with self._condition:
+            return self._heap[0][0] if self._heap else None
+
+    def _pop_due(self, now: float) -> List[int]:
+        due = []
+        with self._condition:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    def _claim(self, repost_id: int) -> Optional[sqlite3.Row]:
+        """予定を 'publishing' にしてコミットする（他の状態なら投稿しない）"""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE scheduled_reposts SET status = 'publishing', attempts = attempts + 1, updated_at = ?, "
+                "sent_at = NULL WHERE id = ? AND status = 'pending'",
+                (time.time(), repost_id)
+            )
+            if not cursor.rowcount:
+                return None
+            return self.conn.execute("SELECT * FROM scheduled_reposts WHERE id = ?", (repost_id,)).fetchone()
+
+    def _finish(self, repost_id: int, status: str, result: Dict, title: Optional[str] = None,
+                due_at: Optional[float] = None, from_status: Optional[str] = None) -> bool:
+        """予定の状態を更新（from_statusを指定すると、その状態のときだけ更新する）"""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE scheduled_reposts SET status = ?, result = ?, title = COALESCE(?, title), "
+                "due_at = COALESCE(?, due_at), updated_at = ? WHERE id = ? AND (? IS NULL OR status = ?)",
+                (status, json.dumps(result, ensure_ascii=False), title, due_at, time.time(), repost_id,
+                 from_status, from_status)
+            )
+        return bool(cursor.rowcount)
+
+    def _retry_or_fail(self, row: sqlite3.Row, result: Dict, title: Optional[str] = None):
+        """投稿できなかった予定を、試行回数が残っていれば再試行に回し、なければ 'failed' にする"""
+        if row['attempts'] >= self.max_attempts:
+            self._finish(row['id'], 'failed', result, title)
+        else:
+            retry_at = time.time() + self.retry_delay
+            self._finish(row['id'], 'pending', result, title, retry_at)
+            self._push(retry_at, row['id'])
+
+    @staticmethod
+    def _never_reached_blog(result: Dict) -> bool:
+        """投稿リクエストがブログに受け付けられていないと分かる失敗か（再投稿しても二重にならない）
+
+        送信前のエラーと、ブログが4xxで拒否した場合だけが該当する。
+        応答が無い・読めなかった失敗は、ブログ側で投稿されている可能性がある。
+        """
+        if result.get('request_sent') is False:
+            return True
+        status_code = result.get('status_code')
+        return status_code is not None and 400 <= status_code < 500
+
+    def _publish(self, repost_id: int) -> Optional[Dict]:
+        with self._condition:
+            self._in_flight.add(repost_id)
+        try:
+            row = self._claim(repost_id)
+            if row is None:
+                return None
+            return self._publish_claimed(row)
+        finally:
+            with self._condition:
+                self._in_flight.discard(repost_id)
+
+    def _publish_claimed(self, row: sqlite3.Row) -> Dict:
+        repost_id = row['id']
+        manager = self.managers.get(row['blog'])
+        if manager is None or not manager.publisher:
+            result = {"status": "error", "message": f"Publisher not initialized for blog '{row['blog']}'."}
+            self._finish(repost_id, 'failed', result)
+            return result
+
+        title = None
+        sent = False
+        try:
+            repost_content = build_repost_content(json.loads(row['article']), row['update_type'])
+            title = repost_content['title']
+            manager.publish_pacer.wait()
+
+            # 再起動時の確認に使うので、送信の直前にタイトルと送信時刻を記録しておく
+            with self._lock, self.conn:
+                self.conn.execute(
+                    "UPDATE scheduled_reposts SET title = ?, sent_at = ? WHERE id = ?", (title, time.time(), repost_id)
+                )
+            sent = True
+            result = manager.publisher.publish_repost(repost_content, is_draft=True)
+        except Exception as e:
+            result = {"status": "error", "message": f"Unexpected error: {str(e)}"}
+            if sent:
+                # 投稿されたか分からないので 'publishing' のまま残し、recover() でブログを確かめる
+                self._finish(repost_id, 'publishing', result, title)
+            else:
+                self._retry_or_fail(row, result, title)
+            return result
+
+        result['scheduled_date'] = datetime.fromtimestamp(row['due_at']).isoformat()
+
+        if result.get('status') == 'success':
+            try:
+                manager.schedule_repost(repost_content, datetime.fromtimestamp(row['due_at']))
+            except Exception as e:
+                # 投稿は済んでいるので、履歴の記録に失敗しても再投稿はしない
+                print(f"Warning: Could not record repost history for {row['article_url']}: {e}")
+            self._finish(repost_id, 'published', result, title)
+        elif self._never_reached_blog(result):
+            self._retry_or_fail(row, result, title)
+        else:
+            # 応答を受け取れなかった失敗（タイムアウトなど）は、recover() でブログを確かめてから再投稿する
+            self._finish(repost_id, 'publishing', result, title)
+        return result
+
+    def recover(self) -> Dict[str, int]:
+        """投稿中に中断した予定を、ブログに投稿済みかを確かめて 'published' か 'pending' に戻す
+
+        記事一覧を取得できなかったブログの予定は 'publishing' のまま残し、次回の確認に回す。
+        試行回数を使い切った予定は、投稿が確認できなければ 'failed' にする。
+        このプロセスで投稿中の予定は対象にしない。
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, blog, title, attempts, updated_at, sent_at FROM scheduled_reposts "
+                "WHERE status = 'publishing'"
+            ).fetchall()
+        with self._condition:
+            rows = [row for row in rows if row['id'] not in self._in_flight]
+
+        recovered = {'published': 0, 'pending': 0, 'failed': 0, 'unverified': 0}
+        entries_by_blog: Dict[str, Optional[List[Dict]]] = {}
+
+        for row in rows:
+            blog = row['blog']
+            if blog not in entries_by_blog:
+                manager = self.managers.get(blog)
+                try:
+                    response = manager.publisher.get_entries() if manager and manager.publisher else None
+                except Exception as e:
+                    print(f"Warning: Could not fetch entries for blog '{blog}': {e}")
+                    response = None
+                entries_by_blog[blog] = response.get('entries', []) if response and response.get('status') == 'success' else None
+
+            entries = entries_by_blog[blog]
+            if entries is None:
+                recovered['unverified'] += 1
+                continue
+
+            if any(self._is_same_post(entry, row) for entry in entries):
+                if self._finish(row['id'], 'published', {"status": "success", "recovered": True},
+                                from_status='publishing'):
+                    recovered['published'] += 1
+            elif row['attempts'] >= self.max_attempts:
+                if self._finish(row['id'], 'failed', {"status": "error", "message": "Not published after retries"},
+                                from_status='publishing'):
+                    recovered['failed'] += 1
+            else:
+                now = time.time()
+                if self._finish(row['id'], 'pending', {"status": "error", "message": "Interrupted before publishing"},
+                                due_at=now, from_status='publishing'):
+                    self._push(now, row['id'])
+                    recovered['pending'] += 1
+
+        return recovered
+
+    @staticmethod
+    def _is_same_post(entry: Dict, row: sqlite3.Row) -> bool:
+        """タイトルが同じで、投稿リクエストを送った時刻以降に作られた記事か
+
+        公開日時が無い・解釈できない記事は、以前に同じタイトルで投稿した記事と区別できないので一致とみなさない。
+        送信時刻の無い予定（sent_at を記録する前のキュー）は、投稿を始めた時刻と比べる。
+        """
+        if not row['title'] or entry.get('title') != row['title']:
+            return False
+        try:
+            published = datetime.fromisoformat(entry['published'].replace('Z', '+00:00'))
+        except (KeyError, AttributeError, TypeError, ValueError):
+            return False
+        sent_at = row['sent_at'] if row['sent_at'] is not None else row['updated_at']
+        # 送信時刻とブログ側の時刻のずれを少し許容する
+        return published.timestamp() >= sent_at - 60
+
+    def run_once(self, now: Optional[float] = None) -> List[Dict]:
+        """予定時刻を過ぎた再掲載をすべて投稿して結果を返す（ブログごとの並列数を守る）"""
+        due = self._pop_due(now or time.time())
+        if not due:
+            return []
+
+        with self._lock:
+            placeholders = ','.join('?' * len(due))
+            blogs = {
+                row['id']: row['blog'] for row in self.conn.execute(
+                    f"SELECT id, blog FROM scheduled_reposts WHERE id IN ({placeholders})", due
+                )
+            }
+
+        executors = {
+            blog: ThreadPoolExecutor(max_workers=self.per_blog_limit) for blog in set(blogs.values())
+        }
+        try:
+            futures = [
+                executors[blogs[repost_id]].submit(self._publish, repost_id) for repost_id in due if repost_id in blogs
+            ]
+            wait_futures(futures)
+        finally:
+            for executor in executors.values():
+                executor.shutdown()
+
+        return [future.result() for future in futures if future.result() is not None]
+
+    @staticmethod
+    def _report_failure(future):
+        """投稿スレッドで捕捉されなかった例外を表示する"""
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Error: Repost publishing failed: {future.exception()}")
+
+    def run_forever(self, recover_interval: float = 600):
+        """stop() が呼ばれるまで、予定時刻に合わせて投稿を続ける
+
+        recover_interval秒ごとに recover() を実行し、確認できなかった予定を確かめ直す。
+        """
+        self.recover()
+        next_recover = time.time() + recover_interval
+        executors: Dict[str, ThreadPoolExecutor] = {}
+
+        try:
+            while True:
+                with self._condition:
+                    while not self._stopping:
+                        now = time.time()
+                        due_at = self._heap[0][0] if self._heap else None
+                        if now >= next_recover or (due_at is not None and due_at <= now):
+                            break
+                        # 次の予定時刻か次の確認時刻まで（予定が追加されれば起こされる）眠る
+                        self._condition.wait(min(next_recover, due_at if due_at is not None else next_recover) - now)
+                    if self._stopping:
+                        return
+
+                if time.time() >= next_recover:
+                    self.recover()
+                    next_recover = time.time() + recover_interval
+
+                for repost_id in self._pop_due(time.time()):
+                    with self._lock:
+                        row = self.conn.execute(
+                            "SELECT blog FROM scheduled_reposts WHERE id = ?", (repost_id,)
+                        ).fetchone()
+                    if row is None:
+                        continue
+                    executor = executors.get(row['blog'])
+                    if executor is None:
+                        executor = ThreadPoolExecutor(max_workers=self.per_blog_limit)
+                        executors[row['blog']] = executor
+                    executor.submit(self._publish, repost_id).add_done_callback(self._report_failure)
+        finally:
+            # 未着手の投稿は取り消す（キューには 'pending' のまま残り、次回の起動時に読み込まれる）
+            for executor in executors.values():
+                executor.shutdown(cancel_futures=True)
+
+    def stop(self):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+
+    def get_status_summary(self) -> Dict:
+        """予定の状態ごとの件数"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT status, COUNT(*) AS count FROM scheduled_reposts GROUP BY status"
+            ).fetchall()
+        return {row['status']: row['count'] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
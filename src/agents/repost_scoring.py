@@ -0,0 +1,122 @@
+import hashlib
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+# (経過日数・文字数の下限, 加点) を大きい順に並べる
+AGE_SCORE_STEPS = ((180, 10), (90, 5), (30, 2))
+WORD_COUNT_SCORE_STEPS = ((1500, 5), (800, 3), (300, 1))
+CATEGORY_SCORE = 3
+
+ONE_DAY = np.timedelta64(1, 'D')
+
+
+@lru_cache(maxsize=65536)
+def generate_article_id(url: str) -> str:
+    return hashlib.md5(url.encode()).hexdigest()[:10]
+
+
+@lru_cache(maxsize=65536)
+def parse_article_date(date_str: str) -> Optional[datetime]:
+    """記事の日付文字列を解釈（同じ文字列は1回だけ解析する）
+
+    タイムゾーン付きの日時はローカル時刻に変換し、datetime.now() と比較できる形にそろえる。
+    """
+    try:
+        # Handle various date formats
+        if 'T' in date_str:
+            article_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        else:
+            # Try parsing as simple date string
+            article_date = datetime.strptime(date_str, '%Y-%m-%d')
+    except (ValueError, TypeError) as e:
+        print(f"Warning: Could not parse date '{date_str}': {e}")
+        return None
+
+    if article_date.tzinfo is not None:
+        article_date = article_date.astimezone().replace(tzinfo=None)
+    return article_date
+
+
+def _step_score(value: float, steps) -> int:
+    for threshold, score in steps:
+        if value > threshold:
+            return score
+    return 0
+
+
+def _step_scores(values: np.ndarray, steps) -> np.ndarray:
+    return np.select([values > threshold for threshold, _ in steps], [score for _, score in steps], 0)
+
+
+def performance_score(article: Dict, now: Optional[datetime] = None) -> float:
+    """記事1件の再掲載スコア"""
+    score = 0.0
+
+    article_date = parse_article_date(article['date']) if article.get('date') else None
+    if article_date is not None:
+        score += _step_score(((now or datetime.now()) - article_date).days, AGE_SCORE_STEPS)
+
+    if len(article.get('categories', [])) > 0:
+        score += CATEGORY_SCORE
+
+    score += _step_score(article.get('word_count', 0), WORD_COUNT_SCORE_STEPS)
+    return score
+
+
+class ArticleColumns:
+    """記事リストをスコア計算に使う列ごとの配列に変換する
+
+    日付は1回だけ解析して datetime64 配列に保持し、スコアはベクトル演算でまとめて求める。
+    """
+
+    def __init__(self, articles: List[Dict]):
+        self.articles = articles
+        self.ids = [generate_article_id(article['url']) for article in articles]
+        self.dates = np.array(
+            [parse_article_date(article['date']) if article.get('date') else None for article in articles],
+            dtype='datetime64[us]'
+        )
+        self.word_counts = np.array([article.get('word_count', 0) for article in articles], dtype=np.int64)
+        self.has_categories = np.array([len(article.get('categories', [])) > 0 for article in articles], dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def scores(self, now: Optional[datetime] = None) -> np.ndarray:
+        """全記事の再掲載スコア（performance_score と同じ値）"""
+        scores = _step_scores(self.word_counts, WORD_COUNT_SCORE_STEPS).astype(np.float64)
+        scores += np.where(self.has_categories, CATEGORY_SCORE, 0)
+
+        days_old = days_since(self.dates, now)
+        scores += np.where(np.isnat(self.dates), 0, _step_scores(days_old, AGE_SCORE_STEPS))
+        return scores
+
+
+def days_since(dates: np.ndarray, now: Optional[datetime] = None) -> np.ndarray:
+    """各日時からnowまでの経過日数（timedelta.days と同じく切り捨て。NaTの要素は0）"""
+    now = np.datetime64(now or datetime.now(), 'us')
+    with np.errstate(invalid='ignore'):
+        return (now - dates) // ONE_DAY
+
+
+def top_k_indices(scores: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """スコアの高い順にk件の添字を返す（同点は添字の小さい順。全体をソートしない）"""
+    candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(scores))
+    values = scores[candidates]
+
+    if k <= 0 or not len(candidates):
+        return candidates[:0]
+
+    if k < len(candidates):
+        kth = np.partition(values, len(values) - k)[len(values) - k]
+        above = values > kth
+        # 境界の点数の記事は添字の小さい順に残りの枠を埋める
+        ties = np.flatnonzero(values == kth)[:k - int(above.sum())]
+        keep = np.sort(np.concatenate([np.flatnonzero(above), ties]))
+        candidates, values = candidates[keep], values[keep]
+
+    return candidates[np.argsort(-values, kind='stable')]
@@ -1,5 +1,6 @@
 import os
 import re
+import bisect
 from typing import List, Dict, Optional, Tuple
 from langchain.embeddings import OpenAIEmbeddings
 from langchain.vectorstores import Chroma
@@ -13,6 +14,10 @@ from chromadb.config import Settings
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
+from .keyword_matcher import KeywordMatcher
+
+
+SENTENCE_DELIMITERS = re.compile(r'[。！？]')
 
 
 class RetrievalAgent:
@@ -217,28 +222,45 @@ class RetrievalAgent:
         if not related_articles:
             return content
         
-        # コンテンツを解析してリンク挿入ポイントを特定
-        sentences = re.split(r'[。！？]', content)
-        enhanced_content = content
+        return self._insert_internal_links(content, related_articles)
+    
+    def _insert_internal_links(self, content: str, related_articles: List[Dict]) -> str:
+        """タイトル語を含む最初の文の末尾に関連記事リンクを1回の走査で挿入"""
+        # 全記事のタイトル語から照合器を一度だけ構築
+        term_articles = {}
+        for index, article in enumerate(related_articles):
+            for word in article['title'].split():
+                # 短すぎる単語と文区切りを含む単語は除外
+                if len(word) > 2 and not SENTENCE_DELIMITERS.search(word):
+                    term_articles.setdefault(word, []).append(index)
         
-        # 各関連記事について適切な挿入ポイントを探す
-        for article in related_articles:
-            title_words = article['title'].split()
-            
-            # タイトルのキーワードが含まれる文を探す
-            for sentence in sentences:
-                for word in title_words:
-                    if word in sentence and len(word) > 2:  # 短すぎる単語は除外
-                        # リンクを挿入
-                        link_text = f"[{article['title']}]({article['url']})"
-                        enhanced_content = enhanced_content.replace(
-                            sentence, 
-                            sentence + f"\n\n関連記事: {link_text}",
-                            1  # 最初の1件のみ
-                        )
-                        break
-                else:
-                    continue
+        if not term_articles:
+            return content
+        
+        matcher = KeywordMatcher(term_articles)
+        sentence_ends = [m.start() for m in SENTENCE_DELIMITERS.finditer(content)]
+        
+        # 各記事について最初に一致した文の末尾を挿入位置とする
+        insertion_points = {}
+        for start, _, word in matcher.iter_matches(content):
+            for index in term_articles[word]:
+                if index not in insertion_points:
+                    position = bisect.bisect_left(sentence_ends, start)
+                    insertion_points[index] = sentence_ends[position] if position < len(sentence_ends) else len(content)
+            if len(insertion_points) == len(related_articles):
                 break
         
-        return enhanced_content
\ No newline at end of file
+        if not insertion_points:
+            return content
+        
+        # 挿入位置順に出力を一度だけ組み立てる
+        pieces = []
+        last = 0
+        for index, position in sorted(insertion_points.items(), key=lambda item: (item[1], item[0])):
+            article = related_articles[index]
+            pieces.append(content[last:position])
+            pieces.append(f"\n\n関連記事: [{article['title']}]({article['url']})")
+            last = position
+        pieces.append(content[last:])
+        
+        return ''.join(pieces)
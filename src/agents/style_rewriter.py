@@ -0,0 +1,70 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+# 文体ごとの文末表現の置換
+SENTENCE_ENDING_RULES = {
+    'casual': {
+        # 「です・ます」を「だ・である」に変換
+        'です。': 'だ。',
+        'ます。': 'る。'
+    },
+    'formal': {
+        # カジュアルな表現をフォーマルに
+        'だ。': 'である。',
+        'だよ。': 'です。'
+    }
+}
+
+# 技術用語を平易な表現に置換
+PLAIN_VOCABULARY = {
+    'アルゴリズム': '手順',
+    'インターフェース': '画面',
+    'パラメータ': '設定値'
+}
+
+PERSONAL_PHRASE = 'ちなみに、'
+NUMBERED_ITEM = re.compile(r'\d+[.)]([^。]+。)')
+
+
+class StyleRewriter:
+    """プロファイルごとの書き換え規則を前もって組み立てておき、本文に順に適用する
+
+    - 語句の置換（文末表現・語彙）は str.replace（C実装の部分文字列置換）で行う
+    - 2段落目の先頭へのフレーズ追加は最初の段落区切りだけを置換し、split/joinを行わない
+    - 番号付きの項目の箇条書き化はコンパイル済みのパターンとテンプレートで置換する
+
+    適用しない規則は組み立て時に除くので、該当しない書き換えのために本文を走査しない。
+    """
+
+    def __init__(self,
+                 replacements: Optional[Dict[str, str]] = None,
+                 paragraph_prefix: Optional[str] = None,
+                 bullet_lists: bool = False):
+        self.replacements: List[Tuple[str, str]] = list((replacements or {}).items())
+        self.paragraph_prefix = paragraph_prefix
+        self.bullet_lists = bullet_lists
+
+    @classmethod
+    def for_profile(cls, style: str, technical_terms: str, common_phrases: Dict, paragraph_structure: Dict) -> 'StyleRewriter':
+        replacements = dict(SENTENCE_ENDING_RULES.get(style, {}))
+        if technical_terms == 'minimal':
+            replacements.update(PLAIN_VOCABULARY)
+
+        return cls(
+            replacements=replacements,
+            paragraph_prefix=PERSONAL_PHRASE if 'ちなみに' in common_phrases else None,
+            bullet_lists=bool(paragraph_structure.get('uses_bullet_points'))
+        )
+
+    def rewrite(self, content: str) -> str:
+        for old, new in self.replacements:
+            content = content.replace(old, new)
+
+        if self.paragraph_prefix:
+            content = content.replace('\n\n', '\n\n' + self.paragraph_prefix, 1)
+
+        if self.bullet_lists:
+            content = NUMBERED_ITEM.sub(r'• \1', content)
+
+        return content
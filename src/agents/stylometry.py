@@ -0,0 +1,310 @@
+import json
+import os
+import re
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+# よく使われるフレーズ
+COMMON_PHRASES = [
+    'ということで', 'ちなみに', 'そもそも', '要するに', 'つまり', '実際に', 'とりあえず',
+    'いわゆる', '一方で', 'しかし', 'また', 'さらに', '例えば'
+]
+TECH_TERMS = [
+    'API', 'JSON', 'HTML', 'CSS', 'JavaScript', 'Python', 'SQL',
+    'アルゴリズム', 'データベース', 'フレームワーク', 'ライブラリ'
+]
+PERSONAL_PRONOUNS = ['私', '僕', '俺', 'わたし', 'ぼく']
+EMOTIONAL_EXPRESSIONS = ['すごい', 'とても', 'めちゃくちゃ', '本当に', 'かなり']
+
+TOP_SENTENCE_ENDINGS = 20
+SENTENCE_ENDING_CAPACITY = 1024
+SHARD_SIZE = 200
+
+SENTENCE_DELIMITERS = re.compile(r'[。！？]')
+NON_KATAKANA = re.compile(r'[^ァ-ヴー]+')
+NUMBERED_LIST = re.compile(r'\d[.)]')
+
+
+class TopKSketch:
+    """併合可能な頻出要素の要約（Misra-Gries）
+
+    要素数がcapacityの2倍を超えたら、(capacity+1)番目の頻度を全体から引いて上位だけを残す。
+    種類数がcapacity以下なら正確な頻度になり、超えた場合も誤差は総数/(capacity+1)以下。
+    併合した結果が併合の順序や分割によらず一致するのは、一度も間引かなかった場合だけ。
+    間引いた場合は順序によって頻度が変わりうるが、誤差の上限は同じく総数/(capacity+1)。
+    """
+
+    def __init__(self, capacity: int = SENTENCE_ENDING_CAPACITY, counts: Optional[Dict[str, int]] = None):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = dict(counts or {})
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, item: str, count: int = 1):
+        self.counts[item] = self.counts.get(item, 0) + count
+        if len(self.counts) > 2 * self.capacity:
+            self._prune()
+
+    def update(self, counts: Dict[str, int]):
+        for item, count in counts.items():
+            self.counts[item] = self.counts.get(item, 0) + count
+        if len(self.counts) > 2 * self.capacity:
+            self._prune()
+
+    def merge(self, other: 'TopKSketch'):
+        """頻度を足し合わせる（要素数が2*capacityを超えれば間引く）"""
+        self.update(other.counts)
+
+    def _prune(self):
+        threshold = sorted(self.counts.values(), reverse=True)[self.capacity]
+        # 挿入順（初出順）を保ったまま、閾値を引いて正の頻度だけを残す
+        self.counts = {
+            item: count - threshold for item, count in self.counts.items() if count > threshold
+        }
+
+    def most_common(self, n: int) -> List:
+        return sorted(self.counts.items(), key=lambda x: x[1], reverse=True)[:n]
+
+
+class StyleFeatures:
+    """文体の特徴量を記事ごとにまとめて集計する
+
+    文の分割は記事ごとに1回だけ行い、文末・文数・段落内の文数をその結果から求める。
+    固定の語句は正規表現ではなく str.count / in（C実装の部分文字列検索）で数える。
+    """
+
+    COUNTERS = [
+        'documents', 'total_chars', 'katakana_chars', 'sentences', 'paragraphs', 'paragraph_chars',
+        'paragraph_sentences', 'exclamations', 'questions'
+    ]
+    TABLES = ['phrases', 'personal_pronouns', 'technical_terms', 'emotional_expressions']
+    FLAGS = ['uses_bullet_points', 'uses_numbered_lists']
+
+    def __init__(self, ending_capacity: int = SENTENCE_ENDING_CAPACITY):
+        self.sentence_endings = TopKSketch(ending_capacity)
+        self.phrases: Dict[str, int] = {}
+        self.personal_pronouns: Dict[str, int] = {}
+        # 技術用語・感情表現はそれを含む記事数
+        self.technical_terms: Dict[str, int] = {}
+        self.emotional_expressions: Dict[str, int] = {}
+        self.documents = 0
+        self.total_chars = 0
+        self.katakana_chars = 0
+        self.sentences = 0
+        self.paragraphs = 0
+        self.paragraph_chars = 0
+        self.paragraph_sentences = 0
+        self.exclamations = 0
+        self.questions = 0
+        self.uses_bullet_points = False
+        self.uses_numbered_lists = False
+
+    def add_documents(self, contents: Iterable[str]):
+        for content in contents:
+            self.add_document(content)
+
+    def add_document(self, content: str):
+        """記事1件分の特徴を加算"""
+        self.documents += 1
+        self.total_chars += len(content)
+
+        sentences = [sentence.strip() for sentence in SENTENCE_DELIMITERS.split(content)]
+        self.sentences += len(sentences)
+        # 文末の2-3文字を集計
+        self.sentence_endings.update(Counter([sentence[-3:] for sentence in sentences if sentence]))
+
+        self.exclamations += content.count('！')
+        self.questions += content.count('？')
+
+        paragraphs = content.split('\n\n')
+        self.paragraphs += len(paragraphs)
+        self.paragraph_chars += sum(len(paragraph) for paragraph in paragraphs if paragraph.strip())
+        if len(paragraphs) == 1:
+            self.paragraph_sentences += len(sentences) - sentences.count('')
+        else:
+            # 段落をまたぐ文は段落ごとに数え直す
+            for sentence in sentences:
+                if '\n\n' in sentence:
+                    self.paragraph_sentences += sum(1 for piece in sentence.split('\n\n') if piece.strip())
+                elif sentence:
+                    self.paragraph_sentences += 1
+
+        for phrase in COMMON_PHRASES:
+            count = content.count(phrase)
+            if count:
+                self.phrases[phrase] = self.phrases.get(phrase, 0) + count
+
+        for pronoun in PERSONAL_PRONOUNS:
+            count = content.count(pronoun)
+            if count:
+                self.personal_pronouns[pronoun] = self.personal_pronouns.get(pronoun, 0) + count
+
+        # 技術用語・感情表現は記事ごとの出現有無を記録
+        for term in TECH_TERMS:
+            if term in content:
+                self.technical_terms[term] = self.technical_terms.get(term, 0) + 1
+        for expr in EMOTIONAL_EXPRESSIONS:
+            if expr in content:
+                self.emotional_expressions[expr] = self.emotional_expressions.get(expr, 0) + 1
+
+        self.katakana_chars += len(NON_KATAKANA.sub('', content))
+
+        if not self.uses_bullet_points and ('・' in content or '•' in content):
+            self.uses_bullet_points = True
+        if not self.uses_numbered_lists and NUMBERED_LIST.search(content):
+            self.uses_numbered_lists = True
+
+    def merge(self, other: 'StyleFeatures') -> 'StyleFeatures':
+        """別の集計結果を足し合わせる
+
+        文末以外の集計は記事の分割方法や順序によらず同じ結果になる。
+        文末の頻度も、TopKSketchが間引かない範囲では同じになる。
+        """
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for name in self.TABLES:
+            table = getattr(self, name)
+            for key, count in getattr(other, name).items():
+                table[key] = table.get(key, 0) + count
+        for name in self.FLAGS:
+            setattr(self, name, getattr(self, name) or getattr(other, name))
+        self.sentence_endings.merge(other.sentence_endings)
+        return self
+
+    @classmethod
+    def merged(cls, parts: Iterable['StyleFeatures']) -> 'StyleFeatures':
+        total = cls()
+        for part in parts:
+            total.merge(part)
+        return total
+
+    def to_dict(self) -> Dict:
+        """JSONに保存できる形式"""
+        data = {name: getattr(self, name) for name in self.COUNTERS + self.FLAGS}
+        data.update({name: dict(getattr(self, name)) for name in self.TABLES})
+        data['sentence_endings'] = dict(self.sentence_endings.counts)
+        data['ending_capacity'] = self.sentence_endings.capacity
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'StyleFeatures':
+        features = cls(data.get('ending_capacity', SENTENCE_ENDING_CAPACITY))
+        for name in cls.COUNTERS + cls.FLAGS:
+            if name in data:
+                setattr(features, name, data[name])
+        for name in cls.TABLES:
+            setattr(features, name, dict(data.get(name, {})))
+        features.sentence_endings.update(data.get('sentence_endings', {}))
+        return features
+
+    def to_patterns(self) -> Dict:
+        """PersonalizationAgent.writing_patterns 形式に変換"""
+        return {
+            'sentence_endings': dict(self.sentence_endings.most_common(TOP_SENTENCE_ENDINGS)),
+            'common_phrases': {phrase: self.phrases[phrase] for phrase in COMMON_PHRASES if phrase in self.phrases},
+            'vocabulary_preferences': {
+                'katakana_ratio': self.katakana_chars / self.total_chars if self.total_chars else 0,
+                'technical_terms': [
+                    term for term in TECH_TERMS for _ in range(self.technical_terms.get(term, 0))
+                ],
+                'informal_expressions': [],
+                'formal_expressions': []
+            },
+            'paragraph_structure': {
+                'avg_paragraph_length': self.paragraph_chars / self.paragraphs if self.paragraphs else 0,
+                'avg_sentences_per_paragraph': self.paragraph_sentences / self.paragraphs if self.paragraphs else 0,
+                'uses_bullet_points': self.uses_bullet_points,
+                'uses_numbered_lists': self.uses_numbered_lists
+            },
+            'tone_indicators': {
+                'exclamation_ratio': self.exclamations / self.sentences if self.sentences else 0,
+                'question_ratio': self.questions / self.sentences if self.sentences else 0,
+                'personal_pronouns': {
+                    pronoun: self.personal_pronouns[pronoun]
+                    for pronoun in PERSONAL_PRONOUNS if pronoun in self.personal_pronouns
+                },
+                'emotional_expressions': [
+                    expr for expr in EMOTIONAL_EXPRESSIONS for _ in range(self.emotional_expressions.get(expr, 0))
+                ]
+            }
+        }
+
+
+def _article_content(article: Dict) -> str:
+    return article.get('full_content', '') or article.get('content', '')
+
+
+def iter_article_contents(path: str) -> Iterator[str]:
+    """記事ファイルから本文を1件ずつ読み出す
+
+    JSON Lines（1行1記事）は1行ずつ読むので、ファイル全体をメモリに載せない。
+    JSON配列（extracted_articles.json 形式）はファイル単位で読み込む。
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                line = line.strip()
+                if line:
+                    content = _article_content(json.loads(line))
+                    if content:
+                        yield content
+            return
+
+        articles = json.load(f)
+
+    for article in articles:
+        content = _article_content(article)
+        if content:
+            yield content
+
+
+def _iter_shards(paths: Iterable[str], shard_size: int) -> Iterator[List[str]]:
+    shard = []
+    for path in paths:
+        for content in iter_article_contents(path):
+            shard.append(content)
+            if len(shard) >= shard_size:
+                yield shard
+                shard = []
+    if shard:
+        yield shard
+
+
+def analyze_shard(contents: List[str]) -> StyleFeatures:
+    """1シャード分の特徴量を集計（プロセスプールのワーカーで実行される）"""
+    features = StyleFeatures()
+    features.add_documents(contents)
+    return features
+
+
+def analyze_corpus(paths: Iterable[str], workers: Optional[int] = None, shard_size: int = SHARD_SIZE) -> StyleFeatures:
+    """記事ファイル群をシャードに分けてプロセスプールで集計し、部分結果を併合する
+
+    処理中のシャード数をワーカー数の2倍までに抑えるので、コーパス全体をメモリに載せない。
+    部分結果は投入順に併合する。文末の種類数がTopKSketchの間引きの範囲を超えなければ、
+    結果はシリアル処理と一致する（超えた場合は文末の頻度だけが誤差の上限内で異なりうる）。
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+
+    total = StyleFeatures()
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for shard in _iter_shards(paths, shard_size):
+            total.add_documents(shard)
+        return total
+
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard in _iter_shards(paths, shard_size):
+            pending.append(executor.submit(analyze_shard, shard))
+            if len(pending) >= workers * 2:
+                total.merge(pending.popleft().result())
+        while pending:
+            total.merge(pending.popleft().result())
+
+    return total
@@ -0,0 +1,129 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+
+# MeCabが利用できない場合の文字種ごとの区切り
+FALLBACK_TOKEN_PATTERN = re.compile(r'[一-龥々〆ヵヶ]+|[ァ-ヴー]+|[ぁ-ん]+|[A-Za-z0-9]+')
+# MeCabが利用できない場合のキーワード候補（従来の簡易抽出と同じ規則）
+FALLBACK_KEYWORD_PATTERN = re.compile(r'[ァ-ヴー]+|[ぁ-ん]+|[A-Za-z]+')
+
+# (表層形, 品詞, 品詞細分類1)
+Token = Tuple[str, str, str]
+
+
+class JapaneseTokenizer:
+    """MeCabによる形態素解析を共有するサービス
+
+    Taggerは辞書の読み込みが重いため、スレッドごとに1度だけ生成して使い回す。
+    解析結果はテキストのハッシュをキーにしたLRUキャッシュに保持する。
+    """
+
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, Tuple[Token, ...]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()
+        self._mecab = None
+        self._mecab_checked = False
+
+    @property
+    def mecab_available(self) -> bool:
+        if not self._mecab_checked:
+            try:
+                import MeCab
+                self._mecab = MeCab
+            except ImportError:
+                self._mecab = None
+            self._mecab_checked = True
+        return self._mecab is not None
+
+    def _tagger(self):
+        tagger = getattr(self._local, 'tagger', None)
+        if tagger is None:
+            tagger = self._mecab.Tagger()
+            self._local.tagger = tagger
+        return tagger
+
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def _parse(self, text: str) -> Tuple[Token, ...]:
+        if not self.mecab_available:
+            return tuple((word, '', '') for word in FALLBACK_TOKEN_PATTERN.findall(text))
+
+        tokens = []
+        node = self._tagger().parseToNode(text)
+        while node:
+            if node.surface:
+                features = node.feature.split(',')
+                tokens.append((node.surface, features[0], features[1] if len(features) > 1 else ''))
+            node = node.next
+        return tuple(tokens)
+
+    def tokenize(self, text: str) -> Tuple[Token, ...]:
+        """テキストを (表層形, 品詞, 品詞細分類1) の列に分割（結果はキャッシュされる）"""
+        key = self._cache_key(text)
+        with self._cache_lock:
+            tokens = self._cache.get(key)
+            if tokens is not None:
+                self._cache.move_to_end(key)
+                return tokens
+
+        tokens = self._parse(text)
+
+        with self._cache_lock:
+            self._cache[key] = tokens
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return tokens
+
+    def tokenize_many(self, texts: Iterable[str]) -> List[Tuple[Token, ...]]:
+        """複数テキストをまとめて解析（同じテキストは1回だけ解析する）"""
+        texts = list(texts)
+        parsed = {text: self.tokenize(text) for text in dict.fromkeys(texts)}
+        return [parsed[text] for text in texts]
+
+    def words(self, text: str) -> List[str]:
+        """表層形の列"""
+        return [surface for surface, _, _ in self.tokenize(text)]
+
+    def extract_keywords(self, text: str) -> List[str]:
+        """名詞（非自立・代名詞・数を除く2文字以上）を初出順に抽出"""
+        if not self.mecab_available:
+            words = FALLBACK_KEYWORD_PATTERN.findall(text)
+            return list(dict.fromkeys(word for word in words if len(word) > 2))
+
+        keywords = (
+            surface for surface, pos, detail in self.tokenize(text)
+            if pos == '名詞' and detail not in ('非自立', '代名詞', '数') and len(surface) > 1
+        )
+        return list(dict.fromkeys(keywords))
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    def __reduce__(self):
+        # ロック・スレッドローカルのTaggerは保存せず、読み込み時に作り直す（保存したベクトライザー用）
+        if self is _shared_tokenizer:
+            return get_tokenizer, ()
+        return JapaneseTokenizer, (self.cache_size,)
+
+
+_shared_tokenizer: Optional[JapaneseTokenizer] = None
+_shared_tokenizer_lock = threading.Lock()
+
+
+def get_tokenizer() -> JapaneseTokenizer:
+    """プロセス内で共有するトークナイザー"""
+    global _shared_tokenizer
+    if _shared_tokenizer is None:
+        with _shared_tokenizer_lock:
+            if _shared_tokenizer is None:
+                _shared_tokenizer = JapaneseTokenizer()
+    return _shared_tokenizer
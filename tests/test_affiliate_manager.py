@@ -0,0 +1,206 @@
+import json
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.affiliate_manager import AffiliateManager
+from src.agents.product_catalog import ProductCatalog
+from src.agents.product_index import ProductKeywordIndex
+
+
+def test_product_index_scores_all_products_in_one_pass():
+    index = ProductKeywordIndex([
+        {'name': 'mouse', 'keywords': ['マウス', 'PC', 'ワイヤレス']},
+        {'name': 'hub', 'keywords': ['USB', 'PC']},
+        {'name': 'coffee', 'keywords': ['コーヒー']},
+    ])
+
+    text = "ワイヤレスのマウスをPCにつなぐ。マウスは便利。PCR検査とは無関係"
+    assert index.score(text) == {0: 3, 1: 1}
+
+    ranked = index.search(text, min_score=1, limit=1)
+    assert [(product['name'], score) for product, score in ranked] == [('mouse', 3)]
+
+    # 英数字キーワードは単語の途中では一致しない
+    assert index.matched_keywords("PCRとUSBC") == set()
+
+
+def test_affiliate_manager_uses_product_index():
+    manager = AffiliateManager()
+    content = "Pythonのプログラミング入門。\n\n初心者向けです。\n\nコーヒーを飲みながら。"
+
+    enhanced = manager.auto_detect_and_insert_affiliate_products(content)
+    assert 'プログラミング入門書' in enhanced
+    assert 'コーヒーメーカー' not in enhanced
+
+    suggestions = manager.suggest_products("Pythonでプログラミング開発", category='book')
+    assert [product['name'] for product in suggestions] == ['Python実践入門', 'リーダブルコード']
+    assert manager.suggest_products("Pythonでプログラミング開発", category='tech') == []
+
+    # カテゴリ未指定でも、おすすめ候補だけを重複なしで返す
+    suggestions = manager.suggest_products("パソコンのマウスとPythonプログラミングの話")
+    assert [product['name'] for product in suggestions] == [
+        'ワイヤレスマウス', 'Python実践入門', 'USB-Cハブ', 'リーダブルコード'
+    ]
+    assert all('url' not in product for product in suggestions)
+
+
+def test_product_catalog_loads_jsonl_and_reloads_on_change(tmp_path):
+    catalog_path = tmp_path / "products.jsonl"
+    catalog_path.write_text(
+        json.dumps({'name': 'テント', 'url': 'https://item.rakuten.co.jp/tent',
+                    'keywords': ['キャンプ', 'テント'], 'group': 'outdoor'}, ensure_ascii=False) + "\n",
+        encoding='utf-8'
+    )
+
+    catalog = ProductCatalog(str(catalog_path), check_interval=0)
+    assert [product['name'] for product, _ in catalog.search("キャンプでテント泊")] == ['テント']
+    assert catalog.search("キャンプでテント泊", category='kitchen') == []
+
+    catalog_path.write_text(
+        json.dumps({'name': 'バーナー', 'keywords': 'キャンプ,バーナー', 'category': 'outdoor'}, ensure_ascii=False) + "\n",
+        encoding='utf-8'
+    )
+    os.utime(catalog_path, ns=(1, 1))
+
+    assert [product['name'] for product, _ in catalog.search("キャンプ", category='outdoor')] == ['バーナー']
+    assert catalog.search("キャンプ", require_url=True) == []
+
+
+def test_product_catalog_loads_sqlite_and_is_shared(tmp_path):
+    db_path = tmp_path / "products.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE products (name TEXT, url TEXT, price TEXT, keywords TEXT, service TEXT)")
+    conn.execute(
+        "INSERT INTO products VALUES (?, ?, ?, ?, ?)",
+        ('ドリッパー', 'https://item.rakuten.co.jp/dripper', '¥1,000', '["コーヒー", "ドリップ"]', 'rakuten')
+    )
+    conn.commit()
+    conn.close()
+
+    first = AffiliateManager(catalog_path=str(db_path))
+    second = AffiliateManager(catalog_path=str(db_path))
+    assert first.catalog is second.catalog
+
+    enhanced = first.auto_detect_and_insert_affiliate_products("ドリップでコーヒーを淹れる")
+    assert 'ドリッパー' in enhanced
+
+
+
+def test_catalog_row_without_price_is_inserted_without_price_line(tmp_path):
+    db_path = tmp_path / "products.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE products (name TEXT, url TEXT, price TEXT, keywords TEXT)")
+    conn.execute(
+        "INSERT INTO products VALUES (?, ?, ?, ?)",
+        ('ケトル', 'https://item.rakuten.co.jp/kettle', None, 'コーヒー,ドリップ')
+    )
+    conn.commit()
+    conn.close()
+
+    enhanced = AffiliateManager(catalog_path=str(db_path)).auto_detect_and_insert_affiliate_products(
+        "ドリップでコーヒーを淹れる"
+    )
+    assert 'ケトル' in enhanced
+    assert '価格' not in enhanced
+
+
+def test_product_catalog_keeps_index_when_reload_fails(tmp_path):
+    db_path = tmp_path / "products.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE products (name TEXT, keywords TEXT)")
+    conn.execute("INSERT INTO products VALUES (?, ?)", ('ドリッパー', 'コーヒー'))
+    conn.commit()
+    conn.close()
+
+    catalog = ProductCatalog(str(db_path), check_interval=0)
+    # 差し替える索引はオートマトンまで構築済み
+    assert catalog._index._matcher._built
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TABLE products")
+    conn.commit()
+    conn.close()
+    assert catalog.reload_if_changed(force=True) is False
+    assert [product['name'] for product, _ in catalog.search("コーヒー")] == ['ドリッパー']
+
+    os.remove(db_path)
+    assert catalog.reload_if_changed(force=True) is False
+    assert [product['name'] for product, _ in catalog.search("コーヒー")] == ['ドリッパー']
+
+
+def test_process_article_content_rewrites_in_one_pass(monkeypatch):
+    manager = AffiliateManager()
+    manager.set_affiliate_tag('rakuten', 'mytag')
+
+    detected = []
+    original_detect = manager.detect_affiliate_service
+    monkeypatch.setattr(
+        manager, 'detect_affiliate_service',
+        lambda url: detected.append(url) or original_detect(url)
+    )
+
+    url = 'https://hb.afl.rakuten.co.jp/hgc/item'
+    content = f"おすすめ {url}. もう一度 {url} と https://example.com/page"
+    modified, processed = manager.process_article_content(content)
+
+    tagged = f"{url}?mafRakutenWidgetParam=mytag"
+    assert modified == f"おすすめ {tagged}. もう一度 {tagged} と https://example.com/page"
+    assert [item['service'] for item in processed] == ['rakuten', 'rakuten']
+    assert detected == [url, 'https://example.com/page']
+
+    manager.set_affiliate_tag('rakuten', 'other')
+    modified, _ = manager.process_article_content(url)
+    assert modified == f"{url}?mafRakutenWidgetParam=other"
+
+
+def test_analyze_affiliate_performance_scans_in_parallel_and_caches(monkeypatch):
+    from src.agents import affiliate_manager as affiliate_module
+
+    manager = AffiliateManager()
+    articles = [
+        {'full_content': f"記事{i} https://hb.afl.rakuten.co.jp/item{i} https://example.com/"}
+        for i in range(4)
+    ] + [{'full_content': ''}, {'content': 'リンクなし'}]
+
+    pools = []
+
+    class RecordingPool(affiliate_module.ProcessPoolExecutor):
+        def __init__(self, max_workers=None):
+            pools.append(max_workers)
+            super().__init__(max_workers=max_workers)
+
+    monkeypatch.setattr(affiliate_module, 'ProcessPoolExecutor', RecordingPool)
+
+    # チャンクを小さくして、複数のチャンクがプロセスプールを通るようにする
+    contents = [article.get('full_content') or article.get('content') for article in articles]
+    contents = [content for content in contents if content]
+    parallel = manager.scan_articles(contents, workers=2, chunk_size=2)
+    assert pools == [2]
+    assert parallel == AffiliateManager().scan_articles(contents, workers=1)
+    assert parallel[:4] == [{'rakuten': 1}] * 4 and parallel[4] == {}
+
+    report = manager.analyze_affiliate_performance(articles, workers=2)
+    assert report['analyzed_articles'] == 5
+    assert report['articles_with_affiliate'] == 4
+    assert report['service_distribution'] == {'rakuten': 4}
+
+    scanned = []
+    original_scan = affiliate_module._scan_affiliate_services
+    monkeypatch.setattr(
+        affiliate_module, '_scan_affiliate_services',
+        lambda pattern, services, contents: scanned.extend(contents) or original_scan(pattern, services, contents)
+    )
+
+    articles.append({'full_content': 'https://affiliate.rakuten.co.jp/new'})
+    report = manager.analyze_affiliate_performance(articles, workers=1)
+    assert scanned == ['https://affiliate.rakuten.co.jp/new']
+    assert report['service_distribution'] == {'rakuten': 5}
+
+
+def test_analyze_affiliate_performance_without_content():
+    report = AffiliateManager().analyze_affiliate_performance([])
+    assert report['total_articles'] == 0
+    assert report['articles_with_affiliate'] == 0
@@ -266,7 +266,7 @@ class TestHatenaBlogAgentTools(unittest.TestCase):
     @patch('article_updater.generate_image_from_prompt')
     @patch('article_updater.find_internal_links')
     @patch('article_updater.generate_affiliate_link')
-    @patch('article_updater.search_products')
+    @patch('article_updater.search_products_many')
     @patch('article_updater.extract_keywords')
     @patch('article_updater.generate_summary')
     def test_enhance_article_content_success_all_steps(
@@ -283,7 +283,7 @@ class TestHatenaBlogAgentTools(unittest.TestCase):
             if keyword == "keyword1": return [{"itemCode": "code_for_keyword1", "itemName": "Product For Keyword1", "itemUrl": "http://example.com/product1"}]
             if keyword == "keyword2": return [{"itemCode": "code_for_keyword2", "itemName": "Product For Keyword2", "itemUrl": "http://example.com/product2"}]
             return []
-        mock_search_products.side_effect = search_side_effect
+        mock_search_products.side_effect = lambda keywords: {keyword: search_side_effect(keyword) for keyword in keywords}
         
         # Simulate affiliate link generation
         mock_generate_affiliate_link.side_effect = lambda item_url, item_price, affiliate_id, product_name: f"http://affiliate.link/{product_name.replace(' ', '_')}"
@@ -313,11 +313,8 @@ class TestHatenaBlogAgentTools(unittest.TestCase):
         # Assert calls
         mock_generate_summary.assert_called_once_with(original_content, length="long")
         mock_extract_keywords.assert_called_once_with(keywords_for_prompt, num_keywords=10)
-        # search_products is called for each keyword from mock_extract_keywords
-        self.assertEqual(mock_search_products.call_count, 3)
-        mock_search_products.assert_any_call(keyword="keyword1", applicationId="dummy_rakuten_app_id")
-        mock_search_products.assert_any_call(keyword="keyword2", applicationId="dummy_rakuten_app_id")
-        mock_search_products.assert_any_call(keyword="unmatched_keyword", applicationId="dummy_rakuten_app_id")
+        # all keywords from mock_extract_keywords are looked up in one batch
+        mock_search_products.assert_called_once_with(["keyword1", "keyword2", "unmatched_keyword"])
         # generate_affiliate_link is called for keywords that had products
         self.assertEqual(mock_generate_affiliate_link.call_count, 2)
         mock_find_internal_links.assert_called_once() # Check specific args if necessary
@@ -331,7 +328,7 @@ class TestHatenaBlogAgentTools(unittest.TestCase):
     ):
         original_content = "<p>Original content.</p>"
         # Keep other mocks minimal or default if they are not the focus of this failure test
-        with patch('article_updater.search_products', return_value=[]), \
+        with patch('article_updater.search_products_many', return_value={}), \
              patch('article_updater.find_internal_links', return_value=[]):
             
             enhanced_html = enhance_article_content_operations(
@@ -350,7 +347,7 @@ class TestHatenaBlogAgentTools(unittest.TestCase):
             mock_extract_keywords.assert_called_once()
 
 
-    @patch('article_updater.search_products') # We need to mock this so it doesn't try to make real calls
+    @patch('article_updater.search_products_many') # We need to mock this so it doesn't try to make real calls
     @patch('article_updater.extract_keywords', return_value=[]) # No keywords found
     def test_enhance_article_content_no_keywords_found(self, mock_extract_keywords, mock_search_products):
         with patch('article_updater.generate_summary', return_value="Summary.") as mock_gen_sum, \
@@ -368,7 +365,7 @@ class TestHatenaBlogAgentTools(unittest.TestCase):
             self.assertIn("img_url", enhanced_html) # Other parts should still work
 
     @patch('article_updater.generate_affiliate_link') # To check it's not called
-    @patch('article_updater.search_products', return_value=[]) # No products found
+    @patch('article_updater.search_products_many', return_value={}) # No products found
     @patch('article_updater.extract_keywords', return_value=["keyword1", "keyword2"])
     def test_enhance_article_content_no_products_found(
         self, mock_extract_keywords, mock_search_products, mock_generate_affiliate_link
@@ -388,7 +385,7 @@ class TestHatenaBlogAgentTools(unittest.TestCase):
             self.assertNotIn("href=", enhanced_html) # No affiliate links should be added
             
             mock_extract_keywords.assert_called_once()
-            self.assertEqual(mock_search_products.call_count, 2) # Called for each keyword
+            mock_search_products.assert_called_once_with(["keyword1", "keyword2"]) # One batched lookup
             mock_generate_affiliate_link.assert_not_called() # Not called as no products were found
             self.assertIn("img_url", enhanced_html) # Image should still be there
 
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# main.py の起動時に読み込まれてはいけない重量級ライブラリ
+HEAVY_MODULES = [
+    'langchain', 'chromadb', 'sklearn', 'networkx', 'matplotlib',
+    'PIL', 'bingart', 'aiohttp', 'bs4', 'pdb',
+]
+
+# 起動時importの累積時間の上限（マイクロ秒）
+IMPORT_BUDGET_US = 500_000
+
+
+def run_importtime(module: str) -> dict:
+    """python -X importtime の結果を {モジュール名: 累積時間(us)} に変換"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        pytest.skip(f"Could not import {module}: {completed.stderr.strip().splitlines()[-1]}")
+
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def test_main_does_not_import_heavy_dependencies():
+    timings = run_importtime('main')
+    loaded = [name for name in timings if name.split('.')[0] in HEAVY_MODULES]
+
+    assert loaded == [], f"main.py imported heavy modules at startup: {loaded}"
+
+
+def test_main_import_time_within_budget():
+    timings = run_importtime('main')
+
+    assert timings['main'] < IMPORT_BUDGET_US, f"import main took {timings['main']}us"
+
+
+def test_api_utils_does_not_import_debugger():
+    timings = run_importtime('api_utils')
+
+    assert 'pdb' not in timings
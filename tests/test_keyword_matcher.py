@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.keyword_matcher import KeywordMatcher
+
+
+def test_iter_matches_reports_overlapping_keywords():
+    matcher = KeywordMatcher(["Python", "Python入門", "入門書"])
+    matches = list(matcher.iter_matches("Python入門書を読んだ"))
+
+    assert (0, 6, "Python") in matches
+    assert (0, 8, "Python入門") in matches
+    assert (6, 9, "入門書") in matches
+
+
+def test_count_and_find_all():
+    matcher = KeywordMatcher(["マウス", "PC"])
+    text = "PCとマウス。マウスは大事。"
+
+    assert matcher.count(text) == {"PC": 1, "マウス": 2}
+    assert matcher.find_all(text) == ["PC", "マウス"]
+    assert matcher.find_all("関係ない文章") == []
+
+
+def test_add_after_build_rebuilds():
+    matcher = KeywordMatcher(["abc"])
+    assert matcher.find_all("xabcd") == ["abc"]
+
+    matcher.add("bcd")
+    assert matcher.find_all("xabcd") == ["abc", "bcd"]
+    assert len(matcher) == 2
+    assert "bcd" in matcher
+
+
+def test_count_is_stable_across_rebuilds():
+    matcher = KeywordMatcher(["abc", "bc"])
+    assert matcher.count("abc") == {"abc": 1, "bc": 1}
+
+    matcher.add("xyz")
+    assert matcher.count("abc") == {"abc": 1, "bc": 1}
+
+    matcher.build()
+    matcher.build()
+    assert matcher.count("abcxyz") == {"abc": 1, "bc": 1, "xyz": 1}
+
+
+def test_internal_links_inserted_at_first_matching_sentence():
+    pytest.importorskip("langchain")
+    from src.agents.retrieval_agent import RetrievalAgent
+
+    agent = RetrievalAgent.__new__(RetrievalAgent)
+    content = "前置きです。Dockerの使い方を説明します。Kubernetesも扱います。"
+    related = [
+        {'title': 'Kubernetes 入門', 'url': 'https://example.com/k8s'},
+        {'title': 'Docker 入門', 'url': 'https://example.com/docker'},
+    ]
+
+    result = agent._insert_internal_links(content, related)
+
+    assert result == (
+        "前置きです。Dockerの使い方を説明します\n\n関連記事: [Docker 入門](https://example.com/docker)。"
+        "Kubernetesも扱います\n\n関連記事: [Kubernetes 入門](https://example.com/k8s)。"
+    )
@@ -0,0 +1,357 @@
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("bs4")
+
+from src.agents.host_scheduler import HostScheduler, parse_retry_after
+from src.agents.link_checker import LinkChecker
+from src.agents.link_store import LinkStatusStore
+
+
+def make_response(status_code, url, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.url = url
+    response.history = []
+    response.headers = headers or {}
+    return response
+
+
+def test_store_applies_per_status_ttl(tmp_path):
+    store = LinkStatusStore(str(tmp_path / "links.db"), status_ttls={'timeout': 0})
+    store.save({'url': 'https://a.example/ok', 'status': 'valid', 'status_code': 200})
+    store.save({'url': 'https://b.example/slow', 'status': 'timeout', 'status_code': None})
+
+    assert store.get('https://a.example/ok')['status'] == 'valid'
+    assert store.get('https://b.example/slow') is None
+    assert store.get('https://b.example/slow', include_expired=True)['status'] == 'timeout'
+    assert store.get_expired_urls() == ['https://b.example/slow']
+
+
+def test_store_domain_statistics(tmp_path):
+    store = LinkStatusStore(str(tmp_path / "links.db"))
+    store.save({'url': 'https://a.example/1', 'status': 'valid', 'response_time': 0.2})
+    store.save({'url': 'https://a.example/2', 'status': 'not_found', 'response_time': 0.4})
+    store.save({'url': 'https://b.example/1', 'status': 'timeout'})
+
+    stats = store.get_domain_statistics()
+
+    assert stats['a.example']['total'] == 2
+    assert stats['a.example']['valid'] == 1
+    assert stats['a.example']['invalid'] == 1
+    assert stats['a.example']['avg_response_time'] == pytest.approx(0.3)
+    assert stats['b.example']['unreachable'] == 1
+
+
+def test_fresh_result_skips_network(tmp_path):
+    db_path = str(tmp_path / "links.db")
+    first = LinkChecker(cache_db=db_path)
+    with patch.object(first.session, 'head', return_value=make_response(200, 'https://a.example/')):
+        first.check_single_link('https://a.example/')
+
+    second = LinkChecker(cache_db=db_path)
+    with patch.object(second.session, 'head') as mock_get:
+        result = second.check_single_link('https://a.example/')
+
+    mock_get.assert_not_called()
+    assert result['status'] == 'valid'
+
+
+def test_expired_link_is_revalidated_conditionally(tmp_path):
+    db_path = str(tmp_path / "links.db")
+    checker = LinkChecker(cache_db=db_path)
+    checker.link_store.status_ttls['valid'] = 0
+
+    with patch.object(checker.session, 'head',
+                      return_value=make_response(200, 'https://a.example/', {'ETag': '"v1"'})):
+        checker.check_single_link('https://a.example/')
+
+    checker.link_cache.clear()
+    with patch.object(checker.session, 'head',
+                      return_value=make_response(304, 'https://a.example/')) as mock_get:
+        result = checker.check_single_link('https://a.example/')
+
+    assert mock_get.call_args.kwargs['headers'] == {'If-None-Match': '"v1"'}
+    assert result['status'] == 'valid'
+    assert result['revalidated'] is True
+
+
+def test_head_probe_records_bytes_without_get():
+    checker = LinkChecker()
+    head_response = make_response(200, 'https://a.example/file.pdf', {'Content-Length': '5000000'})
+
+    with patch.object(checker.session, 'head', return_value=head_response), \
+            patch.object(checker.session, 'get') as mock_get:
+        result = checker.check_single_link('https://a.example/file.pdf')
+
+    mock_get.assert_not_called()
+    assert result['probe_method'] == 'HEAD'
+    assert result['bytes_transferred'] == len('Content-Length') + len('5000000') + 4
+
+
+def test_rejected_head_falls_back_to_ranged_get():
+    checker = LinkChecker()
+    ranged = make_response(206, 'https://a.example/', {'Content-Length': '1'})
+    ranged.content = b'x'
+
+    with patch.object(checker.session, 'head', return_value=make_response(405, 'https://a.example/')), \
+            patch.object(checker.session, 'get', return_value=ranged) as mock_get:
+        result = checker.check_single_link('https://a.example/')
+
+    assert mock_get.call_args.kwargs['headers'] == {'Range': 'bytes=0-0'}
+    assert mock_get.call_args.kwargs['stream'] is True
+    assert result['status'] == 'valid'
+    assert result['probe_method'] == 'GET'
+
+
+def test_audit_articles_checks_each_unique_url_once():
+    checker = LinkChecker()
+    articles = [
+        {'title': 'A', 'url': 'https://blog.example/a',
+         'full_content': '<a href="https://x.example/">x</a><a href="/b">b</a>'},
+        {'title': 'B', 'url': 'https://blog.example/b',
+         'full_content': '<a href="https://x.example/">x again</a>'},
+    ]
+    requested = []
+
+    async def fake_check(urls, max_concurrent=10):
+        requested.extend(urls)
+        return [{'url': url, 'status': 'valid', 'status_code': 200} for url in urls]
+
+    with patch.object(checker, 'check_links_async', side_effect=fake_check):
+        results = checker.audit_articles(articles)
+
+    assert requested == ['https://x.example/', 'https://blog.example/b']
+    assert [r['total_links'] for r in results] == [2, 1]
+    assert results[0]['statistics']['internal'] == 1
+    assert results[1]['links'][0]['text'] == 'x again'
+    assert results[1]['links'][0]['status'] == 'valid'
+
+
+def test_sync_check_inside_event_loop_points_to_async_version():
+    checker = LinkChecker()
+    article = {'title': 'A', 'url': 'https://blog.example/a', 'full_content': '<p>no links</p>'}
+
+    async def called_from_async_code():
+        with pytest.raises(RuntimeError, match=r"await audit_articles_async"):
+            checker.check_article_links(article)
+        return await checker.audit_articles_async([article])
+
+    assert asyncio.run(called_from_async_code())[0]['total_links'] == 0
+    assert checker.check_article_links(article)['total_links'] == 0
+
+
+def test_host_scheduler_limits_per_host_and_round_robins():
+    scheduler = HostScheduler(max_concurrent=4, per_host_limit=1, min_delay=0)
+    urls = [f'https://a.example/{i}' for i in range(3)] + [f'https://b.example/{i}' for i in range(3)]
+    active = {'a.example': 0, 'b.example': 0}
+    peak = {'a.example': 0, 'b.example': 0}
+    order = []
+
+    async def fetch(url):
+        host = HostScheduler.host_of(url)
+        active[host] += 1
+        peak[host] = max(peak[host], active[host])
+        order.append(host)
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        return {'url': url}, None
+
+    results = asyncio.run(scheduler.run(urls, fetch))
+
+    assert set(results) == set(urls)
+    assert peak == {'a.example': 1, 'b.example': 1}
+    assert order[:2] in (['a.example', 'b.example'], ['b.example', 'a.example'])
+
+
+
+def test_host_scheduler_drops_drained_hosts_from_rotation():
+    scheduler = HostScheduler(max_concurrent=4, per_host_limit=1, min_delay=0)
+    urls = [f'https://host{i}.example/' for i in range(50)] + ['https://busy.example/1', 'https://busy.example/2']
+    rotation_sizes = []
+
+    async def fetch(url):
+        # ローテーションには待ちのURLがあるホストだけが残る
+        assert all(scheduler._queues.values())
+        rotation_sizes.append(len(scheduler._queues))
+        await asyncio.sleep(0)
+        return {'url': url}, None
+
+    results = asyncio.run(scheduler.run(urls, fetch))
+
+    assert set(results) == set(urls)
+    assert rotation_sizes[-1] <= 1
+    assert not scheduler._queues
+
+
+def test_host_scheduler_retries_after_retry_after():
+    scheduler = HostScheduler(max_concurrent=2, per_host_limit=1, min_delay=0, max_retries=2)
+    calls = []
+
+    async def fetch(url):
+        calls.append(url)
+        if len(calls) == 1:
+            return {'url': url, 'status_code': 429}, 0.05
+        return {'url': url, 'status_code': 200}, None
+
+    start = time.monotonic()
+    results = asyncio.run(scheduler.run(['https://a.example/x'], fetch))
+
+    assert calls == ['https://a.example/x', 'https://a.example/x']
+    assert results['https://a.example/x']['status_code'] == 200
+    assert time.monotonic() - start >= 0.05
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after('9999', max_delay=60) == 60
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+
+def test_stream_audit_writes_reports_incrementally(tmp_path):
+    checker = LinkChecker()
+    articles = [
+        {'title': 'A', 'url': 'https://blog.example/a',
+         'full_content': '<a href="https://x.example/">x</a><a href="https://gone.example/">gone</a>'},
+        {'title': 'B', 'url': 'https://blog.example/b', 'full_content': '<p>no links</p>'},
+    ]
+    prefix = str(tmp_path / 'report')
+    statuses = {'https://x.example/': 'valid', 'https://gone.example/': 'not_found'}
+
+    async def fake_check(urls, max_concurrent=10, on_result=None, collect=True):
+        for url in urls:
+            result = {'url': url, 'status': statuses[url], 'status_code': 200}
+            checker.link_cache[url] = result
+            on_result(result)
+        return []
+
+    with patch.object(checker, 'check_links_async', side_effect=fake_check):
+        summary = checker.stream_audit(articles, prefix)
+
+    assert summary['articles'] == 2
+    assert summary['links'] == 2
+    assert summary['status_counts'] == {'valid': 1, 'not_found': 1}
+
+    with open(prefix + '.md', encoding='utf-8') as f:
+        markdown = f.read()
+    assert '**not_found**: https://gone.example/' in markdown
+    assert '- 総リンク数: 2' in markdown
+
+    with open(prefix + '.jsonl', encoding='utf-8') as f:
+        assert len(f.readlines()) == 2
+    with open(prefix + '.csv', encoding='utf-8') as f:
+        assert f.readline().startswith('article_title,article_url,url')
+
+
+
+def test_stream_audit_keeps_memory_cache_empty_across_batches(tmp_path):
+    checker = LinkChecker(cache_db=str(tmp_path / 'links.db'), min_host_delay=0)
+    articles = (
+        {'title': str(n), 'url': f'https://blog.example/{n}',
+         'full_content': f'<a href="https://shared.example/">s</a><a href="https://own.example/{n}">o</a>'}
+        for n in range(3)
+    )
+    probed = []
+
+    async def fake_probe(session, url, conditional_headers, timeout):
+        probed.append(url)
+        return MagicMock(status=200, url=url, history=(), headers={}), 'HEAD', 0
+
+    with patch.object(checker, '_probe_async', side_effect=fake_probe):
+        summary = checker.stream_audit(articles, str(tmp_path / 'report'), batch_size=1)
+
+    assert summary['articles'] == 3
+    assert summary['links'] == 6
+    # バッチをまたぐURLは永続ストアの結果を使い、メモリキャッシュには何も残さない
+    assert probed.count('https://shared.example/') == 1
+    assert len(probed) == 4
+    assert checker.link_cache == {}
+
+
+def test_link_monitor_prioritises_recent_articles_and_persists(tmp_path):
+    from datetime import datetime, timedelta
+    from src.agents.link_monitor import LinkMonitor
+
+    state_db = str(tmp_path / 'monitor.db')
+    recent = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    articles = [
+        {'url': 'https://blog.example/old', 'date': '2015-01-01',
+         'full_content': '<a href="https://old.example/">old</a>'},
+        {'url': 'https://blog.example/new', 'date': recent,
+         'full_content': '<a href="https://new.example/">new</a>'},
+    ]
+    monitor = LinkMonitor(LinkChecker(), state_db=state_db, batch_size=1)
+
+    assert monitor.register_articles(articles) == 2
+    assert monitor.register_articles(articles) == 0
+
+    checked = []
+
+    async def fake_check(urls, max_concurrent=10, refresh=False):
+        assert refresh
+        checked.extend(urls)
+        return [{'url': url, 'status': 'valid', 'checked_at': 'now'} for url in urls]
+
+    with patch.object(monitor.checker, 'check_links_async', side_effect=fake_check):
+        monitor.run_once(now=time.time() + 7 * 24 * 3600)
+
+    # 優先度の高い新しい記事のリンクが先に処理される
+    assert checked == ['https://new.example/']
+    monitor.close()
+
+    restored = LinkMonitor(LinkChecker(), state_db=state_db)
+    assert restored.get_status_summary() == {'valid': 1, 'pending': 1}
+    assert restored.revisit_interval(1.0) < restored.revisit_interval(0.0)
+
+
+def test_link_monitor_probes_due_links_despite_fresh_store_row(tmp_path):
+    from src.agents.link_monitor import LinkMonitor
+
+    checker = LinkChecker(cache_db=str(tmp_path / 'links.db'), min_host_delay=0)
+    checker.link_store.save({'url': 'https://a.example/', 'status': 'valid', 'status_code': 200})
+    monitor = LinkMonitor(checker, state_db=str(tmp_path / 'monitor.db'))
+    monitor.register_articles([{'url': 'https://blog.example/a', 'full_content': '<a href="https://a.example/">a</a>'}])
+
+    probed = []
+
+    async def fake_probe(session, url, conditional_headers, timeout):
+        probed.append(url)
+        response = MagicMock(status=404, url=url, history=(), headers={})
+        return response, 'HEAD', 0
+
+    with patch.object(checker, '_probe_async', side_effect=fake_probe):
+        results = monitor.run_once(now=time.time() + 7 * 24 * 3600)
+
+    # ストアの結果は有効期限内だが、期限の来た監視リンクは実際に確認する
+    assert probed == ['https://a.example/']
+    assert results[0]['status'] == 'not_found'
+    assert checker.link_store.get('https://a.example/')['status'] == 'not_found'
+    monitor.close()
+
+
+def test_link_monitor_drops_links_removed_from_articles(tmp_path):
+    from src.agents.link_monitor import LinkMonitor
+
+    monitor = LinkMonitor(LinkChecker(), state_db=str(tmp_path / 'monitor.db'))
+    article = {'url': 'https://blog.example/a',
+               'full_content': '<a href="https://keep.example/">k</a><a href="https://gone.example/">g</a>'}
+    other = {'url': 'https://blog.example/b', 'full_content': '<a href="https://other.example/">o</a>'}
+    assert monitor.register_articles([article, other]) == 3
+
+    article['full_content'] = '<a href="https://keep.example/">k</a>'
+    assert monitor.register_articles([article]) == 0
+
+    with monitor._lock:
+        urls = sorted(row['url'] for row in monitor.conn.execute("SELECT url FROM monitored_links"))
+    assert urls == ['https://keep.example/', 'https://other.example/']
+    monitor.close()
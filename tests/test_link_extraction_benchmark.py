@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+from urllib.parse import urljoin, urlparse
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+BeautifulSoup = pytest.importorskip("bs4").BeautifulSoup
+pytest.importorskip("aiohttp")
+
+from src.agents.link_checker import LinkChecker
+
+PARAGRAPH = (
+    '<p>これはテスト用の段落です。<strong>強調</strong>や<em>斜体</em>を含みます。'
+    '詳しくは<a href="/entry/{i}">関連記事 {i}</a>や'
+    '<a href="https://example.com/item/{i}?a=1&amp;b=2" target="_blank">外部 <b>リンク</b></a>'
+    'を参照してください。<!-- <a href="/hidden">コメント内</a> --></p>\n'
+)
+
+CORPUS = [
+    (''.join(PARAGRAPH.format(i=i) for i in range(40)), f'https://blog.example/entry/{n}')
+    for n in range(50)
+]
+
+
+def extract_with_beautifulsoup(content, base_url):
+    """以前のBeautifulSoupによる抽出処理（比較用）"""
+    soup = BeautifulSoup(content, 'html.parser')
+    links = []
+    for link in soup.find_all('a', href=True):
+        url = link['href']
+        if base_url and not url.startswith(('http://', 'https://')):
+            url = urljoin(base_url, url)
+        links.append({
+            'url': url,
+            'text': link.get_text(strip=True),
+            'is_internal': urlparse(base_url).netloc == urlparse(url).netloc,
+            'element': str(link)
+        })
+    return links
+
+
+def best_time(extract, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content, base_url in CORPUS:
+            extract(content, base_url)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_regex_extraction_matches_beautifulsoup():
+    checker = LinkChecker()
+    for content, base_url in CORPUS[:3]:
+        expected = extract_with_beautifulsoup(content, base_url)
+        actual = checker.extract_links_from_content(content, base_url)
+
+        assert [(l['url'], l['text'], l['is_internal']) for l in actual] == \
+            [(l['url'], l['text'], l['is_internal']) for l in expected]
+        assert [checker.get_link_element(content, l) for l in actual] == [l['element'] for l in expected]
+
+
+def test_regex_extraction_is_much_faster():
+    checker = LinkChecker()
+
+    baseline = best_time(extract_with_beautifulsoup)
+    optimized = best_time(checker.extract_links_from_content)
+    print(f"regex extraction speedup: {baseline / optimized:.1f}x")
+
+    # 手元では10倍以上速いが、負荷の高いCIでもぶれないよう余裕を持たせた下限にする
+    assert baseline / optimized >= 3, f"speedup only {baseline / optimized:.1f}x"
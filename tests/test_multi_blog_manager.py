@@ -0,0 +1,72 @@
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import multi_blog_manager
+from multi_blog_manager import get_multi_blog_manager, reset_multi_blog_manager
+
+SAMPLE_FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <id>tag:blog.hatena.ne.jp,2013:blog-test-12345</id>
+    <link rel="alternate" type="text/html" href="https://example.hatenablog.com/entry/1" />
+    <title>First Post</title>
+    <content type="text/html">body</content>
+    <published>2023-01-01T00:00:00+09:00</published>
+    <updated>2023-01-01T00:00:00+09:00</updated>
+    <category term="Tech" />
+  </entry>
+</feed>"""
+
+
+@pytest.fixture(autouse=True)
+def fresh_manager(monkeypatch):
+    monkeypatch.setenv("HATENA_BLOG_ATOMPUB_KEY_1", "dummy-key")
+    reset_multi_blog_manager()
+    yield
+    reset_multi_blog_manager()
+
+
+def test_manager_is_built_lazily_and_shared():
+    assert multi_blog_manager._multi_blog_manager is None
+
+    manager = get_multi_blog_manager()
+
+    assert manager is get_multi_blog_manager()
+    assert manager is multi_blog_manager.multi_blog_manager
+    assert "lifehack_blog" in manager.blogs
+
+
+def test_get_articles_reuses_session_and_mirror():
+    manager = get_multi_blog_manager()
+    response = MagicMock(content=SAMPLE_FEED)
+
+    with patch.object(manager.session, "get", return_value=response) as mock_get:
+        first = manager.get_articles("lifehack_blog")
+        first["articles"][0]["title"] = "Edited"
+        first["articles"][0]["categories"].append("edited")
+        first["articles"].clear()
+        second = manager.get_articles("lifehack_blog")
+        second["articles"][0]["title"] = "Edited again"
+        third = manager.get_articles("lifehack_blog")
+
+    assert mock_get.call_count == 1
+    assert third["articles"][0]["title"] == "First Post"
+    assert "edited" not in third["articles"][0]["categories"]
+
+
+def test_post_invalidates_mirror():
+    manager = get_multi_blog_manager()
+    response = MagicMock(content=SAMPLE_FEED)
+
+    with patch.object(manager.session, "get", return_value=response) as mock_get, \
+            patch.object(manager.session, "post", return_value=response):
+        manager.get_articles("lifehack_blog")
+        manager.post_article("lifehack_blog", "New", "content")
+        manager.get_articles("lifehack_blog")
+
+    assert mock_get.call_count == 2
@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.personalization_agent import PersonalizationAgent
+from src.agents.stylometry import StyleFeatures, TopKSketch, analyze_corpus
+
+ARTICLES = [
+    {'full_content': "私はPythonが好きです。ちなみに、APIも書きます！\n\n・ポイント"},
+    {'full_content': "僕はデータベースを設計した。とても楽しかったです。"},
+    {'content': "つまり、1. まずは試すことです？"},
+    {'full_content': "また、フレームワークの話です。しかし、本当に大事だ。"},
+]
+
+
+def test_merged_statistics_equal_single_pass():
+    contents = [article.get('full_content') or article.get('content') for article in ARTICLES]
+
+    whole = StyleFeatures()
+    whole.add_documents(contents)
+
+    left, right = StyleFeatures(), StyleFeatures()
+    left.add_documents(contents[:1])
+    right.add_documents(contents[1:])
+    merged = StyleFeatures.merged([right, StyleFeatures.from_dict(json.loads(json.dumps(left.to_dict())))])
+
+    assert merged.to_patterns() == whole.to_patterns()
+    assert merged.documents == 4
+
+
+def test_top_k_sketch_keeps_heavy_hitters():
+    sketch = TopKSketch(capacity=2)
+    for item in ['a'] * 10 + ['b'] * 6 + list('cdefg'):
+        sketch.add(item)
+
+    assert len(sketch) <= 4
+    assert [item for item, _ in sketch.most_common(2)] == ['a', 'b']
+
+
+def test_top_k_sketch_merge_with_pruning_stays_within_error_bound():
+    import random
+    from collections import Counter
+
+    rng = random.Random(7)
+    items = [f"h{rng.randint(0, 4)}" for _ in range(2000)] + [f"t{rng.randint(0, 3000)}" for _ in range(2000)]
+    truth = Counter(items)
+    bound = len(items) / (16 + 1)
+
+    parts = []
+    for i in range(0, len(items), 500):
+        part = TopKSketch(capacity=16)
+        part.update(Counter(items[i:i + 500]))
+        parts.append(part)
+
+    # 間引きが起きると併合の順序で頻度が変わりうるが、どの順序でも誤差は上限内に収まる
+    for order in (parts, parts[::-1]):
+        merged = TopKSketch(capacity=16)
+        for part in order:
+            merged.merge(part)
+        for item, count in truth.items():
+            assert count - bound <= merged.counts.get(item, 0) <= count
+        assert {item for item, _ in merged.most_common(5)} == {f"h{n}" for n in range(5)}
+
+
+def test_agent_learns_incrementally_and_restores_statistics(tmp_path):
+    profile_path = str(tmp_path / "profile.json")
+
+    agent = PersonalizationAgent(profile_path)
+    agent.analyze_writing_samples(ARTICLES[:2])
+    agent.add_writing_samples(ARTICLES[2:])
+
+    full = PersonalizationAgent(str(tmp_path / "full.json"))
+    full.analyze_writing_samples(ARTICLES)
+    assert agent.writing_patterns == full.writing_patterns
+
+    restored = PersonalizationAgent(profile_path)
+    assert restored.style_features.documents == 4
+    assert restored.writing_patterns == full.writing_patterns
+
+    other_blog = StyleFeatures()
+    other_blog.add_document("俺はCSSを書く。")
+    restored.merge_writing_statistics(other_blog.to_dict())
+    assert restored.writing_patterns['tone_indicators']['personal_pronouns']['俺'] == 1
+    assert restored.user_profile['learned_statistics']['documents'] == 5
+
+
+def test_corpus_analysis_across_processes_matches_serial(tmp_path):
+    jsonl_path = tmp_path / "blog1.jsonl"
+    with open(jsonl_path, 'w', encoding='utf-8') as f:
+        for article in ARTICLES * 3:
+            f.write(json.dumps(article, ensure_ascii=False) + "\n")
+    json_path = tmp_path / "blog2.json"
+    json_path.write_text(json.dumps(ARTICLES, ensure_ascii=False), encoding='utf-8')
+
+    serial = analyze_corpus([str(jsonl_path), str(json_path)], workers=1)
+    parallel = analyze_corpus([str(jsonl_path), str(json_path)], workers=2, shard_size=3)
+
+    # 文末の種類数が少なく間引きが起きない場合に限り、併合の結果はシリアル処理と完全に一致する
+    assert len(serial.sentence_endings) <= serial.sentence_endings.capacity
+
+    assert parallel.documents == serial.documents == 16
+    assert parallel.to_patterns() == serial.to_patterns()
+
+    agent = PersonalizationAgent(str(tmp_path / "profile.json"))
+    agent.analyze_writing_corpus([str(json_path)], workers=2)
+    assert agent.style_features.documents == 4
@@ -0,0 +1,95 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import rakuten_api
+from rakuten_api import RakutenProductSearch, TokenBucket, normalize_keyword
+
+
+class FakeResponse:
+    def __init__(self, keyword):
+        self.keyword = keyword
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"Items": [{"Item": {"itemName": f"{self.keyword} item", "itemCode": "shop:1", "itemUrl": "https://item.rakuten.co.jp/shop/1"}}]}
+
+
+class FakeSession:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self.lock:
+            self.calls.append(params["keyword"])
+        assert timeout is not None
+        time.sleep(self.delay)
+        return FakeResponse(params["keyword"])
+
+
+def make_search(tmp_path, delay=0.0):
+    search = RakutenProductSearch(
+        application_id="app", cache_path=str(tmp_path / "cache.db"), requests_per_second=1000
+    )
+    search.session = FakeSession(delay)
+    return search
+
+
+def test_duplicate_keywords_are_coalesced_and_cached(tmp_path):
+    search = make_search(tmp_path, delay=0.1)
+
+    results = search.search_many(["カメラ", "ｶﾒﾗ", "レンズ", "カメラ "])
+    assert sorted(search.session.calls) == sorted(["カメラ", "レンズ"])
+    assert results["ｶﾒﾗ"] == results["カメラ"]
+    assert normalize_keyword(" Python  入門 ") == "python 入門"
+
+    # A new instance reads the persistent cache and makes no request
+    again = make_search(tmp_path)
+    assert again.search("カメラ")[0]["itemName"] == "カメラ item"
+    assert again.session.calls == []
+
+
+def test_concurrent_lookups_of_same_keyword_share_one_request(tmp_path):
+    search = make_search(tmp_path, delay=0.2)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(search.search("テント"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert search.session.calls == ["テント"]
+    assert len(results) == 4 and all(result == results[0] for result in results)
+
+
+def test_token_bucket_paces_requests():
+    bucket = TokenBucket(rate=20, capacity=1)
+    started = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - started >= 0.18
+
+
+def test_missing_application_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(rakuten_api, "RAKUTEN_APP_ID", None)
+    search = RakutenProductSearch(cache_path=str(tmp_path / "cache.db"))
+    assert search.search("カメラ")["status"] == "error"
+
+
+def test_cache_defaults_to_data_directory(tmp_path):
+    if not os.getenv("RAKUTEN_CACHE_DB"):
+        assert os.path.dirname(rakuten_api.RAKUTEN_CACHE_DB) == rakuten_api.DATA_DIR
+
+    # A cache path in a directory that does not exist yet is created on first use
+    cache = rakuten_api.SearchCache(str(tmp_path / "data" / "nested" / "cache.db"))
+    cache.set("カメラ", [{"name": "camera"}])
+    assert cache.get("カメラ") == [{"name": "camera"}]
+    cache.close()
@@ -0,0 +1,119 @@
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.repost_history import DATA_DIR, REPOST_HISTORY_DB, RepostHistoryStore
+from src.agents.repost_manager import RepostManager
+
+
+def make_articles(count):
+    return [
+        {
+            'url': f"https://example.hatenablog.com/entry/{n}",
+            'title': f"記事{n}",
+            'date': (datetime.now() - timedelta(days=10 * n)).strftime('%Y-%m-%d'),
+            'categories': ['日記'] if n % 2 else [],
+            'word_count': 200 * n
+        }
+        for n in range(count)
+    ]
+
+
+def test_history_store_imports_legacy_json_and_aggregates(tmp_path):
+    legacy = tmp_path / "repost_history.json"
+    legacy.write_text(json.dumps({
+        'a1': {'original_url': 'https://example.com/a1', 'reposts': [
+            {'date': '2025-06-24T23:25:19', 'update_type': 'refresh', 'new_title': 'A1', 'status': 'published'},
+            {'date': '2025-01-01T00:00:00', 'update_type': 'seasonal', 'new_title': 'A1', 'status': 'published'}
+        ]},
+        'b2': {'original_url': 'https://example.com/b2', 'reposts': []}
+    }), encoding='utf-8')
+
+    store = RepostHistoryStore(str(tmp_path / "history.db"), legacy_json=str(legacy))
+    store.add('c3', 'https://example.com/c3', {'date': '2025-07-01T00:00:00', 'status': 'scheduled'})
+
+    # 最終日は日付の大小ではなく最後に記録したもの
+    assert store.stats() == {'a1': (2, '2025-01-01T00:00:00'), 'c3': (1, '2025-07-01T00:00:00')}
+    assert store.count('a1') == 2
+    assert store.last_date('b2') is None
+    store.close()
+
+    # 2回目以降は取り込み直さない
+    reopened = RepostHistoryStore(str(tmp_path / "history.db"), legacy_json=str(legacy))
+    assert len(reopened) == 3
+    assert reopened.to_dict()['a1']['reposts'][1]['update_type'] == 'seasonal'
+
+
+def test_history_store_defaults_to_data_dir_and_creates_it(tmp_path):
+    if not os.getenv('REPOST_HISTORY_DB'):
+        assert REPOST_HISTORY_DB == os.path.join(DATA_DIR, 'repost_history.db')
+
+    store = RepostHistoryStore(str(tmp_path / "nested" / "history.db"))
+    store.add('a1', 'https://example.com/a1', {'date': '2025-07-01T00:00:00', 'status': 'scheduled'})
+    assert (tmp_path / "nested" / "history.db").exists()
+    store.close()
+
+def test_manager_records_reposts_and_skips_recent_ones(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = RepostManager('user', history_db=str(tmp_path / "history.db"))
+    articles = make_articles(12)
+
+    top = manager.select_articles_for_repost(articles, max_articles=3)
+    for article in top[:2]:
+        repost = manager.create_repost_content(article)
+        manager.schedule_repost(repost)
+
+    performance = {item['url']: item for item in manager.analyze_article_performance(articles)}
+    assert performance[top[0]['url']]['repost_count'] == 1
+    assert performance[top[0]['url']]['last_repost'] == manager._get_last_repost_date(top[0]['article_id'])
+
+    selected = manager.select_articles_for_repost(articles, max_articles=3)
+    assert [item['url'] for item in selected][0] == top[2]['url']
+    assert not {item['url'] for item in top[:2]} & {item['url'] for item in selected}
+    assert manager.repost_history[top[0]['article_id']]['original_url'] == top[0]['url']
+    assert not os.path.exists(tmp_path / "repost_history.json")
+
+
+class FakePublisher:
+    def __init__(self):
+        self.posted = []
+
+    def publish_repost(self, repost_content, is_draft=True):
+        self.posted.append(repost_content['title'])
+        return {'status': 'success', 'title': repost_content['title']}
+
+
+def test_publish_scheduled_reposts_uses_full_articles_and_pool(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = RepostManager('user', history_db=str(tmp_path / "history.db"))
+    manager.publisher = FakePublisher()
+    manager.publish_pacer.min_interval = 0
+
+    articles = make_articles(45)
+    full_articles = [
+        dict(article, html_content=f'<div class="entry-content"><p>全文{n}</p></div>')
+        for n, article in enumerate(articles)
+    ]
+    past = (datetime.now() - timedelta(days=1)).isoformat()
+    future = (datetime.now() + timedelta(days=1)).isoformat()
+    calendar = [
+        {'article': article, 'publish_date': future if n == 0 else past, 'update_type': 'refresh'}
+        for n, article in enumerate(articles)
+    ]
+
+    dry_run = manager.publish_scheduled_reposts(calendar, full_articles_data=full_articles, workers=2)
+    assert [result['title'] for result in dry_run] == [f"【2025年版】記事{n}" for n in range(1, 45)]
+    assert manager.publisher.posted == []
+
+    results = manager.publish_scheduled_reposts(calendar, dry_run=False, full_articles_data=full_articles, workers=1)
+    assert len(results) == 44
+    assert manager.publisher.posted == [result['title'] for result in dry_run]
+    assert manager.history.count(manager._generate_article_id(articles[1]['url'])) == 1
+
+    serial = list(manager._prepare_reposts([(full_articles[3], 'refresh')] * 25, workers=1))
+    parallel = list(manager._prepare_reposts([(full_articles[3], 'refresh')] * 25, workers=2))
+    assert parallel == serial
+    assert '<p>全文3</p>' in serial[0]['content']
@@ -0,0 +1,89 @@
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.repost_manager import RepostManager
+from src.agents.repost_planner import RepostCalendarPlanner
+
+CATEGORIES = ['登山', 'ガジェット', '料理', 'Python', '旅行', '日記']
+
+
+def make_articles(blog, count, rng):
+    now = datetime.now()
+    return [
+        {
+            'url': f"https://{blog}.example.com/entry/{n}",
+            'title': f"{blog}の記事{n}",
+            'date': (now - timedelta(days=rng.randint(0, 800))).strftime('%Y-%m-%d'),
+            'categories': rng.sample(CATEGORIES, rng.randint(0, 2)),
+            'word_count': rng.randint(0, 3000)
+        }
+        for n in range(count)
+    ]
+
+
+def test_plan_respects_caps_intervals_and_category_spread(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rng = random.Random(3)
+    blogs = ['lifehack_blog', 'mountain_blog', 'tech_blog']
+    managers = {blog: RepostManager('user', history_db=str(tmp_path / "history.db")) for blog in blogs}
+    articles_by_blog = {blog: make_articles(blog, 3000, rng) for blog in blogs}
+
+    # 上位の記事を最近再掲載したことにする（最小間隔が空くまでは予定に入らない）
+    manager = managers['tech_blog']
+    recent = manager.select_articles_for_repost(articles_by_blog['tech_blog'], max_articles=3)
+    for article in recent:
+        repost = manager.create_repost_content(article)
+        manager.schedule_repost(repost, datetime.now() - timedelta(days=80))
+
+    planner = RepostCalendarPlanner(managers, daily_cap={'tech_blog': 2}, max_per_blog=8,
+                                    min_days_between_reposts=90)
+    start_time = time.perf_counter()
+    plan = planner.plan(articles_by_blog, weeks_ahead=4, start=datetime(2026, 1, 5, 9, 0))
+    elapsed = time.perf_counter() - start_time
+    print(f"planned {sum(len(c) for c in plan.values())} reposts from 9000 articles in {elapsed:.3f}s")
+    assert elapsed < 1.0
+
+    start = datetime(2026, 1, 5, 9, 0)
+    category_days = Counter()
+    urls = set()
+    for blog, calendar in plan.items():
+        assert len(calendar) == 8
+        days = [(datetime.fromisoformat(entry['publish_date']) - start).days for entry in calendar]
+        assert days == sorted(days) and all(0 <= day < 28 for day in days)
+        # ブログ内の投稿が期間全体に散らばる
+        assert days[-1] - days[0] >= 20
+        assert max(Counter(days).values()) <= (2 if blog == 'tech_blog' else 1)
+
+        for day, entry in zip(days, calendar):
+            article = entry['article']
+            urls.add(article['url'])
+            for category in article['categories']:
+                category_days[(category, day)] += 1
+            if article['last_repost']:
+                last = datetime.fromisoformat(article['last_repost'])
+                assert start + timedelta(days=day) >= last + timedelta(days=90)
+
+    assert len(urls) == 24
+    assert max(category_days.values()) == 1
+
+
+def test_planner_builds_managers_for_configured_blogs(tmp_path, monkeypatch):
+    import src.agents.repost_manager as repost_manager
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(repost_manager, 'REPOST_HISTORY_DB', str(tmp_path / "history.db"))
+    blog_manager = SimpleNamespace(blogs={
+        'tech_blog': SimpleNamespace(hatena_id='user', blog_domain=None, api_key=None)
+    })
+    planner = RepostCalendarPlanner.from_multi_blog_manager(blog_manager, max_per_blog=2)
+
+    plan = planner.plan({'tech_blog': make_articles('tech_blog', 10, random.Random(1)), 'unknown': []})
+    assert list(plan) == ['tech_blog']
+    assert len(plan['tech_blog']) == 2
@@ -0,0 +1,261 @@
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.repost_manager import RepostManager
+from src.agents.repost_scheduler import RepostScheduler
+
+
+class FakePublisher:
+    def __init__(self, fail_first=0):
+        self.posted = []
+        self.fail_first = fail_first
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def publish_repost(self, repost_content, is_draft=True):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+            if self.fail_first:
+                self.fail_first -= 1
+                return {'status': 'error', 'message': 'rate limited', 'status_code': 429,
+                        'title': repost_content['title']}
+            self.posted.append(repost_content['title'])
+        return {'status': 'success', 'title': repost_content['title']}
+
+    def get_entries(self):
+        published = datetime.now().astimezone().isoformat()
+        return {'status': 'success', 'entries': [{'title': title, 'published': published} for title in self.posted]}
+
+
+class TimingOutPublisher(FakePublisher):
+    """ブログは投稿を受け付けたが、応答を読めずにエラーの結果を返す（HatenaPublisherと同じく例外は投げない）"""
+
+    def publish_repost(self, repost_content, is_draft=True):
+        with self._lock:
+            self.posted.append(repost_content['title'])
+        return {'status': 'error', 'message': 'Read timed out', 'title': repost_content['title']}
+
+
+class RaisingPublisher(FakePublisher):
+    """投稿APIの呼び出しが例外で終わる（投稿されたかは分からない）"""
+
+    def __init__(self, posts_before_raising=False):
+        super().__init__()
+        self.posts_before_raising = posts_before_raising
+        self.calls = 0
+
+    def publish_repost(self, repost_content, is_draft=True):
+        self.calls += 1
+        if self.calls == 1:
+            if self.posts_before_raising:
+                self.posted.append(repost_content['title'])
+            raise ConnectionError("connection reset")
+        return super().publish_repost(repost_content, is_draft)
+
+
+def make_manager(tmp_path, name, publisher):
+    manager = RepostManager('user', history_db=str(tmp_path / f"{name}.db"))
+    manager.publisher = publisher
+    manager.publish_pacer.min_interval = 0
+    return manager
+
+
+def article(n):
+    return {'url': f"https://example.com/entry/{n}", 'title': f"記事{n}", 'categories': [], 'content': f"本文{n}"}
+
+
+def test_run_once_publishes_due_reposts_once_and_persists(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    publishers = {'blog1': FakePublisher(), 'blog2': FakePublisher()}
+    managers = {name: make_manager(tmp_path, name, publisher) for name, publisher in publishers.items()}
+    state_db = str(tmp_path / "scheduler.db")
+
+    scheduler = RepostScheduler(managers, state_db=state_db, per_blog_limit=2)
+    past = datetime.now() - timedelta(minutes=1)
+    for n in range(4):
+        scheduler.schedule('blog1', article(n), past)
+        scheduler.schedule('blog2', article(n), past)
+    scheduler.schedule('blog1', article(9), datetime.now() + timedelta(days=1))
+    # 同じ予定は二重に登録されない
+    assert scheduler.schedule('blog1', article(0), past) is None
+
+    results = scheduler.run_once()
+    assert len(results) == 8
+    assert sorted(publishers['blog1'].posted) == [f"【2025年版】記事{n}" for n in range(4)]
+    assert publishers['blog1'].max_active <= 2
+    assert managers['blog2'].history.count(managers['blog2']._generate_article_id(article(1)['url'])) == 1
+    assert scheduler.get_status_summary() == {'published': 8, 'pending': 1}
+    scheduler.close()
+
+    restored = RepostScheduler(managers, state_db=state_db)
+    assert restored.run_once() == []
+    assert restored.next_due() > time.time()
+    assert len(publishers['blog1'].posted) == 4
+
+
+def test_recover_checks_blog_before_republishing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    publisher = FakePublisher()
+    managers = {'blog': make_manager(tmp_path, 'blog', publisher)}
+    state_db = str(tmp_path / "scheduler.db")
+
+    scheduler = RepostScheduler(managers, state_db=state_db)
+    past = datetime.now() - timedelta(minutes=1)
+    done_id = scheduler.schedule('blog', article(1), past)
+    lost_id = scheduler.schedule('blog', article(2), past)
+
+    # 1件目は投稿後、2件目は投稿前にプロセスが落ちた状態を再現
+    scheduler._claim(done_id)
+    scheduler._claim(lost_id)
+    with scheduler.conn:
+        scheduler.conn.execute("UPDATE scheduled_reposts SET title = ? WHERE id = ?", ("【2025年版】記事1", done_id))
+        scheduler.conn.execute("UPDATE scheduled_reposts SET title = ? WHERE id = ?", ("【2025年版】記事2", lost_id))
+    publisher.posted.append("【2025年版】記事1")
+    scheduler.close()
+
+    restored = RepostScheduler(managers, state_db=state_db)
+    assert restored.recover() == {'published': 1, 'pending': 1, 'failed': 0, 'unverified': 0}
+    restored.run_once()
+    assert publisher.posted == ["【2025年版】記事1", "【2025年版】記事2"]
+    assert restored.get_status_summary() == {'published': 2}
+
+
+def test_run_forever_wakes_for_new_and_retried_reposts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    publisher = FakePublisher(fail_first=1)
+    managers = {'blog': make_manager(tmp_path, 'blog', publisher)}
+    scheduler = RepostScheduler(managers, state_db=str(tmp_path / "scheduler.db"), retry_delay=0.1)
+
+    thread = threading.Thread(target=scheduler.run_forever)
+    thread.start()
+    try:
+        time.sleep(0.05)
+        scheduler.schedule('blog', article(1), datetime.now() + timedelta(seconds=0.2))
+
+        deadline = time.time() + 5
+        while not publisher.posted and time.time() < deadline:
+            time.sleep(0.02)
+    finally:
+        scheduler.stop()
+        thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert publisher.posted == ["【2025年版】記事1"]
+    assert scheduler.get_status_summary() == {'published': 1}
+
+
+def test_publish_that_raises_is_verified_before_retrying(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for posted_anyway, expected in ((True, ["【2025年版】記事1"]), (False, ["【2025年版】記事1"])):
+        publisher = RaisingPublisher(posts_before_raising=posted_anyway)
+        managers = {'blog': make_manager(tmp_path, 'blog', publisher)}
+        scheduler = RepostScheduler(managers, state_db=str(tmp_path / f"scheduler_{posted_anyway}.db"))
+        scheduler.schedule('blog', article(1), datetime.now() - timedelta(minutes=1))
+
+        results = scheduler.run_once()
+        assert results[0]['message'] == "Unexpected error: connection reset"
+        # 投稿されたか分からない予定は 'publishing' のまま残り、再投稿されない
+        assert scheduler.get_status_summary() == {'publishing': 1}
+
+        recovered = scheduler.recover()
+        assert recovered['published' if posted_anyway else 'pending'] == 1
+        scheduler.run_once()
+        assert publisher.posted == expected
+        assert scheduler.get_status_summary() == {'published': 1}
+        scheduler.close()
+
+
+def test_error_before_publishing_is_retried_then_failed(tmp_path, monkeypatch):
+    import src.agents.repost_scheduler as repost_scheduler
+
+    monkeypatch.chdir(tmp_path)
+    publisher = FakePublisher()
+    managers = {'blog': make_manager(tmp_path, 'blog', publisher)}
+    scheduler = RepostScheduler(managers, state_db=str(tmp_path / "scheduler.db"), max_attempts=2, retry_delay=0)
+    scheduler.schedule('blog', article(1), datetime.now() - timedelta(minutes=1))
+
+    def broken_content(article, update_type):
+        raise KeyError('title')
+
+    monkeypatch.setattr(repost_scheduler, 'build_repost_content', broken_content)
+    scheduler.run_once()
+    assert scheduler.get_status_summary() == {'pending': 1}
+    scheduler.run_once()
+    assert scheduler.get_status_summary() == {'failed': 1}
+    assert publisher.posted == []
+
+
+def test_recover_ignores_entries_without_published_time(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    publisher = FakePublisher()
+    publisher.get_entries = lambda: {'status': 'success', 'entries': [
+        {'title': "【2025年版】記事1"}, {'title': "【2025年版】記事1", 'published': 'yesterday'}
+    ]}
+    managers = {'blog': make_manager(tmp_path, 'blog', publisher)}
+    scheduler = RepostScheduler(managers, state_db=str(tmp_path / "scheduler.db"))
+    repost_id = scheduler.schedule('blog', article(1), datetime.now() - timedelta(minutes=1))
+    scheduler._claim(repost_id)
+    with scheduler.conn:
+        scheduler.conn.execute("UPDATE scheduled_reposts SET title = ? WHERE id = ?", ("【2025年版】記事1", repost_id))
+
+    # 公開日時の分からない同名の記事は、以前の投稿かもしれないので投稿済みとはみなさない
+    assert scheduler.recover() == {'published': 0, 'pending': 1, 'failed': 0, 'unverified': 0}
+
+
+def test_run_forever_rechecks_unverified_reposts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    publisher = FakePublisher()
+    responses = [{'status': 'error', 'message': 'unavailable'}]
+    original_get_entries = publisher.get_entries
+    publisher.get_entries = lambda: responses.pop() if responses else original_get_entries()
+    managers = {'blog': make_manager(tmp_path, 'blog', publisher)}
+    scheduler = RepostScheduler(managers, state_db=str(tmp_path / "scheduler.db"))
+    repost_id = scheduler.schedule('blog', article(1), datetime.now() - timedelta(minutes=1))
+    scheduler._pop_due(time.time())
+    scheduler._claim(repost_id)
+
+    thread = threading.Thread(target=scheduler.run_forever, kwargs={'recover_interval': 0.1})
+    thread.start()
+    try:
+        deadline = time.time() + 5
+        while not publisher.posted and time.time() < deadline:
+            time.sleep(0.02)
+    finally:
+        scheduler.stop()
+        thread.join(timeout=5)
+
+    # 起動時は記事一覧を取得できず保留になり、次の確認で投稿前と分かって投稿される
+    assert publisher.posted == ["【2025年版】記事1"]
+    assert scheduler.get_status_summary() == {'published': 1}
+
+
+def test_error_result_without_response_is_verified_before_retrying(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    publisher = TimingOutPublisher()
+    managers = {'blog': make_manager(tmp_path, 'blog', publisher)}
+    scheduler = RepostScheduler(managers, state_db=str(tmp_path / "scheduler.db"), retry_delay=0)
+    repost_id = scheduler.schedule('blog', article(1), datetime.now() - timedelta(minutes=1))
+
+    for _ in range(3):
+        scheduler.run_once()
+    # 応答の無い失敗は再投稿せず、ブログを確かめるまで 'publishing' のまま
+    assert publisher.posted == ["【2025年版】記事1"]
+    assert scheduler.get_status_summary() == {'publishing': 1}
+
+    # 送信が長く待たされて結果の記録が遅れても、送信時刻と比べるので投稿済みと分かる
+    with scheduler.conn:
+        scheduler.conn.execute("UPDATE scheduled_reposts SET updated_at = updated_at + 600 WHERE id = ?", (repost_id,))
+    assert scheduler.recover()['published'] == 1
+    scheduler.run_once()
+    assert publisher.posted == ["【2025年版】記事1"]
+    assert scheduler.get_status_summary() == {'published': 1}
@@ -0,0 +1,70 @@
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.repost_manager import RepostManager
+from src.agents.repost_scoring import ArticleColumns, performance_score, top_k_indices
+
+
+def make_articles(count, seed=7):
+    rng = random.Random(seed)
+    now = datetime.now()
+    articles = []
+    for n in range(count):
+        published = now - timedelta(days=rng.randint(0, 400), hours=rng.randint(0, 23))
+        date = rng.choice([
+            published.strftime('%Y-%m-%d'),
+            published.strftime('%Y-%m-%dT%H:%M:%S'),
+            published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            published.strftime('%Y-%m-%dT%H:%M:%S+09:00'),
+            None,
+            '不明'
+        ])
+        articles.append({
+            'url': f"https://example.hatenablog.com/entry/{n}",
+            'title': f"記事{n}",
+            'date': date,
+            'categories': ['日記'] if rng.random() < 0.5 else [],
+            'word_count': rng.randint(0, 3000)
+        })
+    return articles
+
+
+def test_vectorised_scores_match_scalar_scores():
+    articles = make_articles(500)
+    now = datetime.now()
+    expected = [performance_score(article, now) for article in articles]
+    assert ArticleColumns(articles).scores(now).tolist() == expected
+
+
+def test_top_k_matches_stable_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.integers(0, 6, size=300).astype(float)
+    mask = rng.random(300) < 0.7
+    expected = [i for i in sorted(range(300), key=lambda i: -scores[i]) if mask[i]]
+    for k in (0, 1, 5, 37, 210, 400):
+        assert top_k_indices(scores, k, mask).tolist() == expected[:k]
+
+
+def test_selection_matches_full_sort_and_is_fast(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = RepostManager('user', history_db=str(tmp_path / "history.db"))
+    articles = make_articles(10000)
+    for article in manager.analyze_article_performance(articles)[:3]:
+        manager.schedule_repost(manager.create_repost_content(article))
+
+    performance = manager.analyze_article_performance(articles)
+    expected = [article for article in performance if not article['last_repost']][:5]
+
+    start = time.perf_counter()
+    selected = manager.select_articles_for_repost(articles, max_articles=5)
+    elapsed = time.perf_counter() - start
+
+    print(f"selected 5 of {len(articles)} articles in {elapsed:.4f}s")
+    assert selected == expected
@@ -0,0 +1,89 @@
+import itertools
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.personalization_agent import PersonalizationAgent
+from src.agents.style_rewriter import StyleRewriter
+
+ARTICLE = (
+    "このアルゴリズムはとても速いです。パラメータを調整します。\n\n"
+    "1. インターフェースを開きます。\n"
+    "2) 設定だよ。それで終わりだ。\n\n"
+    "3. 段落を\n\nまたぐ項目です。最後の文だ。"
+)
+
+PROFILES = list(itertools.product(
+    ['casual', 'formal', 'semi-formal'],
+    ['minimal', 'moderate'],
+    [{}, {'ちなみに': 3}],
+    [{}, {'uses_bullet_points': True}]
+))
+
+
+def personalize_with_separate_passes(content, style, technical_terms, common_phrases, structure):
+    """以前の4段階の書き換え処理（比較用）"""
+    if style == 'casual':
+        content = re.sub(r'です。', 'だ。', content)
+        content = re.sub(r'ます。', 'る。', content)
+    elif style == 'formal':
+        content = re.sub(r'だ。', 'である。', content)
+        content = re.sub(r'だよ。', 'です。', content)
+
+    if technical_terms == 'minimal':
+        for tech, simple in {'アルゴリズム': '手順', 'インターフェース': '画面', 'パラメータ': '設定値'}.items():
+            content = content.replace(tech, simple)
+
+    if 'ちなみに' in common_phrases:
+        paragraphs = content.split('\n\n')
+        if len(paragraphs) > 1:
+            paragraphs[1] = 'ちなみに、' + paragraphs[1]
+            content = '\n\n'.join(paragraphs)
+
+    if structure.get('uses_bullet_points'):
+        content = re.sub(r'(\d+)[.)]([^。]+。)', r'• \2', content)
+
+    return content
+
+
+def test_rewriter_matches_separate_passes():
+    samples = [ARTICLE, "", "単一の段落です。", "1.\n\n項目です。", "10) 番号だよ。"]
+    for profile in PROFILES:
+        rewriter = StyleRewriter.for_profile(*profile)
+        for content in samples:
+            assert rewriter.rewrite(content) == personalize_with_separate_passes(content, *profile)
+
+
+def test_agent_reuses_rewriter_until_profile_changes(tmp_path):
+    agent = PersonalizationAgent(str(tmp_path / "profile.json"))
+    agent.personalize_content(ARTICLE)
+    agent.personalize_content(ARTICLE)
+    assert len(agent._rewriters) == 1
+
+    agent.analyze_writing_samples([{'full_content': "ちなみに、・箇条書きです。"}])
+    assert not agent._rewriters
+    assert agent.personalize_content(ARTICLE, 'formal') == personalize_with_separate_passes(
+        ARTICLE, 'formal', 'moderate', {'ちなみに': 1}, {'uses_bullet_points': True}
+    )
+
+
+def test_rewriter_timing():
+    profile = ('casual', 'minimal', {'ちなみに': 1}, {'uses_bullet_points': True})
+    content = ARTICLE * 200
+    rewriter = StyleRewriter.for_profile(*profile)
+
+    def best_time(rewrite, repeat=5):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rewrite()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    old = best_time(lambda: personalize_with_separate_passes(content, *profile))
+    new = best_time(lambda: rewriter.rewrite(content))
+    print(f"separate passes: {old:.4f}s, rewriter: {new:.4f}s ({old / new:.1f}x)")
+    assert rewriter.rewrite(content) == personalize_with_separate_passes(content, *profile)
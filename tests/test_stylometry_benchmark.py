@@ -0,0 +1,124 @@
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.stylometry import (
+    COMMON_PHRASES, EMOTIONAL_EXPRESSIONS, PERSONAL_PRONOUNS, TECH_TERMS, StyleFeatures
+)
+
+PARAGRAPH = (
+    "私はPythonとJavaScriptでAPIを書いています。ちなみに、データベースはSQLiteです！"
+    "そもそも、なぜビッグデータベースが必要なのか？つまり、とても大事ということで、"
+    "本当にすごいフレームワークだ。しかし、また例えばライブラリアンの話もある。\n"
+    "・ポイント1. 実際に試す\n"
+    "1) 僕はかなりめちゃくちゃ書いた。\n\n"
+)
+
+CORPUS = [PARAGRAPH * 20 + f"記事{n}の最後の文" for n in range(60)] + ["", "\n\n\n", "。！？"]
+
+
+def analyze_with_separate_passes(contents):
+    """以前の5回の走査による分析処理（比較用）"""
+    endings = {}
+    for content in contents:
+        for sentence in re.split(r'[。！？]', content):
+            if sentence.strip():
+                ending = sentence.strip()[-3:]
+                endings[ending] = endings.get(ending, 0) + 1
+    sorted_endings = sorted(endings.items(), key=lambda x: x[1], reverse=True)
+
+    phrases = {}
+    for content in contents:
+        for pattern in COMMON_PHRASES:
+            matches = re.findall(pattern, content)
+            if matches:
+                phrases[pattern] = phrases.get(pattern, 0) + len(matches)
+
+    total_chars = sum(len(content) for content in contents)
+    katakana_chars = sum(len(re.findall(r'[ァ-ヴー]', content)) for content in contents)
+    technical_terms = [term for content in contents for term in TECH_TERMS if term in content]
+
+    structure = {'uses_bullet_points': False, 'uses_numbered_lists': False}
+    total_paragraphs = paragraph_sentences = paragraph_chars = 0
+    for content in contents:
+        paragraphs = content.split('\n\n')
+        total_paragraphs += len(paragraphs)
+        for paragraph in paragraphs:
+            if paragraph.strip():
+                paragraph_chars += len(paragraph)
+                paragraph_sentences += len([s for s in re.split(r'[。！？]', paragraph) if s.strip()])
+        if re.search(r'[・•]', content):
+            structure['uses_bullet_points'] = True
+        if re.search(r'\d+[.)]', content):
+            structure['uses_numbered_lists'] = True
+
+    total_sentences = exclamations = questions = 0
+    pronouns = {}
+    emotions = []
+    for content in contents:
+        total_sentences += len(re.split(r'[。！？]', content))
+        exclamations += content.count('！')
+        questions += content.count('？')
+        for pronoun in PERSONAL_PRONOUNS:
+            if content.count(pronoun):
+                pronouns[pronoun] = pronouns.get(pronoun, 0) + content.count(pronoun)
+        emotions.extend(expr for expr in EMOTIONAL_EXPRESSIONS if expr in content)
+
+    return {
+        'sentence_endings': dict(sorted_endings[:20]),
+        'common_phrases': phrases,
+        'vocabulary_preferences': {
+            'katakana_ratio': katakana_chars / total_chars,
+            'technical_terms': technical_terms,
+            'informal_expressions': [],
+            'formal_expressions': []
+        },
+        'paragraph_structure': {
+            'avg_paragraph_length': paragraph_chars / total_paragraphs,
+            'avg_sentences_per_paragraph': paragraph_sentences / total_paragraphs,
+            **structure
+        },
+        'tone_indicators': {
+            'exclamation_ratio': exclamations / total_sentences,
+            'question_ratio': questions / total_sentences,
+            'personal_pronouns': pronouns,
+            'emotional_expressions': emotions
+        }
+    }
+
+
+def analyze_with_style_features(contents):
+    features = StyleFeatures()
+    features.add_documents(contents)
+    return features.to_patterns()
+
+
+def best_time(analyze, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        analyze(CORPUS)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def sort_term_lists(patterns):
+    """記事ごとの出現リストは順序を問わず、出現回数だけを比較する"""
+    patterns['vocabulary_preferences']['technical_terms'].sort()
+    patterns['tone_indicators']['emotional_expressions'].sort()
+    return patterns
+
+
+def test_style_features_match_separate_passes():
+    expected = sort_term_lists(analyze_with_separate_passes(CORPUS))
+    assert sort_term_lists(analyze_with_style_features(CORPUS)) == expected
+
+
+def test_style_features_are_faster():
+    old = best_time(analyze_with_separate_passes)
+    new = best_time(analyze_with_style_features)
+    print(f"separate passes: {old:.4f}s, style features: {new:.4f}s ({old / new:.1f}x)")
+    assert new < old
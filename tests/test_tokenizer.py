@@ -0,0 +1,103 @@
+import os
+import pickle
+import sys
+import threading
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.agents.tokenizer import JapaneseTokenizer, get_tokenizer
+
+
+class FakeNode:
+    def __init__(self, surface, feature, next_node=None):
+        self.surface = surface
+        self.feature = feature
+        self.next = next_node
+
+
+def install_fake_mecab(monkeypatch):
+    created = []
+
+    class Tagger:
+        def __init__(self):
+            created.append(threading.get_ident())
+
+        def parseToNode(self, text):
+            eos = FakeNode('', 'BOS/EOS,*')
+            nodes = eos
+            for word in reversed(text.split()):
+                pos = '名詞,一般' if word != 'これ' else '名詞,代名詞'
+                nodes = FakeNode(word, pos, nodes)
+            return FakeNode('', 'BOS/EOS,*', nodes)
+
+    monkeypatch.setitem(sys.modules, 'MeCab', types.SimpleNamespace(Tagger=Tagger))
+    return created
+
+
+def test_tagger_is_created_once_per_thread_and_results_are_cached(monkeypatch):
+    created = install_fake_mecab(monkeypatch)
+    tokenizer = JapaneseTokenizer(cache_size=2)
+
+    assert tokenizer.extract_keywords("これ カメラ レンズ カメラ") == ['カメラ', 'レンズ']
+    tokenizer.tokenize("別の 文章")
+    assert len(created) == 1
+
+    parsed = []
+    original_parse = tokenizer._parse
+    monkeypatch.setattr(tokenizer, '_parse', lambda text: parsed.append(text) or original_parse(text))
+
+    results = tokenizer.tokenize_many(["別の 文章", "新しい 文章", "新しい 文章"])
+    assert parsed == ["新しい 文章"]
+    assert results[1] is results[2]
+
+    # LRUの上限を超えた古い結果は追い出される
+    tokenizer.tokenize("これ カメラ レンズ カメラ")
+    assert parsed == ["新しい 文章", "これ カメラ レンズ カメラ"]
+
+    thread = threading.Thread(target=tokenizer.tokenize, args=("スレッド 文章",))
+    thread.start()
+    thread.join()
+    assert len(created) == 2
+
+
+def test_fallback_without_mecab(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'MeCab', None)
+    tokenizer = JapaneseTokenizer()
+
+    assert not tokenizer.mecab_available
+    assert tokenizer.words("東京でPythonを学ぶ") == ['東京', 'で', 'Python', 'を', '学', 'ぶ']
+    assert tokenizer.extract_keywords("カメラとPythonとカメラ") == ['カメラ', 'Python']
+
+
+def test_tokenizer_methods_survive_pickling(monkeypatch):
+    install_fake_mecab(monkeypatch)
+    words = pickle.loads(pickle.dumps(JapaneseTokenizer(cache_size=8).words))
+    assert words("カメラ レンズ") == ['カメラ', 'レンズ']
+    assert words.__self__.cache_size == 8
+
+    shared = get_tokenizer()
+    assert pickle.loads(pickle.dumps(shared.words)).__self__ is shared
+
+
+def test_knowledge_network_vectorizes_with_shared_tokenizer(tmp_path, monkeypatch):
+    pytest.importorskip("sklearn")
+    pytest.importorskip("networkx")
+    from src.agents.knowledge_network import KnowledgeNetworkManager
+
+    install_fake_mecab(monkeypatch)
+    tokenizer = JapaneseTokenizer()
+    parsed = []
+    original_parse = tokenizer._parse
+    monkeypatch.setattr(tokenizer, '_parse', lambda text: parsed.append(text) or original_parse(text))
+
+    manager = KnowledgeNetworkManager(str(tmp_path), tokenizer=tokenizer)
+    articles = [{'full_content': text} for text in ("登山 の 装備", "登山 の 計画", "Python の 設計")]
+    manager._calculate_article_similarities(articles)
+
+    assert '登山' in manager.vectorizer.vocabulary_
+    assert '登山 の' in manager.vectorizer.vocabulary_
+    # 各記事の本文は1回だけ解析され、ベクトル化ではキャッシュが使われる
+    assert sorted(parsed) == sorted(article['full_content'] for article in articles)